@@ -0,0 +1,73 @@
+"""
+Compare entering N tournament matches one POST at a time against one bulk import.
+Runs in a scratch directory so the repo's tournament_matches.json is left alone.
+
+    python benchmarks/bench_bulk_import.py [N ...]
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.data_manager import DataManager
+from src.pipeline import RankingPipeline
+
+def make_rows(team_nums, n, seed=1):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        r1, r2, b1, b2 = rng.sample(team_nums, 4)
+        rs, bs = rng.randint(20, 150), rng.randint(20, 150)
+        rows.append({'match_id': f"T-{i + 1}", 'r1': r1, 'r2': r2, 'b1': b1, 'b2': b2,
+                     'rs': rs, 'bs': bs, 'rrp': rng.randint(0, 6), 'brp': rng.randint(0, 6)})
+    return rows
+
+def fresh_manager():
+    with open('tournament_matches.json', 'w') as f:
+        f.write('[]')
+    dm = DataManager()
+    return dm, RankingPipeline(dm)
+
+def per_match(rows):
+    dm, pipeline = fresh_manager()
+    start = time.perf_counter()
+    for r in rows:
+        dm.add_tournament_match(r['match_id'], r['r1'], r['r2'], r['b1'], r['b2'],
+                                r['rs'], r['bs'], r['rrp'], r['brp'])
+        # Clients refresh standings after every POST
+        pipeline.standings()
+    return time.perf_counter() - start, pipeline.recomputed['league_rank']
+
+def bulk(rows):
+    dm, pipeline = fresh_manager()
+    start = time.perf_counter()
+    errors = dm.add_tournament_matches(rows)
+    assert not errors, errors
+    pipeline.standings()
+    return time.perf_counter() - start, pipeline.recomputed['league_rank']
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [100, 250, 500]
+    workdir = tempfile.mkdtemp()
+    shutil.copy(os.path.join(ROOT, 'ftcscout_data.json'), workdir)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        team_nums = list(DataManager().teams)
+        print(f"{'matches':>8} {'per-match (s)':>14} {'recomputes':>11} {'bulk (s)':>10} {'recomputes':>11} {'speedup':>8}")
+        for n in sizes:
+            rows = make_rows(team_nums, n)
+            t_single, rc_single = per_match(rows)
+            t_bulk, rc_bulk = bulk(rows)
+            print(f"{n:>8} {t_single:>14.4f} {rc_single:>11} {t_bulk:>10.4f} {rc_bulk:>11} {t_single / t_bulk:>7.1f}x")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Peak memory of ingesting one synthetic event of N matches:
+legacy (json() the whole response, build team_performances, dump with indent=2)
+vs the streaming path in src.ingest. Python heap peak is measured with tracemalloc.
+
+    python benchmarks/bench_ingest_memory.py [N ...]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.fetch_ftcscout_data import calculate_match_rp
+from src.ingest import iter_array_items, ingest_performances
+
+def synthetic_chunks(n_matches, chunk_size=64 * 1024, seed=7):
+    """Bytes of a GraphQL eventByCode response, generated lazily in HTTP-sized chunks."""
+    rng = random.Random(seed)
+    teams = [str(1000 + i) for i in range(200)]
+    pending = ['{"data":{"eventByCode":{"matches":[']
+    size = len(pending[0])
+    for i in range(n_matches):
+        picked = rng.sample(teams, 4)
+        side = lambda: {'totalPoints': rng.randint(0, 200), 'movementRp': rng.random() < .5,
+                        'goalRp': rng.random() < .3, 'patternRp': rng.random() < .2}
+        match = {
+            'matchNum': i + 1,
+            'teams': [{'teamNumber': int(t), 'alliance': 'Red' if j < 2 else 'Blue', 'surrogate': False}
+                      for j, t in enumerate(picked)],
+            'scores': {'red': side(), 'blue': side()}
+        }
+        text = (',' if i else '') + json.dumps(match)
+        pending.append(text)
+        size += len(text)
+        if size >= chunk_size:
+            yield ''.join(pending).encode()
+            pending, size = [], 0
+    pending.append(']}}}')
+    yield ''.join(pending).encode()
+
+def legacy(n, out_path):
+    body = b''.join(synthetic_chunks(n))
+    matches = json.loads(body)['data']['eventByCode']['matches']
+    team_performances = {}
+    for match in matches:
+        for team_data in match['teams']:
+            team_num = str(team_data['teamNumber'])
+            rp, score = calculate_match_rp(match, team_num)
+            team_performances.setdefault(team_num, []).append(
+                {'match_id': f"M1-Q{match['matchNum']}", 'rp': rp, 'score': score, 'surrogate': False})
+    with open(out_path, 'w') as f:
+        json.dump({'team_performances': team_performances}, f, indent=2)
+
+def streaming(n, out_path):
+    ingest_performances([('SYNTH', 'M1')], out_path, fetch=lambda code, event: iter_array_items(synthetic_chunks(n), head=event))
+
+def measure(fn, n, out_path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(n, out_path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6, elapsed, os.path.getsize(out_path) / 1e6
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [1000, 10000, 50000]
+    workdir = tempfile.mkdtemp()
+    print(f"{'matches':>8} | {'legacy peak MB':>14} {'s':>6} {'file MB':>8} | {'stream peak MB':>14} {'s':>6} {'file MB':>8}")
+    for n in sizes:
+        lp, lt, lf = measure(legacy, n, os.path.join(workdir, 'legacy.json'))
+        sp, st, sf = measure(streaming, n, os.path.join(workdir, 'stream.ndjson'))
+        print(f"{n:>8} | {lp:>14.2f} {lt:>6.2f} {lf:>8.2f} | {sp:>14.2f} {st:>6.2f} {sf:>8.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Compiled season rules vs the previous hard-coded ranking path.
+
+Ranks the same cloned scenarios (the current teams plus random tournament results)
+with a copy of the old hard-coded calculate_league_rankings / calculate_advancement_points
+and with RankingCalculator driven by the compiled rules, checks both give the same
+standings, and prints the time per scenario of each.
+
+    python benchmarks/bench_rules.py [scenarios] [season]
+"""
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.data_manager import DataManager
+from src.ranking_calculator import RankingCalculator
+
+def hard_coded(teams, alliance_selections):
+    """The ranking and advancement path as it was before the rules engine."""
+    for team in teams:
+        league, tournament = RankingCalculator.team_performances(team)
+        top_league = sorted(league, key=lambda x: (x['rp'], x['score']), reverse=True)[:10]
+        top_tournament = sorted(tournament, key=lambda x: (x['rp'], x['score']), reverse=True)[:5]
+        team.total_rp = sum(p['rp'] for p in top_league) + sum(p['rp'] for p in top_tournament)
+        team.matches_played = len(league) + len(tournament)
+        total = sum(p['score'] for p in league) + sum(p['score'] for p in tournament)
+        team.avg_score = total / team.matches_played if team.matches_played > 0 else 0
+    ranked = sorted(teams, key=lambda t: (t.total_rp, t.avg_score), reverse=True)
+    for i, team in enumerate(ranked):
+        team.league_rank = i + 1
+    for team in ranked:
+        points = max(2, 17 - team.league_rank)
+        if team.number in alliance_selections:
+            points += 21 - alliance_selections[team.number]
+        team.advancement_points = points
+    return [(t.number, t.advancement_points) for t in sorted(ranked, key=lambda t: t.advancement_points, reverse=True)]
+
+def compiled(teams, alliance_selections, calculator=RankingCalculator):
+    ranked = calculator.calculate_league_rankings(teams, with_breakdown=False)
+    final = calculator.calculate_advancement_points(ranked, alliance_selections, {}, {})
+    return [(t.number, t.advancement_points) for t in final]
+
+def scenarios(dm, count, rng):
+    numbers = list(dm.teams)
+    for s in range(count):
+        matches = []
+        for i in range(3 * len(numbers) // 4):
+            red, blue = rng.sample(numbers, 2), rng.sample(numbers, 2)
+            rs, bs = rng.randint(0, 150), rng.randint(0, 150)
+            matches.append({'match_id': f'B{s}-{i}', 'r1': red[0], 'r2': red[1], 'b1': blue[0], 'b2': blue[1],
+                            'rs': rs, 'bs': bs, 'rrp': rng.randint(0, 6), 'brp': rng.randint(0, 6)})
+        yield dm.get_all_teams_with_hypothetical(matches)
+
+def timed(fn, sets, selections):
+    start = time.perf_counter()
+    results = [fn(teams, selections) for teams in sets]
+    return results, time.perf_counter() - start
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    season = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    os.chdir(ROOT)
+    dm = DataManager()
+    calculator = RankingCalculator.for_season(season) if season else RankingCalculator
+    sets = list(scenarios(dm, count, random.Random(1)))
+    selections = {num: i // 2 + 1 for i, num in enumerate(list(dm.teams)[:8])}
+    # Warm up both paths, then alternate so neither gets a cache advantage
+    timed(hard_coded, sets[:20], selections)
+    timed(lambda t, a: compiled(t, a, calculator), sets[:20], selections)
+    best = {'hard-coded': float('inf'), 'compiled': float('inf')}
+    for _ in range(3):
+        old, t_old = timed(hard_coded, sets, selections)
+        new, t_new = timed(lambda t, a: compiled(t, a, calculator), sets, selections)
+        best['hard-coded'] = min(best['hard-coded'], t_old)
+        best['compiled'] = min(best['compiled'], t_new)
+    print(f"season rules: {calculator.rules.season} ({calculator.rules.name}), "
+          f"{len(dm.teams)} teams, {count} scenarios")
+    print(f"identical standings: {old == new}")
+    for name, elapsed in best.items():
+        print(f"{name:>11}: {elapsed / count * 1e6:8.1f} us/scenario")
+    print(f"ratio compiled / hard-coded: {best['compiled'] / best['hard-coded']:.3f}")
+
+if __name__ == '__main__':
+    main()
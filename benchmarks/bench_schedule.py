@@ -0,0 +1,28 @@
+"""
+Schedule generation throughput for a range of team counts.
+
+    python benchmarks/bench_schedule.py [teams ...]
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.schedule import ScheduleGenerator
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [16, 32, 48, 64]
+    print(f"{'teams':>6} {'matches':>8} {'schedules/s':>12} {'best cost':>10} {'mean cost':>10}")
+    for n in sizes:
+        generator = ScheduleGenerator([str(i) for i in range(1, n + 1)], matches_per_team=5, min_gap=3, seed=1)
+        start = time.perf_counter()
+        schedules = list(generator.generate_many(2000))
+        elapsed = time.perf_counter() - start
+        costs = [s.quality['cost'] for s in schedules]
+        print(f"{n:>6} {generator.n_matches:>8} {len(schedules) / elapsed:>12.0f} "
+              f"{min(costs):>10} {sum(costs) / len(costs):>10.2f}")
+
+if __name__ == '__main__':
+    main()
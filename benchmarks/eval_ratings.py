@@ -0,0 +1,111 @@
+"""
+Offline comparison of the online Glicko-style ratings against OPR as match predictors.
+
+Every season of the archive is replayed in order. Before each match:
+  ratings    - the rating engine's win probability, then the result is applied (online)
+  opr/event  - MatchPredictor fitted on all earlier events of the season
+  opr/10     - MatchPredictor refitted every 10 matches
+Scored on decisive matches (ties dropped): Brier score, log loss and accuracy of red winning.
+
+    python benchmarks/eval_ratings.py [archive_dir]
+
+Without an archive, one is built from the repo's meets_data.json in a scratch directory.
+"""
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+from src.archive import MatchArchive, build_from_legacy
+from src.data_manager import ARCHIVE_PATH
+from src.ingest import LEAGUE_MEETS
+from src.predictor import MatchPredictor, played_rows
+from src.ratings import RatingEngine
+
+def opr_probabilities(archive, rows, refit_every=0):
+    """Red win probability (ties folded out) for each row, fitted only on earlier rows."""
+    probs = np.empty(len(rows))
+    start = 0
+    while start < len(rows):
+        if refit_every:
+            end = start + refit_every
+        else:
+            event = archive.event[rows[start]]
+            end = start + int((archive.event[rows[start:]] == event).sum())
+        model = MatchPredictor()
+        if start:
+            train = rows[:start]
+            model.fit(archive.teams[train], archive.score[train], archive.rp_components[train])
+        block = rows[start:end]
+        teams = np.asarray(archive.teams[block])
+        pred = model.predict(teams[:, :2], teams[:, 2:])
+        probs[start:end] = pred['win'] / np.maximum(pred['win'] + pred['loss'], 1e-12)
+        start = end
+    return probs
+
+def rating_probabilities(archive, rows):
+    engine = RatingEngine()
+    probs = np.empty(len(rows))
+    teams = archive.teams[rows].tolist()
+    scores = archive.score[rows].tolist()
+    for i, row in enumerate(rows.tolist()):
+        red = [str(t) for t in teams[i][:2] if t]
+        blue = [str(t) for t in teams[i][2:] if t]
+        probs[i] = engine.win_probability(red, blue)
+        event = archive.events[int(archive.event[row])]
+        engine.update(red, blue, scores[i][0], scores[i][1], (event['season'], event['code']))
+    return probs
+
+def score(probs, outcome):
+    p = np.clip(probs, 1e-12, 1 - 1e-12)
+    return {
+        'brier': float(((probs - outcome) ** 2).mean()),
+        'log_loss': float(-(outcome * np.log(p) + (1 - outcome) * np.log(1 - p)).mean()),
+        'accuracy': float(((probs > 0.5) == (outcome == 1)).mean())
+    }
+
+def evaluate(archive):
+    print(f"{'season':>6} {'model':>10} {'matches':>8} {'brier':>7} {'logloss':>8} {'acc':>6} {'secs':>6}")
+    for season in sorted({e['season'] for e in archive.events}):
+        rows = played_rows(archive, season)
+        if not len(rows):
+            continue
+        scores = np.asarray(archive.score[rows])
+        decisive = scores[:, 0] != scores[:, 1]
+        outcome = (scores[:, 0] > scores[:, 1]).astype(float)[decisive]
+        for name, fn in (('ratings', lambda: rating_probabilities(archive, rows)),
+                         ('opr/event', lambda: opr_probabilities(archive, rows)),
+                         ('opr/10', lambda: opr_probabilities(archive, rows, refit_every=10))):
+            start = time.perf_counter()
+            probs = fn()[decisive]
+            elapsed = time.perf_counter() - start
+            m = score(probs, outcome)
+            print(f"{season:>6} {name:>10} {len(probs):>8} {m['brier']:>7.4f} {m['log_loss']:>8.4f} "
+                  f"{m['accuracy']:>6.3f} {elapsed:>6.2f}")
+    print(f"(coin flip: brier 0.2500, log loss {math.log(2):.4f})")
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, ARCHIVE_PATH)
+    if os.path.isdir(path):
+        evaluate(MatchArchive(path))
+        return
+    workdir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        build_from_legacy(LEAGUE_MEETS).write(os.path.join(workdir, 'archive'))
+    finally:
+        os.chdir(cwd)
+    try:
+        evaluate(MatchArchive(os.path.join(workdir, 'archive')))
+    finally:
+        shutil.rmtree(workdir)
+
+if __name__ == '__main__':
+    main()
@@ -1,77 +1,121 @@
+import json
 from nicegui import ui
+from src.data_manager import DataManager
+from src.ranking_calculator import RankingCalculator
+from src.pipeline import RankingPipeline
 
-# Team Data
-teams_raw = {
-    "5214": "B.R.O.", "11920": "QLS RaD Team", "14259": "TURBΩ V8",
-    "14770": "Control+Q", "23212": "Dublin Robotics Cybirds", "23279": "Turbotrons",
-    "23304": "Cyber Knights", "25627": "Robowarriors", "25810": "Cerberus",
-    "26891": "Tech Titans", "30450": "Sharp Face Robotics", "30473": "Duck",
-    "30474": "Quantum Sparks", "32098": "Robo Raptors"
-}
+# Edits arriving within this window are pushed to clients as one transaction
+DEBOUNCE_SECONDS = 0.3
 
-# Initial state: everything starts at baseline
-rows = []
-for t_id, name in teams_raw.items():
-    rows.append({
-        'id': t_id,
-        'team': f"{t_id} - {name}",
-        'rank_num': 14,
-        'rank_pts': 2,
-        'alliance_pts': 0,
-        'award_pts': 0,
-        'total': 2,
-        'style': 'background-color: #ffd1d1'
-    })
+# Standings come from the real league data; only the advancement inputs are edited here
+data_manager = DataManager()
+pipeline = RankingPipeline(data_manager)
+
+alliance_selections = {}  # team -> alliance number (1-4)
+awards = {}               # team -> award points
+playoff_results = {}      # team -> playoff points
+try:
+    with open('advancement_state.json', 'r') as f:
+        saved = json.load(f)
+        alliance_selections.update(saved.get('alliance_selections', {}))
+        awards.update(saved.get('awards', {}))
+        playoff_results.update(saved.get('playoff_results', {}))
+except FileNotFoundError:
+    pass
+
+def to_int(value):
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+def build_rows():
+    """Rows keyed by team number, in advancement order."""
+    final_teams = pipeline.advancement(alliance_selections, awards, playoff_results)
+    rows = {}
+    for i, t in enumerate(final_teams):
+        alliance_num = alliance_selections.get(t.number)
+        rows[t.number] = {
+            'id': t.number,
+            'team': f"{t.number} - {t.name}",
+            'rank_num': t.league_rank,
+            'rank_pts': RankingCalculator.qualification_points(t.league_rank),
+            'alliance_num': alliance_num or '',
+            'alliance_pts': RankingCalculator.alliance_points(alliance_num) if alliance_num else 0,
+            'award_pts': awards.get(t.number, 0),
+            'playoff_pts': playoff_results.get(t.number, 0),
+            'total': t.advancement_points,
+            'style': 'background-color: #d1ffd1; font-weight: bold;' if i < 2 else 'background-color: #ffd1d1;'
+        }
+    return rows
+
+# What every client currently shows
+sent_rows = build_rows()
+edited_teams = set()
+flush_timer = None
 
 def handle_cell_value_change(e):
-    # e.args contains the updated row data
+    # e.args contains the updated row data; apply it to this team's inputs only
     row = e.args['data']
-    
-    # Recalculate Rank Points (2026 Scale: Rank 1 = 16pts, Rank 14 = 2pts)
-    try:
-        r_num = int(row['rank_num'])
-        row['rank_pts'] = max(2, 16 - (r_num - 1))
-    except:
-        row['rank_pts'] = 2
+    team = row['id']
+
+    alliance_num = to_int(row.get('alliance_num'))
+    if 1 <= alliance_num <= 4:
+        alliance_selections[team] = alliance_num
+    else:
+        alliance_selections.pop(team, None)
+    for store, field in ((awards, 'award_pts'), (playoff_results, 'playoff_pts')):
+        pts = to_int(row.get(field))
+        if pts > 0:
+            store[team] = pts
+        else:
+            store.pop(team, None)
+
+    pipeline.invalidate_advancement([team])
+    edited_teams.add(team)
+    schedule_flush()
 
-    # Ensure other values are ints
-    a_pts = int(row['alliance_pts'] or 0)
-    aw_pts = int(row['award_pts'] or 0)
-    
-    # Update Total
-    row['total'] = row['rank_pts'] + a_pts + aw_pts
-    
-    # Update styling and sort
-    refresh_grid()
+def schedule_flush():
+    global flush_timer
+    if flush_timer is not None:
+        flush_timer.cancel()
+    flush_timer = ui.timer(DEBOUNCE_SECONDS, flush_changes, once=True)
 
-def refresh_grid():
-    # Sort all rows by total
-    sorted_rows = sorted(grid.options['rowData'], key=lambda x: x['total'], reverse=True)
-    
-    # Update styles based on new positions
-    for i, row in enumerate(sorted_rows):
-        row['style'] = 'background-color: #d1ffd1; font-weight: bold;' if i < 2 else 'background-color: #ffd1d1;'
-    
-    grid.options['rowData'] = sorted_rows
-    grid.update()
+def flush_changes():
+    """Recompute once for the whole burst and send only rows that changed."""
+    global sent_rows, flush_timer
+    flush_timer = None
+    new_rows = build_rows()
+    # Edited rows are always resent so rejected input is corrected on the client
+    changed = [r for num, r in new_rows.items() if sent_rows.get(num) != r or num in edited_teams]
+    edited_teams.clear()
+    sent_rows = new_rows
+    # Server-side copy for clients that connect later; not pushed on its own
+    grid.options['rowData'] = list(new_rows.values())
+    if changed:
+        grid.run_grid_method('applyTransaction', {'update': changed})
 
 # UI Layout
 ui.query('body').style('background-color: #f0f2f5;')
 ui.label('East Bay League Advancement: Live Worksheet').classes('text-h5 q-ma-md')
-ui.label('Click any cell under Rank, Alliance, or Awards to edit. Table sorts automatically.').classes('q-ml-md text-grey-7')
+ui.label('Qualification rank comes from league data. Edit Alliance #, Awards or Playoff points; the table sorts automatically.').classes('q-ml-md text-grey-7')
 
 grid = ui.aggrid({
     'columnDefs': [
         {'headerName': 'Team', 'field': 'team', 'width': 220, 'editable': False},
-        {'headerName': 'Qual Rank (1-14)', 'field': 'rank_num', 'width': 130, 'editable': True},
+        {'headerName': 'Qual Rank', 'field': 'rank_num', 'width': 110, 'editable': False},
         {'headerName': 'Qual Pts', 'field': 'rank_pts', 'width': 100, 'editable': False, 'cellStyle': {'color': '#666'}},
-        {'headerName': 'Alliance Pts', 'field': 'alliance_pts', 'width': 120, 'editable': True},
+        {'headerName': 'Alliance # (1-4)', 'field': 'alliance_num', 'width': 130, 'editable': True},
+        {'headerName': 'Alliance Pts', 'field': 'alliance_pts', 'width': 120, 'editable': False, 'cellStyle': {'color': '#666'}},
         {'headerName': 'Award Pts', 'field': 'award_pts', 'width': 120, 'editable': True},
+        {'headerName': 'Playoff Pts', 'field': 'playoff_pts', 'width': 120, 'editable': True},
         {'headerName': 'TOTAL', 'field': 'total', 'width': 100, 'sort': 'desc', 'editable': False},
     ],
-    'rowData': rows,
+    'rowData': list(sent_rows.values()),
+    # Stable row ids let transactions update rows in place
+    ':getRowId': 'params => params.data.id',
     'getRowStyle': ': params => params.data.style',
     'stopEditingWhenCellsLoseFocus': True,
 }).classes('w-full h-auto shadow-lg').on('cellValueChanged', handle_cell_value_change)
 
-ui.run(title="EBL Live Worksheet", port=8080)
\ No newline at end of file
+ui.run(title="EBL Live Worksheet", port=8080)
@@ -0,0 +1,143 @@
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+class Rejected(Exception):
+    """Request shed by admission control; status is 429 (client over its rate) or 503 (server busy)."""
+    def __init__(self, status: int, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.status = status
+        self.retry_after = retry_after
+        self.reason = reason
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self, cost: float, now: float) -> float:
+        """Take `cost` tokens; returns 0, or the seconds until they would be available (nothing taken)."""
+        self._refill(now)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def refund(self, cost: float):
+        self.tokens = min(self.burst, self.tokens + cost)
+
+class Ticket:
+    def __init__(self, controller: 'AdmissionController', cost: float):
+        self.controller = controller
+        self.cost = cost
+        self.started = time.monotonic()
+        self.granted = False
+        self.event = threading.Event()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.controller.release(self)
+
+class AdmissionController:
+    """
+    Admission for expensive endpoints. Each request carries a cost estimate (roughly
+    "one full ranking pass" = 1). Requests are charged against a per-client token bucket
+    (429 when empty), then run if the global budget of concurrent cost has room; otherwise
+    they wait in a bounded FIFO queue for up to queue_timeout seconds (503 when the queue
+    is full or the wait runs out). Endpoints that don't go through admit() are unaffected.
+    """
+    def __init__(self, capacity: float = 2.0, max_queue: int = 8, queue_timeout: float = 2.0,
+                 client_rate: float = 1.0, client_burst: float = 8.0, max_clients: int = 1024):
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_clients = max_clients
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._queue = deque()
+        self.in_flight = 0.0
+        # Moving average of seconds per unit of cost, for Retry-After estimates
+        self._seconds_per_cost = 0.5
+        self.stats = {'admitted': 0, 'queued': 0, 'rejected_rate': 0, 'rejected_busy': 0}
+
+    def admit(self, client: str, cost: float) -> Ticket:
+        """Returns a Ticket to use as a context manager around the work, or raises Rejected."""
+        # A request bigger than the whole budget may still run, alone
+        cost = min(max(cost, 0.01), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(client, now)
+            wait = bucket.take(cost, now)
+            if wait:
+                self.stats['rejected_rate'] += 1
+                raise Rejected(429, math.ceil(wait), f"Rate limit exceeded; retry in {math.ceil(wait)}s")
+            ticket = Ticket(self, cost)
+            if not self._queue and self.in_flight + cost <= self.capacity:
+                self._grant(ticket)
+                return ticket
+            if len(self._queue) >= self.max_queue:
+                bucket.refund(cost)
+                self.stats['rejected_busy'] += 1
+                raise Rejected(503, self._retry_after(), "Server busy; too many requests queued")
+            self._queue.append(ticket)
+            self.stats['queued'] += 1
+
+        if ticket.event.wait(self.queue_timeout):
+            return ticket
+        with self._lock:
+            # Granted between the timeout and taking the lock
+            if ticket.granted:
+                return ticket
+            self._queue.remove(ticket)
+            if client in self._buckets:
+                self._buckets[client].refund(cost)
+            self.stats['rejected_busy'] += 1
+            raise Rejected(503, self._retry_after(), "Server busy; timed out waiting for capacity")
+
+    def release(self, ticket: Ticket):
+        with self._lock:
+            self.in_flight -= ticket.cost
+            elapsed = time.monotonic() - ticket.started
+            self._seconds_per_cost = 0.8 * self._seconds_per_cost + 0.2 * elapsed / ticket.cost
+            while self._queue and self.in_flight + self._queue[0].cost <= self.capacity:
+                self._grant(self._queue.popleft())
+
+    def _grant(self, ticket: Ticket):
+        self.in_flight += ticket.cost
+        ticket.granted = True
+        ticket.started = time.monotonic()
+        self.stats['admitted'] += 1
+        ticket.event.set()
+
+    def _retry_after(self) -> int:
+        backlog = self.in_flight + sum(t.cost for t in self._queue)
+        return max(1, math.ceil(backlog * self._seconds_per_cost / self.capacity))
+
+    def _bucket(self, client: str, now: float) -> TokenBucket:
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            if len(self._buckets) >= self.max_clients:
+                # Forget clients whose buckets have refilled; they are indistinguishable from new ones
+                full = [c for c, b in self._buckets.items()
+                        if b.tokens + (now - b.updated) * b.rate >= b.burst]
+                for c in full:
+                    del self._buckets[c]
+            bucket = self._buckets[client] = TokenBucket(self.client_rate, self.client_burst, now)
+        return bucket
+
+    def status(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, in_flight=round(self.in_flight, 3), queued_now=len(self._queue),
+                        capacity=self.capacity, clients=len(self._buckets))
@@ -1,35 +1,132 @@
+import os
 import threading
 import time
-from src.fetch_ftcscout_data import update_live_data
+from src.ingest import update_live_data
+from src.graphql_client import GRAPHQL_URL
+from src.http_cache import CACHE_DIR
 
 # ... existing imports
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
+from werkzeug.middleware.proxy_fix import ProxyFix
+import copy
+import csv
+import functools
+import io
 import json
-from src.data_manager import DataManager
+import numpy as np
+from src.data_manager import DataManager, ARCHIVE_PATH
 from src.ranking_calculator import RankingCalculator
+from src.playoff_simulator import PlayoffSimulator
+from src.computation import SingleFlight, JobQueue, QueueFull
+from src.pipeline import RankingPipeline
+from src.event_log import EventLog
+from src.snapshot import (SnapshotReader, ProducerLock, FileWatcher, write_snapshot, write_stamp, snapshot_path,
+                          FETCH_STAMP_PATH)
+from src.threshold_solver import ThresholdSolver
+from src.materializer import Materializer
+from src.archive import MatchArchive
+from src.forecast import ForecastStore, METRICS, team_forecasts
+from src.predictor import fit_archive
+from src.schedule import ScheduleGenerator
+from src.admission import AdmissionController, Rejected
+from src.ratings import LiveRatings
+from src.scenario_cache import ScenarioCache, canonical_scenario, scenario_key
+from src.leverage import LeverageAnalyzer, OutcomeModel
+from src.match_index import MatchIndex
+from src.export import (FORMATS, BREAKDOWN_COLUMNS, MATCH_COLUMNS, ARCHIVE_MATCH_COLUMNS, stream_rows,
+                        team_rows, breakdown_rows, match_rows, archive_match_rows)
 
 app = Flask(__name__)
+# Proxies in front of the app (the host's one by default): request.remote_addr is then the
+# address the nearest of them saw, ignoring whatever X-Forwarded-For entries the client sent
+TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', 1))
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES)
 data_manager = DataManager()
 ranking_calculator = RankingCalculator()
+playoff_simulator = PlayoffSimulator()
+# Incremental ranking -> advancement pipeline over data_manager's teams
+ranking_pipeline = RankingPipeline(data_manager)
+# Append-only history of every mutation, for time-travel standings
+event_log = EventLog()
+
+# Identical concurrent computations (same endpoint, data version and params) run once
+single_flight = SingleFlight()
+# Long tasks run here so they never hold a request thread
+job_queue = JobQueue(max_workers=2, max_pending=16, result_ttl=600)
+# The one worker holding the producer lock fetches, builds the read views and publishes them
+producer_lock = ProducerLock()
+# State files any worker may rewrite; each worker reloads from them when they change (sync_shared_state)
+shared_files = FileWatcher(['tournament_matches.json', 'advancement_state.json', FETCH_STAMP_PATH])
+# Held while shared files are checked and reloaded, so a view never records a newer source than it was built from
+shared_state_lock = threading.Lock()
+# Serialized read views, rebuilt in the background (by the producer) whenever state changes
+materializer = Materializer(debounce=0.05)
+# The views' mmap'd snapshots shared across WSGI workers, by view key (see register_view)
+view_snapshots = {}
+# Concurrency budget and per-client rate limits for the expensive endpoints (see admitted())
+admission = AdmissionController(capacity=2.0, max_queue=8, queue_timeout=2.0, client_rate=1.0, client_burst=8.0)
+# Serialized hypothetical results by scenario content + data version (bounded LRU)
+scenario_cache = ScenarioCache(max_bytes=int(os.environ.get('SCENARIO_CACHE_BYTES', 32 * 1024 * 1024)))
+# Glicko-style ratings updated per match as results arrive
+live_ratings = LiveRatings(ARCHIVE_PATH)
+# League + tournament matches indexed by team, pair, event and score for /api/query/matches
+match_index = MatchIndex(ARCHIVE_PATH)
+# Quantile sketches per event for /api/forecast, refreshed from the match archive
+forecast_store = ForecastStore()
+
+def refresh_forecasts():
+    """Fold new or changed archive events into the sketches and (re)materialize the forecast view."""
+    if not os.path.isdir(ARCHIVE_PATH):
+        return
+    try:
+        if forecast_store.update_from_archive(MatchArchive(ARCHIVE_PATH)):
+            forecast_store.save()
+    except Exception as e:
+        print(f"Error updating forecast sketches: {e}")
+        return
+    register_view('forecast', _forecast_payload)
 
 # Background Task for Live Updates
 def background_data_fetch():
     while True:
+        # Only the producer worker fetches and builds the views; the rest serve its snapshots,
+        # load its data when it rewrites the fetch stamp (sync_shared_state) and take over if it exits
+        if not producer_lock.acquire():
+            time.sleep(300)
+            continue
+        materializer.start()
         try:
-            print("Fetching live data from FTCScout...")
+            # Streamed responses are written to CACHE_DIR as they are read: finished events come
+            # from there without a request, and if the API is down the last cached copy is used
+            print(f"Fetching live data from {GRAPHQL_URL} (cache: {CACHE_DIR})...")
             if update_live_data():
                 print("Data updated successfully. Reloading DataManager...")
-                data_manager.reload_ftc_data()
+                with shared_state_lock:
+                    refresh_forecasts()
+                    data_manager.reload_ftc_data()
+                    write_stamp(FETCH_STAMP_PATH)
+                    shared_files.mark(FETCH_STAMP_PATH)
             else:
                 print("No data verification or error during fetch.")
         except Exception as e:
             print(f"Error in background fetch: {e}")
+        # meets_data.json is written by fetch_meets_data.py outside the app
+        materializer.invalidate('files')
         
         # specific interval (e.g., 5 minutes = 300 seconds)
         time.sleep(300)
 
-# Start background thread (daemon so it dies when main app dies)
+def follow_shared_state():
+    """The producer's views must follow other workers' writes even while it gets no requests."""
+    while True:
+        time.sleep(1)
+        if producer_lock.held:
+            reload_shared_files()
+
+# Start background threads (daemon so they die when main app dies)
 threading.Thread(target=background_data_fetch, daemon=True).start()
+threading.Thread(target=follow_shared_state, daemon=True).start()
 
 # In-memory storage for advancement inputs (awards, alliance selection)
 advancement_state = {
@@ -43,9 +140,15 @@ advancement_state = {
     'awards': {}, 
     'playoff_results': {} 
 }
+# Bumped whenever advancement_state is saved
+advancement_version = 0
 
-def save_advancement_state():
+def save_advancement_state(kind='update'):
     """Save advancement state to a file."""
+    global advancement_version
+    advancement_version += 1
+    materializer.invalidate('advancement')
+    event_log.record_advancement(kind, advancement_state)
     try:
         with open('advancement_state.json', 'w') as f:
             json.dump(advancement_state, f, indent=4)
@@ -80,30 +183,228 @@ def load_advancement_state():
     except Exception as e:
         print(f"Error loading advancement state: {e}")
 
+def reload_advancement_state():
+    """Adopt advancement_state.json as saved by another worker (already logged by that worker)."""
+    global advancement_version
+    before = copy.deepcopy(advancement_state)
+    load_advancement_state()
+    if advancement_state != before:
+        advancement_version += 1
+        ranking_pipeline.invalidate_advancement()
+        materializer.invalidate('advancement')
+
 # Load initial state
 load_advancement_state()
+event_log.sync(data_manager, advancement_state)
+event_log.attach(data_manager)
+live_ratings.attach(data_manager)
+match_index.attach(data_manager)
+
+def publish_snapshot(key, payload, source):
+    """Write a serialized view to its shared snapshot, unless it already holds it."""
+    current = view_snapshots[key].read(source)
+    if current is not None and current[1] == payload:
+        return
+    try:
+        write_snapshot(payload, snapshot_path(key), source)
+    except Exception as e:
+        print(f"Error writing {key} snapshot: {e}")
+
+def register_view(key, build, group='data'):
+    """Materialize a standard read view; each build the producer makes is published to the view's snapshot."""
+    view_snapshots.setdefault(key, SnapshotReader(snapshot_path(key)))
+    built_from = {}
+
+    def build_recorded():
+        with shared_state_lock:
+            built_from['source'] = shared_files.source()
+        return build()
+
+    materializer.register(key, build_recorded, group=group,
+                          on_built=lambda payload: publish_snapshot(key, payload, built_from['source']))
+
+# Any match data change (mutation or completed fetch) stales every view
+data_manager.subscribe(lambda event, teams, payload: materializer.invalidate())
+
+# Endpoints whose GET without arguments is a materialized view, by view key
+SNAPSHOT_VIEWS = {'get_teams': 'teams', 'get_advancement': 'advancement_calc', 'get_ratings': 'ratings',
+                  'get_forecast': 'forecast', 'get_matches': 'matches/{category}', 'get_meet_matches': 'meets/{meet_id}'}
+
+def _snapshot_response(version, payload):
+    # Served straight from the shared mapping, without copying it per request
+    return Response([payload], mimetype='application/json',
+                    headers={'X-Snapshot-Version': str(version), 'Content-Length': str(len(payload))})
+
+@app.before_request
+def sync_shared_state():
+    """
+    Workers other than the producer answer the standard read views from its snapshots while
+    those were built from the shared files as they are on disk now, without loading anything.
+    Otherwise each worker uses its own copy of the state, picking up what the producer's fetch
+    or another worker's mutation wrote since it last looked, so every worker answers alike.
+    Costs one stat per shared file when nothing changed.
+    """
+    view = SNAPSHOT_VIEWS.get(request.endpoint)
+    if view and not producer_lock.held and request.method == 'GET' and not request.args:
+        reader = view_snapshots.get(view.format(**request.view_args))
+        snapshot = reader.read(shared_files.source(current=True)) if reader else None
+        if snapshot is not None:
+            return _snapshot_response(*snapshot)
+    reload_shared_files()
+
+def reload_shared_files():
+    """Reload the shared files rewritten since this worker last looked; returns their paths."""
+    with shared_state_lock:
+        changed = shared_files.changed()
+        for path in changed:
+            if path == FETCH_STAMP_PATH:
+                data_manager.reload_ftc_data()
+                refresh_forecasts()
+            elif path == 'tournament_matches.json':
+                # A no-op for this worker's own saves: the file then matches what is loaded
+                data_manager.reload_tournament_data()
+            elif path == 'advancement_state.json':
+                reload_advancement_state()
+        if changed and producer_lock.held:
+            # Rebuild even when nothing was reloaded, so the snapshots record the new source
+            materializer.invalidate()
+    return changed
+
+def _client_id():
+    # The client address as seen by our own proxy (see TRUSTED_PROXIES), which clients can't set
+    return request.remote_addr or 'unknown'
+
+def _json_list_length(key):
+    body = request.get_json(silent=True)
+    items = body.get(key) if isinstance(body, dict) else body
+    return len(items) if isinstance(items, list) else 0
+
+def admitted(cost):
+    """
+    Run the endpoint under admission control. cost(request) estimates the work in units
+    of one full ranking pass; overloaded requests get 429/503 with Retry-After.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return run_admitted(cost(request), lambda: fn(*args, **kwargs))
+        return wrapper
+    return decorator
+
+def run_admitted(cost, fn):
+    """fn() under admission control at the given cost, for endpoints that admit only part of their work."""
+    try:
+        ticket = admission.admit(_client_id(), cost)
+    except Rejected as e:
+        return jsonify({'success': False, 'error': e.reason}), e.status, {'Retry-After': str(e.retry_after)}
+    with ticket:
+        return fn()
+
+@app.route('/api/admission', methods=['GET'])
+def get_admission_status():
+    return jsonify(admission.status())
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+# Breakdowns for the live standings, built on first request and kept until the data changes
+breakdown_cache = {'version': None, 'teams': {}}
+
+def _cached_breakdown(team):
+    if breakdown_cache['version'] != data_manager.version:
+        breakdown_cache['version'], breakdown_cache['teams'] = data_manager.version, {}
+    cached = breakdown_cache['teams']
+    if team.number not in cached:
+        cached[team.number] = ranking_calculator.match_breakdown(team)
+    return cached[team.number]
+
+# Field name -> value for one ranked team; 'breakdown' is the only expensive one
+TEAM_FIELDS = {
+    'rank': lambda t: t.league_rank,
+    'number': lambda t: t.number,
+    'name': lambda t: t.name,
+    'total_rp': lambda t: t.total_rp,
+    'matches_played': lambda t: t.matches_played,
+    'avg_score': lambda t: round(t.avg_score, 2),
+    'breakdown': lambda t: getattr(t, 'match_breakdown', None) or [],
+}
+
+def _teams_payload(fields=None):
+    return _format_teams(ranking_pipeline.standings(), fields, breakdown=_cached_breakdown)
+
+def _format_teams(ranked_teams, fields=None, breakdown=None, extra=None):
+    """List rows for ranked teams, restricted to `fields` (all of TEAM_FIELDS by default)."""
+    getters = dict(TEAM_FIELDS, **(extra or {}))
+    if breakdown:
+        getters['breakdown'] = breakdown
+    fields = fields or list(getters)
+    return [{f: getters[f](t) for f in fields} for t in ranked_teams]
+
+def _list_options(args, allowed):
+    """(fields, page, per_page) from the query string; ValueError on anything invalid."""
+    fields = args.get('fields')
+    fields = [f.strip() for f in fields.split(',') if f.strip()] if fields else None
+    unknown = [f for f in fields or [] if f not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    page = int(args.get('page', 1))
+    per_page = int(args['per_page']) if 'per_page' in args else None
+    if page < 1 or (per_page is not None and per_page < 1):
+        raise ValueError("page and per_page must be positive")
+    return fields, page, per_page
+
+def _paginate(items, page, per_page):
+    if per_page is None:
+        return items
+    return items[(page - 1) * per_page:page * per_page]
+
+def _list_response(rows, total):
+    return jsonify(rows), 200, {'X-Total-Count': str(total)}
+
 @app.route('/api/teams', methods=['GET'])
 def get_teams():
-    teams = data_manager.get_all_teams()
-    ranked_teams = ranking_calculator.calculate_league_rankings(teams)
-    
-    result = []
-    for t in ranked_teams:
-        result.append({
-            'rank': t.league_rank,
-            'number': t.number,
-            'name': t.name,
-            'total_rp': t.total_rp,
-            'matches_played': t.matches_played,
-            'avg_score': round(t.avg_score, 2),
-            'breakdown': getattr(t, 'match_breakdown', [])
-        })
-    return jsonify(result)
+    try:
+        fields, page, per_page = _list_options(request.args, TEAM_FIELDS)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    as_of = request.args.get('as_of')
+    if as_of:
+        # Standings as they were after a given log sequence number or match id
+        seq = event_log.resolve(as_of)
+        if seq is None:
+            return jsonify({'success': False, 'error': f"Unknown as_of: {as_of}"}), 404
+        key = ('teams_as_of', seq, tuple(fields or ()), page, per_page)
+        rows = single_flight.do(key, lambda: _format_teams(
+            _paginate(event_log.standings_at(seq, data_manager.teams), page, per_page), fields))
+        return _list_response(rows, len(data_manager.teams))
+    if fields is None and per_page is None:
+        # Not materialized yet means a local write is still pending: compute so it is visible
+        if materializer.get('teams') is not None:
+            snapshot = view_snapshots['teams'].read()
+            if snapshot is not None:
+                return _snapshot_response(*snapshot)
+        return jsonify(single_flight.do(('teams', data_manager.version), _teams_payload))
+
+    ranked_teams = ranking_pipeline.standings()
+    # Only the requested page is formatted, so breakdowns are built for at most per_page teams
+    key = ('teams', data_manager.version, tuple(fields or ()), page, per_page)
+    rows = single_flight.do(key, lambda: _format_teams(_paginate(ranked_teams, page, per_page), fields,
+                                                       breakdown=_cached_breakdown))
+    return _list_response(rows, len(ranked_teams))
+
+@app.route('/api/teams/<number>', methods=['GET'])
+def get_team_detail(number):
+    """One team's standing with its full match breakdown."""
+    team = next((t for t in ranking_pipeline.standings() if t.number == number), None)
+    if team is None:
+        return jsonify({'success': False, 'error': f"Unknown team: {number}"}), 404
+    return jsonify(_format_teams([team], breakdown=_cached_breakdown)[0])
+
+@app.route('/api/rank_timeline', methods=['GET'])
+def get_rank_timeline():
+    """League rank of every team after each match / fetch event in the log."""
+    return jsonify(event_log.rank_timeline(data_manager.teams))
 
 @app.route('/api/matches', methods=['POST'])
 def add_match():
@@ -119,8 +420,31 @@ def add_match():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 400
 
-@app.route('/api/matches/<category>', methods=['GET'])
-def get_matches(category):
+@app.route('/api/matches/bulk', methods=['POST'])
+@admitted(lambda req: 1 + (req.content_length or 0) / 20000)
+def bulk_add_matches():
+    """
+    Import many tournament matches at once, as a JSON array or CSV with a
+    match_id,r1,r2,b1,b2,rs,bs,rrp,brp header. All rows are validated first;
+    nothing is applied unless every row is valid.
+    """
+    if request.mimetype == 'text/csv':
+        rows = list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
+    else:
+        rows = request.get_json(silent=True)
+        if isinstance(rows, dict):
+            rows = rows.get('matches')
+    if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+        return jsonify({'success': False, 'error': 'Expected a JSON array of matches or CSV'}), 400
+
+    errors = data_manager.add_tournament_matches(rows)
+    if errors:
+        return jsonify({'success': False, 'errors': errors}), 400
+    return jsonify({'success': True, 'added': len(rows)})
+
+MATCH_CATEGORIES = ['all', 'tournament', 'meet1', 'meet2', 'meet3']
+
+def _matches_payload(category):
     # category: 'all', 'meet1', 'meet2', 'meet3', 'tournament'
     all_matches = data_manager.matches
     filtered = []
@@ -151,18 +475,58 @@ def get_matches(category):
                 'brp': m.blue_rp
             })
             
-    return jsonify(filtered)
+    return filtered
 
-@app.route('/api/meets/<meet_id>', methods=['GET'])
-def get_meet_matches(meet_id):
-    """Serve meet match data from FTCScout JSON."""
+@app.route('/api/matches/<category>', methods=['GET'])
+def get_matches(category):
+    ready = materializer.get(f'matches/{category}')
+    if ready is not None:
+        return Response(ready, mimetype='application/json')
+    return jsonify(_matches_payload(category))
+
+MAX_QUERY_LIMIT = 1000
+
+@app.route('/api/query/matches', methods=['GET'])
+def query_matches():
+    """
+    League and tournament matches filtered by team, partner, opponent, event, kind,
+    min_score / max_score, min_rp / max_rp and surrogate, sorted by time, score or rp
+    (-score for descending), paged with limit / offset. X-Total-Count has the full count.
+    """
+    args = request.args
+    try:
+        ints = {k: int(args[k]) for k in ('min_score', 'max_score', 'min_rp', 'max_rp') if k in args}
+        limit = int(args.get('limit', 100))
+        offset = int(args.get('offset', 0))
+        if not 1 <= limit <= MAX_QUERY_LIMIT or offset < 0:
+            raise ValueError(f"limit must be 1-{MAX_QUERY_LIMIT} and offset >= 0")
+        surrogate = None
+        if 'surrogate' in args:
+            if args['surrogate'].lower() not in ('true', 'false', '1', '0'):
+                raise ValueError("surrogate must be true or false")
+            surrogate = args['surrogate'].lower() in ('true', '1')
+        total, rows = match_index.query(team=args.get('team'), partner=args.get('partner'),
+                                        opponent=args.get('opponent'), event=args.get('event'),
+                                        kind=args.get('kind'), surrogate=surrogate, sort=args.get('sort', 'time'),
+                                        limit=limit, offset=offset, **ints)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return _list_response(rows, total)
+
+def _load_meets_data():
     try:
         with open('meets_data.json', 'r') as f:
-            meets_data = json.load(f)
+            return json.load(f)
     except:
-        return jsonify([])
-    
-    return jsonify(meets_data.get(meet_id, []))
+        return {}
+
+@app.route('/api/meets/<meet_id>', methods=['GET'])
+def get_meet_matches(meet_id):
+    """Serve meet match data from FTCScout JSON."""
+    ready = materializer.get(f'meets/{meet_id}')
+    if ready is not None:
+        return Response(ready, mimetype='application/json')
+    return jsonify(_load_meets_data().get(meet_id, []))
 
 @app.route('/api/matches/<match_id>', methods=['DELETE'])
 def delete_match(match_id):
@@ -181,7 +545,8 @@ def reset_scenario():
     }
     advancement_state['awards'].clear()
     advancement_state['playoff_results'].clear()
-    save_advancement_state()
+    ranking_pipeline.invalidate_advancement()
+    save_advancement_state('reset')
     return jsonify({'success': True})
 
 @app.route('/api/alliance_selection', methods=['GET', 'POST'])
@@ -196,7 +561,7 @@ def handle_alliance_selection():
         # NOTE: User requested this be completely random/irrelevant to advancement points.
         # So we do NOT update 'alliance_selections' here anymore.
         
-        save_advancement_state()
+        save_advancement_state('alliance')
         return jsonify({'success': True})
 
 @app.route('/api/advancement', methods=['POST'])
@@ -221,28 +586,33 @@ def update_advancement():
             current = advancement_state['awards'].get(team, 0)
             advancement_state['awards'][team] = current + pts
         
-        save_advancement_state()
+        ranking_pipeline.invalidate_advancement([team])
+        save_advancement_state('award')
             
     return jsonify({'success': True})
 
-@app.route('/api/advancement_calc', methods=['GET'])
-def get_advancement():
-    teams = data_manager.get_all_teams()
-    ranked_teams = ranking_calculator.calculate_league_rankings(teams)
-    
-    final_teams = ranking_calculator.calculate_advancement_points(
-        ranked_teams,
+def _advancement_payload():
+    final_teams = ranking_pipeline.advancement(
         advancement_state['alliance_selections'],
         advancement_state['awards'],
         advancement_state['playoff_results']
     )
+    ranked_teams = ranking_pipeline.standings()
+    projection = playoff_simulator.simulate(advancement_state['detailed_alliances'], data_manager.teams)
+    ranking_calculator.calculate_expected_advancement_points(
+        ranked_teams,
+        advancement_state['alliance_selections'],
+        advancement_state['awards'],
+        advancement_state['playoff_results'],
+        projection
+    )
     
     result = []
     for i, t in enumerate(final_teams):
-        qual_pts = max(2, 17 - t.league_rank)
+        qual_pts = ranking_calculator.qualification_points(t.league_rank)
         alliance_pts = 0
         if t.number in advancement_state['alliance_selections']:
-            alliance_pts = 21 - advancement_state['alliance_selections'][t.number]
+            alliance_pts = ranking_calculator.alliance_points(advancement_state['alliance_selections'][t.number])
             
         award_pts = advancement_state['awards'].get(t.number, 0)
         play_pts = advancement_state['playoff_results'].get(t.number, 0)
@@ -255,44 +625,428 @@ def get_advancement():
             'alliance_pts': alliance_pts,
             'award_pts': award_pts,
             'playoff_pts': play_pts,
-            'total_ap': t.advancement_points
+            'total_ap': t.advancement_points,
+            'expected_playoff_pts': projection.get(t.number, {}).get('expected_playoff_pts', 0),
+            'expected_total_ap': t.expected_advancement_points
         })
         
-    return jsonify(result)
+    return result
 
-@app.route('/api/rankings/hypothetical', methods=['POST'])
-def calculate_hypothetical():
-    data = request.json
-    hypothetical_matches = data.get('matches', [])
-    
-    # Get all teams with hypothetical matches applied (cloned, non-destructive)
-    teams = data_manager.get_all_teams_with_hypothetical(hypothetical_matches)
-    
-    # Calculate league rankings based on these teams
-    ranked_teams = ranking_calculator.calculate_league_rankings(teams)
+@app.route('/api/advancement_calc', methods=['GET'])
+def get_advancement():
+    ready = materializer.get('advancement_calc')
+    if ready is not None:
+        return Response(ready, mimetype='application/json')
+    key = ('advancement_calc', data_manager.version, advancement_version)
+    return jsonify(single_flight.do(key, _advancement_payload))
+
+@app.route('/api/playoffs/projection', methods=['GET'])
+@admitted(lambda req: 1.5)
+def get_playoff_projection():
+    """Simulated playoff outcome probabilities for the current alliances."""
+    ranked_teams = ranking_pipeline.standings()
+    projection = playoff_simulator.simulate(advancement_state['detailed_alliances'], data_manager.teams)
     
-    # Calculate advancement points if needed, or just return rankings
-    # Providing advancement context too since that's the end goal
-    final_teams = ranking_calculator.calculate_advancement_points(
+    final_teams = ranking_calculator.calculate_expected_advancement_points(
         ranked_teams,
         advancement_state['alliance_selections'],
         advancement_state['awards'],
-        advancement_state['playoff_results']
+        advancement_state['playoff_results'],
+        projection
     )
     
     result = []
     for t in final_teams:
+        p = projection.get(t.number, {})
         result.append({
-            'rank': t.league_rank,
             'number': t.number,
             'name': t.name,
-            'total_rp': t.total_rp,
-            'matches_played': t.matches_played,
-            'avg_score': round(t.avg_score, 2),
-            'advancement_points': t.advancement_points,
-            'breakdown': getattr(t, 'match_breakdown', [])
+            'alliance': p.get('alliance'),
+            'p_winner': p.get('winner', 0),
+            'p_finalist': p.get('finalist', 0),
+            'expected_playoff_pts': p.get('expected_playoff_pts', 0),
+            'expected_total_ap': t.expected_advancement_points
         })
     return jsonify(result)
 
+def _hypothetical_payload(hypothetical_matches, job=None, fields=None, page=1, per_page=None,
+                          teams=None, advancement=None):
+    # Get all teams with hypothetical matches applied (cloned, non-destructive), unless given
+    if teams is None:
+        teams = data_manager.get_all_teams_with_hypothetical(hypothetical_matches)
+    advancement = advancement or advancement_state
+    if job:
+        job.report(0.3)
+    
+    # Calculate league rankings based on these teams
+    ranked_teams = ranking_calculator.calculate_league_rankings(teams, with_breakdown=False)
+    if job:
+        job.report(0.8)
+    
+    # Calculate advancement points if needed, or just return rankings
+    # Providing advancement context too since that's the end goal
+    final_teams = ranking_calculator.calculate_advancement_points(
+        ranked_teams,
+        advancement['alliance_selections'],
+        advancement['awards'],
+        advancement['playoff_results']
+    )
+    
+    return _format_teams(_paginate(final_teams, page, per_page), fields,
+                         breakdown=ranking_calculator.match_breakdown, extra=HYPOTHETICAL_FIELDS)
+
+HYPOTHETICAL_FIELDS = {'advancement_points': lambda t: t.advancement_points}
+MAX_HYPOTHETICAL_MATCHES = 1000
+
+def _hypothetical_cost(req):
+    # Oversized scenarios are charged as the largest allowed one, then refused with 413
+    return 1 + min(_json_list_length('matches'), MAX_HYPOTHETICAL_MATCHES) / 100
+
+def _hypothetical_matches(data):
+    """(canonical matches, None) for a request body, or (None, error response) if too many or malformed."""
+    matches = data.get('matches', [])
+    if isinstance(matches, list) and len(matches) > MAX_HYPOTHETICAL_MATCHES:
+        return None, (jsonify({'success': False, 'error': f"At most {MAX_HYPOTHETICAL_MATCHES} matches per request"}), 413)
+    try:
+        return canonical_scenario(matches), None
+    except ValueError as e:
+        return None, (jsonify({'success': False, 'error': str(e)}), 400)
+
+@app.route('/api/rankings/hypothetical', methods=['POST'])
+def calculate_hypothetical():
+    data = request.get_json(silent=True) or {}
+    try:
+        fields, page, per_page = _list_options(request.args, dict(TEAM_FIELDS, **HYPOTHETICAL_FIELDS))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    matches, error = _hypothetical_matches(data)
+    if error:
+        return error
+    # Same scenario (however it was written) against the same data -> same bytes
+    key = scenario_key(matches, data_manager.version, advancement_version, fields, page, per_page)
+
+    def respond(body, status):
+        return Response(body, mimetype='application/json',
+                        headers={'X-Total-Count': str(len(data_manager.teams)), 'X-Cache': status})
+
+    body = scenario_cache.get(key)
+    if body is not None:
+        return respond(body, 'hit')
+    # Only a miss ranks anything, so only misses go through admission control
+    return run_admitted(_hypothetical_cost(request), lambda: respond(single_flight.do(
+        ('hypothetical', key), lambda: scenario_cache.put(key, materializer.serialize(
+            _hypothetical_payload(matches, fields=fields, page=page, per_page=per_page)))), 'miss'))
+
+@app.route('/api/rankings/hypothetical/cache', methods=['GET'])
+def get_scenario_cache_stats():
+    return jsonify(scenario_cache.stats())
+
+def _requirements_payload(remaining, advancing, team_numbers):
+    ranked_teams = ranking_pipeline.standings()
+    solver = ThresholdSolver(remaining)
+    result = solver.solve(ranked_teams, team_numbers)
+    if advancing:
+        for number, entry in result.items():
+            target = solver.advancement_target_rank(
+                number, ranked_teams, advancing,
+                advancement_state['alliance_selections'],
+                advancement_state['awards'],
+                advancement_state['playoff_results']
+            )
+            entry['advancement'] = dict(entry['ranks'][target - 1]) if target else {'rank': None}
+    return result
+
+@app.route('/api/rankings/requirements', methods=['GET'])
+@admitted(lambda req: 1)
+def get_rank_requirements():
+    """Minimum extra tournament RP (and score on RP ties) for each team to reach each rank."""
+    try:
+        remaining = int(request.args.get('remaining', 5))
+        advancing = int(request.args.get('advancing', 0))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'remaining and advancing must be integers'}), 400
+    if not 0 <= remaining <= 20 or advancing < 0:
+        return jsonify({'success': False, 'error': 'remaining must be 0-20 and advancing >= 0'}), 400
+    teams = request.args.get('team')
+    team_numbers = teams.split(',') if teams else None
+    key = ('requirements', data_manager.version, advancement_version, remaining, advancing, teams)
+    return jsonify(single_flight.do(key, lambda: _requirements_payload(remaining, advancing, team_numbers)))
+
+def _leverage_payload(matches, n_sims, top):
+    alliances = [(m['red'], m['blue']) for m in matches]
+    if os.path.isdir(ARCHIVE_PATH):
+        model = OutcomeModel.from_predictor(_match_predictor(), alliances)
+    else:
+        model = OutcomeModel.from_history(alliances, data_manager.teams)
+    # Advancement points that don't depend on league rank
+    bonus = {}
+    for num in data_manager.teams:
+        points = advancement_state['awards'].get(num, 0) + advancement_state['playoff_results'].get(num, 0)
+        if num in advancement_state['alliance_selections']:
+            points += ranking_calculator.alliance_points(advancement_state['alliance_selections'][num])
+        bonus[num] = points
+    return LeverageAnalyzer(n_sims=n_sims).analyze(list(data_manager.teams.values()), matches, model, bonus, top)
+
+@app.route('/api/leverage', methods=['POST'])
+@admitted(lambda req: 1 + _json_list_length('matches') / 20)
+def get_match_leverage():
+    """
+    How much each remaining match swings each team's expected rank and advancement points.
+    Body: {"matches": [{match_id, r1, r2, b1, b2}, ...] (e.g. from /api/schedule/generate), "sims", "top"}.
+    """
+    data = request.json or {}
+    try:
+        remaining = [{'match_id': m['match_id'], 'red': [m['r1'], m['r2']], 'blue': [m['b1'], m['b2']]}
+                     for m in canonical_scenario([dict(m, rs=0, bs=0, rrp=0, brp=0) for m in data.get('matches', [])])]
+        # Numeric team numbers only, as /api/predict requires (the predictor indexes by number)
+        for m in remaining:
+            _alliance(m['red'])
+            _alliance(m['blue'])
+        n_sims = int(data.get('sims', 200))
+        top = int(data['top']) if data.get('top') is not None else None
+    except (ValueError, TypeError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if not remaining or len(remaining) > MAX_HYPOTHETICAL_MATCHES or not 10 <= n_sims <= 2000:
+        return jsonify({'success': False, 'error': f"Need 1-{MAX_HYPOTHETICAL_MATCHES} matches and 10-2000 sims"}), 400
+    key = scenario_key(remaining, 'leverage', data_manager.version, advancement_version, n_sims, top)
+    body = scenario_cache.get(key)
+    if body is None:
+        body = single_flight.do(('leverage', key), lambda: scenario_cache.put(key, materializer.serialize(
+            _leverage_payload(remaining, n_sims, top))))
+    return Response(body, mimetype='application/json')
+
+FORECAST_QUANTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+def _forecast_payload(metric='opr', team_numbers=None):
+    archive = MatchArchive(ARCHIVE_PATH)
+    season = archive.latest_season()
+    distributions = {}
+    for name in (metric, 'score'):
+        sketch = forecast_store.distribution(name, season)
+        distributions[name] = {f"p{int(q * 100)}": round(sketch.quantile(q), 2) if sketch.count else None
+                               for q in FORECAST_QUANTILES}
+    return {
+        'season': season,
+        'metric': metric,
+        'distribution': distributions,
+        'teams': team_forecasts(archive, forecast_store, team_numbers or list(data_manager.teams), metric)
+    }
+
+@app.route('/api/forecast', methods=['GET'])
+@admitted(lambda req: 0.5)
+def get_forecast():
+    """Next-event OPR predictions and percentiles from the archive's quantile sketches."""
+    if not os.path.isdir(ARCHIVE_PATH):
+        return jsonify({'success': False, 'error': 'No match archive yet; run python -m src.archive'}), 503
+    metric = request.args.get('metric', 'opr')
+    if metric not in METRICS or metric == 'score':
+        return jsonify({'success': False, 'error': "metric must be 'opr' or 'np_opr'"}), 400
+    teams = request.args.get('team')
+    if metric == 'opr' and not teams:
+        ready = materializer.get('forecast')
+        if ready is not None:
+            return Response(ready, mimetype='application/json')
+    key = ('forecast', data_manager.version, metric, teams)
+    return jsonify(single_flight.do(key, lambda: _forecast_payload(metric, teams.split(',') if teams else None)))
+
+# Match predictor fitted on the archive's latest season, refitted when the archive is rewritten
+predictor_cache = {'mtime': None, 'model': None}
+
+def _match_predictor():
+    mtime = os.path.getmtime(os.path.join(ARCHIVE_PATH, 'meta.json'))
+    if predictor_cache['mtime'] != mtime:
+        predictor_cache['model'] = single_flight.do(('predictor', mtime), lambda: fit_archive(MatchArchive(ARCHIVE_PATH)))
+        predictor_cache['mtime'] = mtime
+    return predictor_cache['model']
+
+def _alliance(value):
+    teams = value.split(',') if isinstance(value, str) else list(value or [])
+    if not 1 <= len(teams) <= 2 or not all(str(t).isdigit() for t in teams):
+        raise ValueError(f"Invalid alliance: {value}")
+    return [int(t) for t in teams] + [0] * (2 - len(teams))
+
+@app.route('/api/predict', methods=['GET', 'POST'])
+@admitted(lambda req: 0.5 + _json_list_length('matches') / 1000)
+def predict_matches():
+    """
+    Win/tie/loss and bonus-RP probabilities.
+    GET ?red=a,b&blue=c,d for one match; POST {"matches": [{"red": [..], "blue": [..]}]} scores a schedule at once.
+    """
+    if not os.path.isdir(ARCHIVE_PATH):
+        return jsonify({'success': False, 'error': 'No match archive yet; run python -m src.archive'}), 503
+    try:
+        if request.method == 'GET':
+            matches = [{'red': _alliance(request.args.get('red', '')), 'blue': _alliance(request.args.get('blue', ''))}]
+        else:
+            matches = [{'red': _alliance(m.get('red')), 'blue': _alliance(m.get('blue'))}
+                       for m in (request.json or {}).get('matches', [])]
+    except (ValueError, AttributeError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    if not matches:
+        return jsonify({'success': False, 'error': 'No matches given'}), 400
+    model = _match_predictor()
+    batch = model.predict(np.array([m['red'] for m in matches]), np.array([m['blue'] for m in matches]))
+    predictions = []
+    for i, m in enumerate(matches):
+        entry = {'red': [str(t) for t in m['red'] if t], 'blue': [str(t) for t in m['blue'] if t]}
+        entry.update({k: None if np.isnan(v[i]) else round(float(v[i]), 4) for k, v in batch.items()})
+        predictions.append(entry)
+    if request.method == 'GET':
+        return jsonify(predictions[0])
+    return jsonify({'trained_matches': model.n_matches, 'predictions': predictions})
+
+@app.route('/api/schedule/generate', methods=['GET'])
+@admitted(lambda req: 0.2 + req.args.get('count', 200, type=int) / 1000)
+def generate_schedule():
+    """Best of `count` generated qualification schedules, as hypothetical matches (0-0 results)."""
+    try:
+        per_team = int(request.args.get('matches_per_team', 5))
+        min_gap = int(request.args.get('min_gap', 3))
+        count = int(request.args.get('count', 200))
+        seed = request.args.get('seed')
+        seed = int(seed) if seed is not None else None
+    except ValueError:
+        return jsonify({'success': False, 'error': 'matches_per_team, min_gap, count and seed must be integers'}), 400
+    if not 1 <= per_team <= 12 or min_gap < 0 or not 1 <= count <= 5000:
+        return jsonify({'success': False, 'error': 'matches_per_team must be 1-12, min_gap >= 0, count 1-5000'}), 400
+    generator = ScheduleGenerator(list(data_manager.teams), per_team, min_gap, seed)
+    schedule = generator.best_of(count)
+    return jsonify({'min_gap': generator.min_gap, 'quality': schedule.quality, 'matches': schedule.to_hypothetical()})
+
+def _ratings_payload():
+    engine = live_ratings.engine
+    return {
+        'version': data_manager.version,
+        'matches': engine.matches,
+        'teams': engine.snapshot({num: t.name for num, t in data_manager.teams.items()})
+    }
+
+@app.route('/api/ratings', methods=['GET'])
+def get_ratings():
+    """
+    Team ratings (rating, rd = uncertainty) for the current data version.
+    ?red=a,b&blue=c,d returns the rating-based chance that red wins instead.
+    """
+    red, blue = request.args.get('red'), request.args.get('blue')
+    if red or blue:
+        if not red or not blue:
+            return jsonify({'success': False, 'error': 'Give both red and blue'}), 400
+        p = live_ratings.engine.win_probability(red.split(','), blue.split(','))
+        return jsonify({'red': red.split(','), 'blue': blue.split(','), 'red_win': round(p, 4)})
+    ready = materializer.get('ratings')
+    if ready is not None:
+        return Response(ready, mimetype='application/json')
+    return jsonify(single_flight.do(('ratings', data_manager.version), _ratings_payload))
+
+ADVANCEMENT_COLUMNS = ['rank', 'number', 'name', 'qual_pts', 'alliance_pts', 'award_pts', 'playoff_pts',
+                       'total_ap', 'expected_playoff_pts', 'expected_total_ap']
+
+@app.route('/api/export/<table>.<fmt>', methods=['GET'])
+def export_table(table, fmt):
+    """
+    Stream standings, breakdowns, advancement or matches as CSV or NDJSON.
+    matches?source=archive[&season=] exports the full archived history instead of this event's matches.
+    """
+    if fmt not in FORMATS:
+        return jsonify({'success': False, 'error': f"Unknown format: {fmt}"}), 404
+    if table == 'standings':
+        getters = {k: v for k, v in TEAM_FIELDS.items() if k != 'breakdown'}
+        rows, columns = team_rows(ranking_pipeline.standings(), getters), list(getters)
+    elif table == 'breakdowns':
+        rows, columns = breakdown_rows(ranking_pipeline.standings(), ranking_calculator.match_breakdown), BREAKDOWN_COLUMNS
+    elif table == 'advancement':
+        rows, columns = _advancement_payload(), ADVANCEMENT_COLUMNS
+    elif table == 'matches' and request.args.get('source') == 'archive':
+        if not os.path.isdir(ARCHIVE_PATH):
+            return jsonify({'success': False, 'error': 'No match archive yet; run python -m src.archive'}), 503
+        season = request.args.get('season', type=int)
+        rows, columns = archive_match_rows(MatchArchive(ARCHIVE_PATH), season), ARCHIVE_MATCH_COLUMNS
+    elif table == 'matches':
+        rows, columns = match_rows(list(data_manager.matches)), MATCH_COLUMNS
+    else:
+        return jsonify({'success': False, 'error': f"Unknown table: {table}"}), 404
+    # No Content-Length, so the body goes out chunked as rows are produced
+    return Response(stream_with_context(stream_rows(rows, columns, fmt)), mimetype=FORMATS[fmt],
+                    headers={'Content-Disposition': f'attachment; filename={table}.{fmt}',
+                             'X-Accel-Buffering': 'no'})
+
+def _playoff_simulation_job(job, alliances, n_sims):
+    simulator = PlayoffSimulator(n_sims=n_sims)
+    job.report(0.1)
+    projection = simulator.simulate(alliances, data_manager.teams)
+    return projection
+
+def _hypothetical_builder(body):
+    # Teams and advancement inputs as they are at submission, so later edits don't change the job
+    teams = data_manager.get_all_teams_with_hypothetical(body['matches'])
+    advancement = copy.deepcopy({k: advancement_state[k] for k in ('alliance_selections', 'awards', 'playoff_results')})
+    return lambda job: _hypothetical_payload(body['matches'], job, teams=teams, advancement=advancement)
+
+MAX_PLAYOFF_SIMS = 200000
+
+def _playoff_simulation_builder(body):
+    try:
+        n_sims = int(body.get('n_sims', 100000))
+    except (TypeError, ValueError):
+        n_sims = 0
+    if n_sims < 1:
+        raise ValueError("n_sims must be a positive integer")
+    # Alliances as they are at submission; edits made while the job is queued don't change it
+    alliances = copy.deepcopy(advancement_state['detailed_alliances'])
+    return lambda job: _playoff_simulation_job(job, alliances, min(n_sims, MAX_PLAYOFF_SIMS))
+
+# Job type -> builder taking (request body) and returning fn(job), or raising ValueError for
+# a bad body; runs when the job is submitted
+JOB_TYPES = {
+    'hypothetical': _hypothetical_builder,
+    'playoff_simulation': _playoff_simulation_builder,
+}
+
+def _job_cost(req):
+    body = req.get_json(silent=True)
+    # A hypothetical job does the same work as the synchronous endpoint
+    if isinstance(body, dict) and body.get('type') == 'hypothetical':
+        return _hypothetical_cost(req)
+    return 0.2
+
+@app.route('/api/jobs', methods=['POST'])
+@admitted(_job_cost)
+def submit_job():
+    data = request.json or {}
+    kind = data.get('type')
+    if kind not in JOB_TYPES:
+        return jsonify({'success': False, 'error': f"Unknown job type: {kind}"}), 400
+    if kind == 'hypothetical':
+        matches, error = _hypothetical_matches(data)
+        if error:
+            return error
+        data = dict(data, matches=matches)
+    try:
+        job = job_queue.submit(kind, JOB_TYPES[kind](data))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except QueueFull as e:
+        return jsonify({'success': False, 'error': str(e)}), 503, {'Retry-After': '5'}
+    return jsonify({'success': True, 'job': job.to_dict()}), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET', 'DELETE'])
+def handle_job(job_id):
+    if request.method == 'DELETE':
+        return jsonify({'success': job_queue.cancel(job_id)})
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found or expired'}), 404
+    return jsonify(job.to_dict())
+
+# Standard read views, precomputed by the producer on every change so requests only look up bytes
+register_view('teams', _teams_payload)
+register_view('advancement_calc', _advancement_payload, group='advancement')
+register_view('ratings', _ratings_payload)
+for _category in MATCH_CATEGORIES:
+    register_view(f'matches/{_category}', lambda c=_category: _matches_payload(c))
+for _meet_id in _load_meets_data():
+    register_view(f'meets/{_meet_id}', lambda m=_meet_id: _load_meets_data().get(m, []), group='files')
+refresh_forecasts()
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', debug=True, port=5001)
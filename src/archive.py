@@ -0,0 +1,415 @@
+"""
+Columnar match archive: every match stored once, in typed numpy columns that are
+memory-mapped on load.
+
+Layout of an archive directory:
+    meta.json           format, events [{code, season, prefix, kind, end}], labels
+    <column>.npy        one file per column, row i = match i
+    team_*.npy          CSR index from team number to the rows that team played
+
+Columns (alliance pairs are [red, blue], team slots are [red1, red2, blue1, blue2]):
+    event, match_num     int32
+    teams                int32 (n, 4), 0 = empty slot
+    surrogate            bool  (n, 4)
+    score, np_score, auto, dc, rp     int32 (n, 2); -1 = unknown
+    rp_components        int8  (n, 2, 3) movement/goal/pattern RP; -1 = unknown
+
+    python -m src.archive legacy        # meets_data.json + tournament_matches.json
+    python -m src.archive crawl crawl_events.ndjson 2025
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+from typing import List, Dict, Optional, Iterator, Tuple
+import numpy as np
+from src.rules import SeasonRules, rules_for
+
+FORMAT = 1
+COLUMNS = ['event', 'match_num', 'teams', 'surrogate', 'score', 'np_score', 'auto', 'dc', 'rp', 'rp_components']
+# dtype and per-row shape of each column
+COLUMN_TYPES = {
+    'event': (np.int32, ()), 'match_num': (np.int32, ()), 'teams': (np.int32, (4,)), 'surrogate': (bool, (4,)),
+    'score': (np.int32, (2,)), 'np_score': (np.int32, (2,)), 'auto': (np.int32, (2,)), 'dc': (np.int32, (2,)),
+    'rp': (np.int32, (2,)), 'rp_components': (np.int8, (2, 3)),
+}
+INDEX = ['team_ids', 'team_offsets', 'team_rows', 'team_slots']
+RP_KEYS = ['movementRp', 'goalRp', 'patternRp']
+ITER_BLOCK = 4096
+
+def _alliance_stats(scores: Optional[Dict], side: str, opp: str,
+                    rules: SeasonRules) -> Tuple[int, int, int, int, int, List[int]]:
+    """(score, np_score, auto, dc, rp, rp_components) for one alliance of a raw FTCScout match."""
+    if not scores:
+        return 0, -1, -1, -1, 0, [-1, -1, -1]
+    own, other = scores[side], scores[opp]
+    total = own['totalPoints']
+    components = [int(own.get(k, 0)) for k in RP_KEYS]
+    penalty = own.get('penaltyPointsByOpp')
+    return (total, total - penalty if penalty is not None else -1,
+            own.get('autoPoints', -1), own.get('dcPoints', -1), rules.match_rp(total, other['totalPoints'], own),
+            components)
+
+class ArchiveBuilder:
+    """
+    Collects matches for an archive. Rows are appended to one raw file per column every
+    FLUSH_ROWS matches, so memory stays flat however many are added; write() orders them
+    with a permutation computed from the event and match_num columns alone.
+    """
+    FLUSH_ROWS = 4096
+
+    def __init__(self, spool_dir: Optional[str] = None):
+        self.events: List[Dict] = []
+        self._event_index: Dict[Tuple[int, str], int] = {}
+        self.labels: Dict[int, str] = {}
+        self.n_rows = 0
+        self._pending: List[Tuple] = []
+        self._spool_dir = spool_dir
+        self._spool: Optional[tempfile.TemporaryDirectory] = None
+
+    def add_event(self, code: str, season: int, prefix: str, kind: str = 'league',
+                  end: Optional[str] = None) -> int:
+        key = (season, code)
+        if key not in self._event_index:
+            self._event_index[key] = len(self.events)
+            self.events.append({'code': code, 'season': season, 'prefix': prefix, 'kind': kind, 'end': end})
+        elif end is not None:
+            self.events[self._event_index[key]]['end'] = end
+        return self._event_index[key]
+
+    def add_match(self, event: int, match_num: int, teams: List[str], score: List[int], rp: List[int],
+                  surrogate: List[bool] = None, np_score: List[int] = None, auto: List[int] = None,
+                  dc: List[int] = None, rp_components: List[List[int]] = None, label: str = None):
+        """teams/surrogate are [red1, red2, blue1, blue2]; the rest are [red, blue]."""
+        if label is not None:
+            self.labels[self.n_rows] = label
+        self._pending.append((
+            event, match_num,
+            [int(t) if t else 0 for t in teams],
+            surrogate or [False] * 4,
+            score, np_score or [-1, -1], auto or [-1, -1], dc or [-1, -1], rp,
+            rp_components or [[-1, -1, -1], [-1, -1, -1]]
+        ))
+        self.n_rows += 1
+        if len(self._pending) >= self.FLUSH_ROWS:
+            self._flush()
+
+    def add_raw_match(self, event: int, raw: Dict):
+        """A match object as returned by the FTCScout API (see graphql_client.MATCH_SELECTION)."""
+        slots = {'Red': [], 'Blue': []}
+        for t in raw['teams']:
+            slots[t['alliance']].append(t)
+        red, blue = (slots['Red'] + [None, None])[:2], (slots['Blue'] + [None, None])[:2]
+        stations = red + blue
+        rules = rules_for(self.events[event]['season'])
+        r = _alliance_stats(raw.get('scores'), 'red', 'blue', rules)
+        b = _alliance_stats(raw.get('scores'), 'blue', 'red', rules)
+        self.add_match(
+            event, raw['matchNum'],
+            teams=[t['teamNumber'] if t else 0 for t in stations],
+            surrogate=[bool(t and t.get('surrogate')) for t in stations],
+            score=[r[0], b[0]], np_score=[r[1], b[1]], auto=[r[2], b[2]], dc=[r[3], b[3]],
+            rp=[r[4], b[4]], rp_components=[r[5], b[5]]
+        )
+
+    def extend_from(self, archive: 'MatchArchive', skip_events=()):
+        """Copy rows of an existing archive, except events whose (season, code) is in skip_events."""
+        skip = set(skip_events)
+        mapping = {}
+        for i, ev in enumerate(archive.events):
+            if (ev['season'], ev['code']) not in skip:
+                mapping[i] = self.add_event(ev['code'], ev['season'], ev['prefix'], ev['kind'], ev['end'])
+        for row in range(len(archive)):
+            event = int(archive.event[row])
+            if event in mapping:
+                self.add_match(
+                    mapping[event], int(archive.match_num[row]), archive.teams[row].tolist(),
+                    archive.score[row].tolist(), archive.rp[row].tolist(),
+                    surrogate=archive.surrogate[row].tolist(), np_score=archive.np_score[row].tolist(),
+                    auto=archive.auto[row].tolist(), dc=archive.dc[row].tolist(),
+                    rp_components=archive.rp_components[row].tolist(), label=archive.labels.get(row)
+                )
+
+    def _flush(self):
+        """Append the pending rows to the spooled columns."""
+        if not self._pending:
+            return
+        if self._spool is None:
+            self._spool = tempfile.TemporaryDirectory(prefix='archive-spool-', dir=self._spool_dir)
+        for i, name in enumerate(COLUMNS):
+            dtype, shape = COLUMN_TYPES[name]
+            block = np.array([r[i] for r in self._pending], dtype=dtype).reshape((len(self._pending),) + shape)
+            with open(os.path.join(self._spool.name, name + '.bin'), 'ab') as f:
+                block.tofile(f)
+        self._pending = []
+
+    def _column(self, name: str) -> np.ndarray:
+        dtype, shape = COLUMN_TYPES[name]
+        if self.n_rows == 0:
+            return np.empty((0,) + shape, dtype=dtype)
+        return np.memmap(os.path.join(self._spool.name, name + '.bin'), dtype=dtype, mode='r',
+                         shape=(self.n_rows,) + shape)
+
+    def close(self):
+        """Drop the spooled rows (also done when the builder is garbage collected)."""
+        self._pending = []
+        if self._spool is not None:
+            self._spool.cleanup()
+            self._spool = None
+        self.n_rows = 0
+        self.labels = {}
+
+    def write(self, path: str) -> int:
+        """Write the archive directory atomically. Returns the number of matches."""
+        self._flush()
+        n = self.n_rows
+        # Events chronologically: season, then end date; undated events (still in progress)
+        # after the dated ones of their season, in insertion order
+        order = sorted(range(len(self.events)),
+                       key=lambda i: (self.events[i]['season'], self.events[i]['end'] is None, self.events[i]['end'] or ''))
+        events = [self.events[i] for i in order]
+        new_index = np.empty(len(order), dtype=np.int32)
+        new_index[order] = np.arange(len(order), dtype=np.int32)
+        event = new_index[self._column('event')] if n else np.empty(0, dtype=np.int32)
+        # Rows by event, then match number, then insertion (lexsort is stable)
+        rows = np.lexsort((self._column('match_num'), event))
+        position = np.empty(n, dtype=np.int64)
+        position[rows] = np.arange(n)
+        labels = {int(position[old]): label for old, label in self.labels.items()}
+
+        tmp = path + '.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        for name in COLUMNS:
+            dtype, shape = COLUMN_TYPES[name]
+            source = event if name == 'event' else self._column(name)
+            out = np.lib.format.open_memmap(os.path.join(tmp, name + '.npy'), mode='w+', dtype=dtype,
+                                            shape=(n,) + shape)
+            # Permute in blocks so no column is read into memory whole
+            for i in range(0, n, ITER_BLOCK):
+                out[i:i + ITER_BLOCK] = source[rows[i:i + ITER_BLOCK]]
+            out.flush()
+            del out
+        teams = np.load(os.path.join(tmp, 'teams.npy'), mmap_mode='r')
+        for name, array in build_team_index(teams).items():
+            np.save(os.path.join(tmp, name + '.npy'), array)
+        del teams
+        with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+            json.dump({'format': FORMAT, 'n_matches': n, 'events': events,
+                       'labels': {str(k): v for k, v in labels.items()}}, f, indent=1)
+        # Swap directories; readers holding the old mapping keep their (unlinked) files
+        old = path + '.old'
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(path):
+            os.rename(path, old)
+        os.rename(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+        return n
+
+def build_team_index(teams: np.ndarray) -> Dict[str, np.ndarray]:
+    """CSR index: rows of team_ids[i] are team_rows[team_offsets[i]:team_offsets[i+1]]."""
+    flat = teams.reshape(-1)
+    rows = np.repeat(np.arange(len(teams), dtype=np.int32), 4)
+    slots = np.tile(np.arange(4, dtype=np.int8), len(teams))
+    present = flat != 0
+    flat, rows, slots = flat[present], rows[present], slots[present]
+    order = np.lexsort((rows, flat))
+    flat, rows, slots = flat[order], rows[order], slots[order]
+    team_ids, starts = np.unique(flat, return_index=True)
+    offsets = np.append(starts, len(flat)).astype(np.int64)
+    return {'team_ids': team_ids.astype(np.int32), 'team_offsets': offsets,
+            'team_rows': rows.astype(np.int32), 'team_slots': slots.astype(np.int8)}
+
+class MatchArchive:
+    """Read-only, memory-mapped view of an archive directory."""
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), 'r') as f:
+            meta = json.load(f)
+        if meta['format'] != FORMAT:
+            raise ValueError(f"Unsupported archive format {meta['format']}")
+        self.events: List[Dict] = meta['events']
+        self.labels: Dict[int, str] = {int(k): v for k, v in meta.get('labels', {}).items()}
+        for name in COLUMNS + INDEX:
+            setattr(self, name, np.load(os.path.join(path, name + '.npy'), mmap_mode='r'))
+
+    def __len__(self) -> int:
+        return len(self.event)
+
+    def match_id(self, row: int) -> str:
+        if row in self.labels:
+            return self.labels[row]
+        return f"{self.events[int(self.event[row])]['prefix']}-Q{int(self.match_num[row])}"
+
+    def event_rows(self, event: int) -> np.ndarray:
+        """Rows of one event; rows are stored grouped by event."""
+        return np.arange(*np.searchsorted(self.event, [event, event + 1]))
+
+    def team_view(self, team: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows, slots) for every match a team played, in chronological order."""
+        i = np.searchsorted(self.team_ids, int(team))
+        if i >= len(self.team_ids) or self.team_ids[i] != int(team):
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int8)
+        start, end = self.team_offsets[i], self.team_offsets[i + 1]
+        return self.team_rows[start:end], self.team_slots[start:end]
+
+    def team_column(self, team: str, column: str) -> np.ndarray:
+        """A per-alliance column (score, np_score, auto, dc, rp) seen from the team's side."""
+        rows, slots = self.team_view(team)
+        return getattr(self, column)[rows, slots // 2]
+
+    def team_performances(self, team: str, kinds=('league',), season: Optional[int] = None) -> List[Dict]:
+        """Per-match records in the shape DataManager keeps in Team._ftc_performances."""
+        rows, slots = self.team_view(team)
+        perfs = []
+        for row, slot in zip(rows.tolist(), slots.tolist()):
+            event = self.events[int(self.event[row])]
+            if event['kind'] not in kinds or (season is not None and event['season'] != season):
+                continue
+            surrogate = bool(self.surrogate[row, slot])
+            perfs.append({
+                'match_id': self.match_id(row),
+                # Surrogate appearances count for nothing (as in fetch_ftcscout_data.calculate_match_rp)
+                'rp': 0 if surrogate else int(self.rp[row, slot // 2]),
+                'score': 0 if surrogate else int(self.score[row, slot // 2]),
+                'is_surrogate': surrogate
+            })
+        return perfs
+
+    def latest_season(self, kind: str = 'league') -> Optional[int]:
+        seasons = [e['season'] for e in self.events if e['kind'] == kind]
+        return max(seasons) if seasons else None
+
+    def iter_matches(self, season: Optional[int] = None) -> Iterator[Dict]:
+        """Matches in chronological order, e.g. to replay through a rating engine."""
+        rows = np.arange(len(self))
+        if season is not None:
+            wanted = [i for i, e in enumerate(self.events) if e['season'] == season]
+            rows = rows[np.isin(self.event, wanted)]
+        # One bulk conversion per column and block instead of per-element numpy access;
+        # blocks keep memory flat for exports of the whole archive
+        for start in range(0, len(rows), ITER_BLOCK):
+            block = rows[start:start + ITER_BLOCK]
+            events, teams = self.event[block].tolist(), self.teams[block].tolist()
+            scores, np_scores = self.score[block].tolist(), self.np_score[block].tolist()
+            rps, surrogates = self.rp[block].tolist(), self.surrogate[block].tolist()
+            for i, row in enumerate(block.tolist()):
+                event = self.events[events[i]]
+                yield {
+                    'match_id': self.match_id(row),
+                    'event': event['code'],
+                    'season': event['season'],
+                    'kind': event['kind'],
+                    'red': [str(t) for t in teams[i][:2] if t],
+                    'blue': [str(t) for t in teams[i][2:] if t],
+                    'red_score': scores[i][0],
+                    'blue_score': scores[i][1],
+                    'red_np': np_scores[i][0],
+                    'blue_np': np_scores[i][1],
+                    'red_rp': rps[i][0],
+                    'blue_rp': rps[i][1],
+                    'surrogates': [str(t) for t, s in zip(teams[i], surrogates[i]) if t and s]
+                }
+
+    def event_opr(self, event: int, column: str = 'score') -> Dict[str, float]:
+        """Least-squares offensive power rating of each team at one event."""
+        rows = self.event_rows(event)
+        values = getattr(self, column)[rows]
+        teams = self.teams[rows]
+        keep = (values >= 0).all(axis=1)
+        rows, values, teams = rows[keep], values[keep], teams[keep]
+        team_ids = np.unique(teams[teams != 0])
+        if len(team_ids) == 0:
+            return {}
+        a = np.zeros((2 * len(rows), len(team_ids)))
+        col = np.searchsorted(team_ids, teams)
+        for side in range(2):
+            for slot in (2 * side, 2 * side + 1):
+                present = teams[:, slot] != 0
+                a[np.flatnonzero(present) * 2 + side, col[present, slot]] = 1
+        b = values.reshape(-1).astype(float)
+        opr = np.linalg.lstsq(a, b, rcond=None)[0]
+        return {str(t): float(v) for t, v in zip(team_ids.tolist(), opr)}
+
+    def opr_trend(self, team: str, column: str = 'np_score', kind: str = 'league',
+                  season: Optional[int] = None) -> List[Tuple[str, float]]:
+        """[(event_code, opr)] for each event of `kind` the team played, in order."""
+        rows, _ = self.team_view(team)
+        events = sorted(set(self.event[rows].tolist()))
+        trend = []
+        for event in events:
+            ev = self.events[event]
+            if ev['kind'] == kind and (season is None or ev['season'] == season):
+                trend.append((ev['code'], self.event_opr(event, column).get(str(team), 0.0)))
+        return trend
+
+def predict_next(values: List[float]) -> float:
+    """Linear trend over the non-zero points, extrapolated one step (predictNextMeet in docs/)."""
+    points = [(i + 1, v) for i, v in enumerate(values) if v > 0]
+    if len(points) < 2:
+        return points[0][1] if points else 0.0
+    x, y = np.array(points, dtype=float).T
+    slope, intercept = np.polyfit(x, y, 1)
+    return max(0.0, float(slope * (len(values) + 1) + intercept))
+
+def build_from_legacy(meets: List[Tuple[str, str]], season: int = 2025,
+                      meets_path: str = 'meets_data.json', performances_path: str = 'ftcscout_data.json',
+                      tournament_path: str = 'tournament_matches.json') -> ArchiveBuilder:
+    """Convert the pretty-printed JSON files into one archive (surrogates come from ftcscout_data.json)."""
+    builder = ArchiveBuilder()
+    surrogates = set()
+    try:
+        with open(performances_path, 'r') as f:
+            for team, perfs in json.load(f)['team_performances'].items():
+                surrogates.update((team, p['match_id']) for p in perfs if p.get('surrogate'))
+    except FileNotFoundError:
+        pass
+
+    with open(meets_path, 'r') as f:
+        meets_data = json.load(f)
+    for (code, prefix), key in zip(meets, sorted(meets_data)):
+        event = builder.add_event(code, season, prefix, 'league')
+        for m in meets_data[key]:
+            teams = m['red'] + m['blue']
+            match_id = f"{prefix}-Q{m['match_num']}"
+            builder.add_match(event, m['match_num'], teams, [m['red_score'], m['blue_score']],
+                              [m['red_rp'], m['blue_rp']],
+                              surrogate=[(t, match_id) in surrogates for t in teams])
+
+    if os.path.exists(tournament_path):
+        with open(tournament_path, 'r') as f:
+            tournament = json.load(f)
+        event = builder.add_event('TOURNAMENT', season, 'T', 'tournament')
+        for i, m in enumerate(tournament):
+            builder.add_match(event, i + 1, m['red_alliance'] + m['blue_alliance'],
+                              [m['red_score'], m['blue_score']], [m['red_rp'], m['blue_rp']],
+                              label=m['match_id'])
+    return builder
+
+def build_from_crawl(events_path: str, season: int, league_meets: List[Tuple[str, str]] = ()) -> ArchiveBuilder:
+    """Convert src.crawler's NDJSON output (one event per line, raw matches)."""
+    league = dict(league_meets)
+    builder = ArchiveBuilder()
+    with open(events_path, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            ev = json.loads(line)
+            kind = 'league' if ev['code'] in league else 'event'
+            event = builder.add_event(ev['code'], season, league.get(ev['code'], ev['code']), kind, ev.get('end'))
+            for raw in ev.get('matches') or []:
+                builder.add_raw_match(event, raw)
+    return builder
+
+if __name__ == '__main__':
+    from src.data_manager import ARCHIVE_PATH
+    from src.ingest import LEAGUE_MEETS
+    if len(sys.argv) > 1 and sys.argv[1] == 'crawl':
+        builder = build_from_crawl(sys.argv[2], int(sys.argv[3]), LEAGUE_MEETS)
+        if os.path.isdir(ARCHIVE_PATH):
+            # Keep other seasons and events; re-crawled events replace their old rows
+            builder.extend_from(MatchArchive(ARCHIVE_PATH), [(e['season'], e['code']) for e in builder.events])
+    else:
+        builder = build_from_legacy(LEAGUE_MEETS)
+    print(f"Wrote {builder.write(ARCHIVE_PATH)} matches to {ARCHIVE_PATH}/")
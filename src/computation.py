@@ -0,0 +1,158 @@
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight computations.
+    The first caller for a key runs the function; callers arriving while it runs
+    wait for and share its result (or its exception).
+    """
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error: Optional[BaseException] = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, 'SingleFlight._Call'] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = SingleFlight._Call()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+class JobCancelled(Exception):
+    pass
+
+class QueueFull(Exception):
+    pass
+
+class Job:
+    def __init__(self, job_id: str, kind: str):
+        self.id = job_id
+        self.kind = kind
+        self.status = 'queued'  # queued -> running -> done | failed | cancelled
+        self.progress = 0.0
+        self.result = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self._cancel = threading.Event()
+
+    def report(self, progress: float):
+        """Called by the task to publish progress; also the cancellation checkpoint."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.progress = max(0.0, min(1.0, progress))
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def to_dict(self, include_result: bool = True) -> Dict:
+        data = {
+            'id': self.id,
+            'type': self.kind,
+            'status': self.status,
+            'progress': round(self.progress, 3),
+            'error': self.error,
+        }
+        if include_result and self.status == 'done':
+            data['result'] = self.result
+        return data
+
+class JobQueue:
+    """
+    Bounded background worker pool for long tasks (simulations, exports, bulk recomputes).
+    Tasks run on their own threads so WSGI request threads only submit and poll.
+    Finished jobs are kept for result_ttl seconds.
+    """
+    def __init__(self, max_workers: int = 2, max_pending: int = 16, result_ttl: float = 600):
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def submit(self, kind: str, fn: Callable[[Job], object]) -> Job:
+        """fn receives the Job and should call job.report(progress) as it goes."""
+        with self._lock:
+            self._purge_expired()
+            pending = sum(1 for j in self._jobs.values() if j.status in ('queued', 'running'))
+            if pending >= self.max_pending:
+                raise QueueFull(f"{pending} jobs already pending")
+            job = Job(f"{kind}-{next(self._ids)}", kind)
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job: Job, fn: Callable[[Job], object]):
+        if job.cancelled:
+            self._finish(job, 'cancelled')
+            return
+        job.status = 'running'
+        try:
+            job.result = fn(job)
+            job.progress = 1.0
+            self._finish(job, 'done')
+        except JobCancelled:
+            self._finish(job, 'cancelled')
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, 'failed')
+
+    def _finish(self, job: Job, status: str):
+        job.status = status
+        job.finished = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._purge_expired()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation. Queued jobs never start; running jobs stop at their next report()."""
+        job = self.get(job_id)
+        if job is None or job.status not in ('queued', 'running'):
+            return False
+        job._cancel.set()
+        if job.status == 'queued':
+            self._finish(job, 'cancelled')
+        return True
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [jid for jid, j in self._jobs.items()
+                   if j.finished is not None and now - j.finished > self.result_ttl]
+        for jid in expired:
+            del self._jobs[jid]
@@ -0,0 +1,120 @@
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional
+from src.graphql_client import BatchQuery, execute, fetch_events, MATCH_SELECTION
+
+EVENTS_SEARCH_SELECTION = "{ code name start end type }"
+
+CRAWL_EVENT_SELECTION = """{
+    code name start end
+    teams { teamNumber team { name city stateProv country } }
+    matches {%s}
+}""" % MATCH_SELECTION
+
+class RegionCrawler:
+    """
+    Discovers every event of a region/season, then pulls teams and matches for them
+    in aliased batches with at most `concurrency` requests in flight.
+    Progress is checkpointed after each batch so an interrupted crawl resumes where it stopped.
+
+    Outputs:
+      events_path  - one JSON line per crawled event (code, name, dates, matches)
+      roster_path  - [{number, name, location}] for every team seen, loadable by DataManager
+    """
+    def __init__(self, season: int, region: str, checkpoint_path: str = 'crawl_checkpoint.json',
+                 events_path: str = 'crawl_events.ndjson', roster_path: Optional[str] = None,
+                 concurrency: int = 4, batch_size: int = 10, session=None):
+        self.season = season
+        self.region = region
+        self.checkpoint_path = checkpoint_path
+        self.events_path = events_path
+        self.roster_path = roster_path
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.session = session
+        self._lock = threading.Lock()
+        self.state = self._load_checkpoint()
+
+    def _load_checkpoint(self) -> Dict:
+        try:
+            with open(self.checkpoint_path, 'r') as f:
+                state = json.load(f)
+            if state.get('season') == self.season and state.get('region') == self.region:
+                return state
+            print("Checkpoint is for a different season/region; starting over")
+        except FileNotFoundError:
+            pass
+        return {'season': self.season, 'region': self.region, 'events': None, 'done': [], 'teams': {}}
+
+    def _save_checkpoint(self):
+        tmp = self.checkpoint_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.checkpoint_path)
+
+    def discover_events(self) -> List[str]:
+        """Event codes for the region/season (cached in the checkpoint)."""
+        if self.state['events'] is None:
+            batch = BatchQuery()
+            alias = batch.add('eventsSearch', {'season': ('Int!', self.season),
+                                               'region': ('RegionOption', self.region)},
+                              EVENTS_SEARCH_SELECTION)
+            events = execute(batch, self.session).get(alias)
+            if not events:
+                # Not checkpointed, so the next run tries the discovery again
+                print(f"No events found for {self.region} {self.season}")
+                return []
+            self.state['events'] = sorted(e['code'] for e in events)
+            self._save_checkpoint()
+        return self.state['events']
+
+    def _record(self, events: Dict[str, Dict]):
+        with self._lock:
+            with open(self.events_path, 'a') as f:
+                for code, event in events.items():
+                    f.write(json.dumps(event, separators=(',', ':')) + '\n')
+                    for entry in event.get('teams') or []:
+                        team = entry.get('team') or {}
+                        location = ", ".join(p for p in (team.get('city'), team.get('stateProv'), team.get('country')) if p)
+                        self.state['teams'][str(entry['teamNumber'])] = {
+                            'number': str(entry['teamNumber']),
+                            'name': team.get('name', ''),
+                            'location': location
+                        }
+            self.state['done'].extend(events.keys())
+            self._save_checkpoint()
+
+    def run(self) -> Dict:
+        done = set(self.state['done'])
+        pending = [c for c in self.discover_events() if c not in done]
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        print(f"{len(done)} events already crawled, {len(pending)} to go in {len(batches)} batches")
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {pool.submit(fetch_events, codes, self.season, CRAWL_EVENT_SELECTION,
+                                   self.session, max_aliases=self.batch_size): codes for codes in batches}
+            for future in as_completed(futures):
+                try:
+                    self._record(future.result())
+                except Exception as e:
+                    # Left out of 'done', so the next run retries them
+                    print(f"Error crawling {futures[future]}: {e}")
+
+        if self.roster_path:
+            self.write_roster(self.roster_path)
+        return self.state
+
+    def write_roster(self, path: str):
+        roster = sorted(self.state['teams'].values(), key=lambda t: int(t['number']))
+        with open(path, 'w') as f:
+            json.dump(roster, f, indent=2)
+        print(f"Saved {len(roster)} teams to {path}")
+
+if __name__ == "__main__":
+    # python -m src.crawler <season> <region> [roster_path]
+    season, region = int(sys.argv[1]), sys.argv[2]
+    roster = sys.argv[3] if len(sys.argv) > 3 else 'teams_roster.json'
+    RegionCrawler(season, region, roster_path=roster).run()
@@ -1,6 +1,15 @@
+import os
 import re
 import json
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Callable, Set
+from src.archive import MatchArchive
+
+# Written by src.ingest; preferred over the legacy ftcscout_data.json when present
+PERFORMANCES_PATH = 'ftcscout_performances.ndjson'
+# Written by src.crawler; replaces the built-in roster when present
+ROSTER_PATH = 'teams_roster.json'
+# Columnar match archive (src.archive); preferred over both of the above when present
+ARCHIVE_PATH = 'match_archive'
 
 class Match:
     def __init__(self, match_id: str, red_alliance: List[str], blue_alliance: List[str], 
@@ -54,6 +63,9 @@ class DataManager:
     def __init__(self):
         self.teams: Dict[str, Team] = {}
         self.matches: List[Match] = []
+        # Bumped on every change to match data; used to key cached computations
+        self.version = 0
+        self._listeners: List[Callable[[str, Set[str], Dict], None]] = []
         self._initialize_teams()
         self._load_ftcscout_data()
         self._load_tournament_data()
@@ -61,8 +73,33 @@ class DataManager:
     def reload_ftc_data(self):
         """Reloads the FTC scout data from file."""
         self._load_ftcscout_data()
+        self._changed('ftc_reloaded', set(self.teams))
+
+    def subscribe(self, callback: Callable[[str, Set[str], Dict], None]):
+        """
+        Register callback(event, team_numbers, payload), called after every change to match data.
+        payload carries the Match for 'match_added' and the match_id for 'match_deleted'.
+        Other events: 'matches_imported', 'tournament_cleared', 'ftc_reloaded' and
+        'tournament_reloaded' (matches saved by another process).
+        """
+        self._listeners.append(callback)
+
+    def _changed(self, event: str, team_numbers: Set[str], payload: Dict = None):
+        self.version += 1
+        for callback in self._listeners:
+            callback(event, team_numbers, payload or {})
         
     def _initialize_teams(self):
+        # A roster written by src.crawler replaces the built-in league list
+        if os.path.exists(ROSTER_PATH):
+            try:
+                with open(ROSTER_PATH, 'r') as f:
+                    for t in json.load(f):
+                        self.teams[str(t['number'])] = Team(str(t['number']), t['name'], t.get('location', ''))
+                return
+            except Exception as e:
+                print(f"Error loading {ROSTER_PATH}: {e}")
+                self.teams = {}
         team_data = [
             ("5214", '"B.R.O." (Bot Resources Operation)', "Dublin, CA, USA"),
             ("11920", "QLS RaD Team", "Dublin, CA, USA"),
@@ -84,6 +121,11 @@ class DataManager:
 
     def _load_ftcscout_data(self):
         """Load real match data from FTCScout API fetch results."""
+        if os.path.isdir(ARCHIVE_PATH) and self._load_archive():
+            return
+        if os.path.exists(PERFORMANCES_PATH):
+            self._load_performance_stream()
+            return
         try:
             with open('ftcscout_data.json', 'r') as f:
                 data = json.load(f)
@@ -104,21 +146,56 @@ class DataManager:
                         'is_surrogate': perf['surrogate']
                     })
 
+    def _load_performance_stream(self):
+        """Load compact NDJSON performances written by src.ingest, one record per line."""
+        performances: Dict[str, List[Dict]] = {num: [] for num in self.teams}
+        try:
+            with open(PERFORMANCES_PATH, 'r') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    perf = json.loads(line)
+                    if perf['team'] in performances:
+                        performances[perf['team']].append({
+                            'match_id': perf['match_id'],
+                            'rp': perf['rp'],
+                            'score': perf['score'],
+                            'is_surrogate': perf['surrogate']
+                        })
+        except Exception as e:
+            print(f"Error loading {PERFORMANCES_PATH}: {e}")
+            return
+        for num, perfs in performances.items():
+            self.teams[num]._ftc_performances = perfs
+
+    def _load_archive(self) -> bool:
+        """Load league performances of the latest season from the memory-mapped archive."""
+        try:
+            archive = MatchArchive(ARCHIVE_PATH)
+        except Exception as e:
+            print(f"Error loading {ARCHIVE_PATH}: {e}")
+            return False
+        season = archive.latest_season()
+        if season is None:
+            return False
+        for num, team in self.teams.items():
+            team._ftc_performances = archive.team_performances(num, season=season)
+        return True
+
+    def _tournament_rows(self) -> List[Dict]:
+        return [{
+            'match_id': m.match_id,
+            'red_alliance': m.red_alliance,
+            'blue_alliance': m.blue_alliance,
+            'red_score': m.red_score,
+            'blue_score': m.blue_score,
+            'red_rp': m.red_rp,
+            'blue_rp': m.blue_rp
+        } for m in self.matches if m.match_type == "TOURNAMENT"]
+
     def _save_tournament_data(self):
         """Save tournament matches to a file."""
-        tournament_matches = [m for m in self.matches if m.match_type == "TOURNAMENT"]
-        data = []
-        for m in tournament_matches:
-            data.append({
-                'match_id': m.match_id,
-                'red_alliance': m.red_alliance,
-                'blue_alliance': m.blue_alliance,
-                'red_score': m.red_score,
-                'blue_score': m.blue_score,
-                'red_rp': m.red_rp,
-                'blue_rp': m.blue_rp
-            })
-        
+        data = self._tournament_rows()
         try:
             with open('tournament_matches.json', 'w') as f:
                 json.dump(data, f, indent=4)
@@ -144,28 +221,127 @@ class DataManager:
         except Exception as e:
             print(f"Error loading tournament data: {e}")
 
+    def reload_tournament_data(self) -> bool:
+        """
+        Re-read tournament matches another process saved. Returns False, without
+        notifying listeners, when the file holds the matches already loaded.
+        """
+        try:
+            with open('tournament_matches.json', 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = []
+        except Exception as e:
+            print(f"Error loading tournament data: {e}")
+            return False
+        if data == self._tournament_rows():
+            return False
+        affected = set()
+        for m in self.get_tournament_matches():
+            affected.update(m.red_alliance + m.blue_alliance)
+        self.matches = [m for m in self.matches if m.match_type != "TOURNAMENT"]
+        for team in self.teams.values():
+            team.matches = [m for m in team.matches if m.match_type != "TOURNAMENT"]
+        for item in data:
+            match = Match(item['match_id'], item['red_alliance'], item['blue_alliance'],
+                          item['red_score'], item['blue_score'], item['red_rp'], item['blue_rp'],
+                          match_type="TOURNAMENT")
+            self.matches.append(match)
+            for team_num in match.red_alliance + match.blue_alliance:
+                if team_num in self.teams:
+                    self.teams[team_num].add_match(match)
+                affected.add(team_num)
+        self._changed('tournament_reloaded', affected)
+        return True
+
     def add_tournament_match(self, match_id, r1, r2, b1, b2, rs, bs, rrp, brp, save=True):
         match = Match(match_id, [r1, r2], [b1, b2], rs, bs, rrp, brp, match_type="TOURNAMENT")
         self.matches.append(match)
         for team_num in [r1, r2, b1, b2]:
             if team_num in self.teams:
                 self.teams[team_num].add_match(match)
+        self._changed('match_added', {r1, r2, b1, b2}, {'match': match})
         
         if save:
             self._save_tournament_data()
 
+    def parse_match_row(self, row: Dict) -> Match:
+        """Validate one {match_id, r1, r2, b1, b2, rs, bs, rrp, brp} row. Raises ValueError."""
+        missing = [k for k in ('match_id', 'r1', 'r2', 'b1', 'b2', 'rs', 'bs', 'rrp', 'brp')
+                   if row.get(k) in (None, '')]
+        if missing:
+            raise ValueError(f"Missing fields: {', '.join(missing)}")
+        match_id = str(row['match_id']).strip()
+        team_nums = [str(row[k]).strip() for k in ('r1', 'r2', 'b1', 'b2')]
+        unknown = [t for t in team_nums if t not in self.teams]
+        if unknown:
+            raise ValueError(f"Unknown teams: {', '.join(unknown)}")
+        if len(set(team_nums)) != 4:
+            raise ValueError("A team appears twice in the match")
+        try:
+            rs, bs, rrp, brp = (int(row[k]) for k in ('rs', 'bs', 'rrp', 'brp'))
+        except (TypeError, ValueError):
+            raise ValueError("Scores and RPs must be integers")
+        if min(rs, bs, rrp, brp) < 0:
+            raise ValueError("Scores and RPs must not be negative")
+        return Match(match_id, team_nums[:2], team_nums[2:], rs, bs, rrp, brp, match_type="TOURNAMENT")
+
+    def add_tournament_matches(self, rows: List[Dict]) -> List[Dict]:
+        """
+        Bulk import: validates every row first and only applies them if all are valid,
+        then saves once and notifies listeners once.
+        Returns a list of {'row': index, 'error': message}; empty means the import was applied.
+        """
+        errors = []
+        parsed = []
+        seen_ids = set(m.match_id for m in self.matches)
+        for i, row in enumerate(rows):
+            try:
+                match = self.parse_match_row(row)
+            except ValueError as e:
+                errors.append({'row': i, 'error': str(e)})
+                continue
+            if match.match_id in seen_ids:
+                errors.append({'row': i, 'error': f"Duplicate match_id {match.match_id}"})
+                continue
+            seen_ids.add(match.match_id)
+            parsed.append(match)
+
+        if errors:
+            return errors
+
+        affected = set()
+        for match in parsed:
+            self.matches.append(match)
+            for team_num in match.red_alliance + match.blue_alliance:
+                self.teams[team_num].add_match(match)
+                affected.add(team_num)
+        self._changed('matches_imported', affected, {'matches': parsed})
+        self._save_tournament_data()
+        return []
+
     def delete_match(self, match_id):
+        affected = set()
+        for m in self.matches:
+            if m.match_id == match_id:
+                affected.update(m.red_alliance + m.blue_alliance)
         self.matches = [m for m in self.matches if m.match_id != match_id]
         for team in self.teams.values():
             team.remove_match(match_id)
+        self._changed('match_deleted', affected, {'match_id': match_id})
         self._save_tournament_data()
             
     def clear_tournament_matches(self):
         ids_to_remove = [m.match_id for m in self.matches if m.match_type == "TOURNAMENT"]
+        affected = set()
+        for m in self.matches:
+            if m.match_type == "TOURNAMENT":
+                affected.update(m.red_alliance + m.blue_alliance)
         for mid in ids_to_remove:
             self.matches = [m for m in self.matches if m.match_id != mid]
             for team in self.teams.values():
                 team.remove_match(mid)
+        self._changed('tournament_cleared', affected)
         self._save_tournament_data()
 
     def get_team_matches(self, team_num: str) -> List[Match]:
@@ -187,14 +363,15 @@ class DataManager:
         # Apply hypothetical matches
         for m_data in hypothetical_matches:
             # Create a temporary match object
-            # format expected: {match_id, r1, r2, b1, b2, rs, bs, rrp, brp}
+            # format expected: {match_id, r1, r2, b1, b2, rs, bs, rrp, brp} (+ optional surrogates)
             match = Match(
                 m_data['match_id'],
                 [m_data['r1'], m_data['r2']],
                 [m_data['b1'], m_data['b2']],
                 m_data['rs'], m_data['bs'],
                 m_data['rrp'], m_data['brp'],
-                match_type="TOURNAMENT"
+                match_type="TOURNAMENT",
+                surrogates=m_data.get('surrogates')
             )
             
             # Add to cloned teams
@@ -0,0 +1,304 @@
+import copy
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from contextlib import contextmanager
+from typing import List, Dict, Optional
+from src.data_manager import DataManager, Team, Match
+from src.ranking_calculator import RankingCalculator
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, every process acts alone
+    fcntl = None
+
+# Event types that can move league standings (shown on the rank timeline)
+RANKING_EVENTS = ('match_added', 'matches_imported', 'match_deleted', 'tournament_cleared', 'fetch_delta')
+
+def empty_state() -> Dict:
+    return {
+        'tournament_matches': {},   # match_id -> match dict
+        'ftc_performances': {},     # team -> {match_id: performance}
+        'advancement': {},          # copy of the app's advancement_state
+    }
+
+def apply_event(state: Dict, event: Dict):
+    """Apply one logged event to a replay state in place."""
+    etype = event['type']
+    data = event['data']
+    if etype == 'match_added':
+        state['tournament_matches'][data['match_id']] = data
+    elif etype == 'matches_imported':
+        for m in data['matches']:
+            state['tournament_matches'][m['match_id']] = m
+    elif etype == 'match_deleted':
+        state['tournament_matches'].pop(data['match_id'], None)
+    elif etype == 'tournament_cleared':
+        state['tournament_matches'] = {}
+    elif etype == 'fetch_delta':
+        for team_num, delta in data.items():
+            perfs = state['ftc_performances'].setdefault(team_num, {})
+            for match_id in delta.get('removed', []):
+                perfs.pop(match_id, None)
+            for perf in delta.get('set', []):
+                perfs[perf['match_id']] = perf
+    elif etype == 'advancement_changed':
+        state['advancement'] = copy.deepcopy(data['state'])
+
+def match_to_dict(match: Match) -> Dict:
+    return {
+        'match_id': match.match_id,
+        'red_alliance': list(match.red_alliance),
+        'blue_alliance': list(match.blue_alliance),
+        'red_score': match.red_score,
+        'blue_score': match.blue_score,
+        'red_rp': match.red_rp,
+        'blue_rp': match.blue_rp
+    }
+
+def build_teams(state: Dict, roster: Dict[str, Team]) -> List[Team]:
+    """Fresh Team objects (names from roster) holding the performances and matches of a replay state."""
+    teams = {}
+    for num, team in roster.items():
+        new_team = Team(team.number, team.name, team.location)
+        new_team._ftc_performances = [p.copy() for p in state['ftc_performances'].get(num, {}).values()]
+        teams[num] = new_team
+    for m in state['tournament_matches'].values():
+        match = Match(m['match_id'], m['red_alliance'], m['blue_alliance'], m['red_score'], m['blue_score'],
+                      m['red_rp'], m['blue_rp'], match_type="TOURNAMENT")
+        for team_num in m['red_alliance'] + m['blue_alliance']:
+            if team_num in teams:
+                teams[team_num].add_match(match)
+    return list(teams.values())
+
+class EventLog:
+    """
+    Append-only log of every mutation to tournament state, one JSON event per line.
+    Every checkpoint_interval events the full replay state is written to a checkpoint
+    file, so any past state is rebuilt from the nearest checkpoint plus a short tail.
+    Several processes (WSGI workers) may share the files: sequence numbers are taken
+    under an exclusive file lock after reading what the others appended.
+    """
+    def __init__(self, path: str = 'event_log.jsonl', checkpoint_path: str = 'event_checkpoints.jsonl',
+                 checkpoint_interval: int = 50):
+        self.path = path
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self._lock = threading.RLock()
+        self._lock_file = None
+        self.events: List[Dict] = []
+        # seq of each entry of self.events, for bisect
+        self._seqs: List[int] = []
+        self.state = empty_state()
+        # (seq, byte offset in checkpoint file), ascending
+        self._checkpoints: List[tuple] = []
+        # Bytes of each file already indexed
+        self._offset = 0
+        self._checkpoint_offset = 0
+        # match_id -> seq of the event that last added it
+        self._match_seq: Dict[str, int] = {}
+        self._timeline: List[Dict] = []
+        self._timeline_state = empty_state()
+        self._timeline_seq = 0
+        self._catch_up()
+
+    @property
+    def seq(self) -> int:
+        return self.events[-1]['seq'] if self.events else 0
+
+    def _catch_up(self):
+        """Index events and checkpoints appended (by any process) since the files were last read."""
+        with self._lock:
+            try:
+                with open(self.path, 'rb') as f:
+                    f.seek(self._offset)
+                    for line in f:
+                        if not line.endswith(b'\n'):
+                            break  # still being written
+                        self._offset += len(line)
+                        if line.strip():
+                            event = json.loads(line)
+                            if event['seq'] > self.seq:
+                                self._index(event)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Error loading event log: {e}")
+
+            try:
+                with open(self.checkpoint_path, 'rb') as f:
+                    f.seek(self._checkpoint_offset)
+                    for line in f:
+                        if not line.endswith(b'\n'):
+                            break
+                        if line.strip():
+                            # Only the seq is needed up front; states are read on demand
+                            self._checkpoints.append((json.loads(line)['seq'], self._checkpoint_offset))
+                        self._checkpoint_offset += len(line)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"Error loading event checkpoints: {e}")
+
+    @contextmanager
+    def _exclusive(self):
+        """Sole writer of the log across processes, caught up with everything appended before."""
+        with self._lock:
+            if self._lock_file is not None:
+                # Already held by this thread further up the stack
+                yield
+                return
+            lock_file = open(self.path + '.lock', 'a')
+            try:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._lock_file = lock_file
+                self._catch_up()
+                yield
+            finally:
+                self._lock_file = None
+                lock_file.close()
+
+    def _index(self, event: Dict):
+        self.events.append(event)
+        self._seqs.append(event['seq'])
+        apply_event(self.state, event)
+        if event['type'] == 'match_added':
+            self._match_seq[event['data']['match_id']] = event['seq']
+        elif event['type'] == 'matches_imported':
+            for m in event['data']['matches']:
+                self._match_seq[m['match_id']] = event['seq']
+
+    def append(self, etype: str, data: Dict) -> Dict:
+        with self._exclusive():
+            event = {'seq': self.seq + 1, 'ts': time.time(), 'type': etype, 'data': data}
+            line = (json.dumps(event, separators=(',', ':')) + '\n').encode()
+            try:
+                with open(self.path, 'ab') as f:
+                    f.write(line)
+                self._offset += len(line)
+            except Exception as e:
+                print(f"Error writing event log: {e}")
+            self._index(event)
+            if event['seq'] % self.checkpoint_interval == 0:
+                self._write_checkpoint()
+            return event
+
+    def _write_checkpoint(self):
+        try:
+            offset = os.path.getsize(self.checkpoint_path) if os.path.exists(self.checkpoint_path) else 0
+            line = (json.dumps({'seq': self.seq, 'state': self.state}, separators=(',', ':')) + '\n').encode()
+            with open(self.checkpoint_path, 'ab') as f:
+                f.write(line)
+            self._checkpoints.append((self.seq, offset))
+            self._checkpoint_offset = offset + len(line)
+        except Exception as e:
+            print(f"Error writing event checkpoint: {e}")
+
+    # Recording
+
+    def attach(self, data_manager: DataManager):
+        """Log DataManager changes from now on."""
+        data_manager.subscribe(lambda event, teams, payload: self._on_data_change(data_manager, event, payload))
+
+    def _on_data_change(self, data_manager: DataManager, event: str, payload: Dict):
+        if event == 'match_added':
+            self.append('match_added', match_to_dict(payload['match']))
+        elif event == 'matches_imported':
+            self.append('matches_imported', {'matches': [match_to_dict(m) for m in payload['matches']]})
+        elif event == 'match_deleted':
+            self.append('match_deleted', {'match_id': payload['match_id']})
+        elif event == 'tournament_cleared':
+            self.append('tournament_cleared', {})
+        elif event == 'ftc_reloaded':
+            self.record_fetch(data_manager)
+
+    def record_fetch(self, data_manager: DataManager) -> Optional[Dict]:
+        """Log the difference between the fetched performances and the logged ones."""
+        with self._exclusive():
+            delta = {}
+            for num, team in data_manager.teams.items():
+                old = self.state['ftc_performances'].get(num, {})
+                new = {p['match_id']: p for p in team._ftc_performances}
+                changed = [p for mid, p in new.items() if old.get(mid) != p]
+                removed = [mid for mid in old if mid not in new]
+                if changed or removed:
+                    delta[num] = {'set': changed, 'removed': removed}
+            if delta:
+                return self.append('fetch_delta', delta)
+            return None
+
+    def record_advancement(self, kind: str, advancement_state: Dict):
+        self.append('advancement_changed', {'kind': kind, 'state': copy.deepcopy(advancement_state)})
+
+    def sync(self, data_manager: DataManager, advancement_state: Dict):
+        """
+        Bring the log in line with state loaded from the JSON files at startup,
+        logging whatever changed while the log wasn't being written.
+        """
+        with self._exclusive():
+            self.record_fetch(data_manager)
+            current = {m.match_id: match_to_dict(m) for m in data_manager.get_tournament_matches()}
+            for match_id in list(self.state['tournament_matches']):
+                if match_id not in current:
+                    self.append('match_deleted', {'match_id': match_id})
+            for match_id, m in current.items():
+                if self.state['tournament_matches'].get(match_id) != m:
+                    self.append('match_added', m)
+            if self.state['advancement'] != advancement_state:
+                self.record_advancement('sync', advancement_state)
+
+    # Time travel
+
+    def resolve(self, as_of: str) -> Optional[int]:
+        """as_of is a sequence number or a match id (the point right after it was added)."""
+        self._catch_up()
+        if as_of.isdigit():
+            return min(int(as_of), self.seq)
+        return self._match_seq.get(as_of)
+
+    def state_at(self, seq: int) -> Dict:
+        """Replay state after event seq, starting from the nearest checkpoint at or before it."""
+        with self._lock:
+            self._catch_up()
+            if seq >= self.seq:
+                return copy.deepcopy(self.state)
+            state = empty_state()
+            start = 0
+            base = bisect_right(self._checkpoints, (seq, float('inf')))
+            if base:
+                start, offset = self._checkpoints[base - 1]
+                with open(self.checkpoint_path, 'rb') as f:
+                    f.seek(offset)
+                    state = json.loads(f.readline())['state']
+            # Events are found by seq, not list position
+            for event in self.events[bisect_right(self._seqs, start):bisect_right(self._seqs, seq)]:
+                apply_event(state, event)
+            return state
+
+    def standings_at(self, seq: int, roster: Dict[str, Team]) -> List[Team]:
+        return RankingCalculator.calculate_league_rankings(build_teams(self.state_at(seq), roster))
+
+    def rank_timeline(self, roster: Dict[str, Team]) -> List[Dict]:
+        """League rank of every team after each ranking event; extended incrementally as the log grows."""
+        with self._lock:
+            self._catch_up()
+            for event in self.events[bisect_right(self._seqs, self._timeline_seq):]:
+                apply_event(self._timeline_state, event)
+                self._timeline_seq = event['seq']
+                if event['type'] not in RANKING_EVENTS:
+                    continue
+                ranked = RankingCalculator.calculate_league_rankings(build_teams(self._timeline_state, roster), with_breakdown=False)
+                match_id = event['data'].get('match_id')
+                if event['type'] == 'matches_imported' and event['data']['matches']:
+                    match_id = event['data']['matches'][-1]['match_id']
+                self._timeline.append({
+                    'seq': event['seq'],
+                    'type': event['type'],
+                    'match_id': match_id,
+                    'ranks': {t.number: t.league_rank for t in ranked},
+                    'total_rp': {t.number: t.total_rp for t in ranked}
+                })
+            return list(self._timeline)
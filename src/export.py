@@ -0,0 +1,77 @@
+"""
+Streaming CSV / NDJSON exports.
+
+Rows come from generators and are encoded into a small reusable buffer that is flushed
+every CHUNK_SIZE characters, so memory stays flat however many rows there are and the
+first chunk (the CSV header, or the first NDJSON row) goes out before the rest is computed.
+"""
+import csv
+import io
+import json
+from typing import List, Dict, Iterable, Iterator, Callable, Optional
+from src.data_manager import Match, Team
+from src.archive import MatchArchive
+
+FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+CHUNK_SIZE = 16384
+
+BREAKDOWN_COLUMNS = ['number', 'name', 'match_id', 'rp', 'score', 'is_counted', 'is_surrogate', 'is_tournament']
+MATCH_COLUMNS = ['match_id', 'type', 'red1', 'red2', 'blue1', 'blue2', 'red_score', 'blue_score', 'red_rp', 'blue_rp']
+ARCHIVE_MATCH_COLUMNS = ['season', 'event', 'match_id', 'red1', 'red2', 'blue1', 'blue2',
+                         'red_score', 'blue_score', 'red_np', 'blue_np']
+
+def _drain(buffer: io.StringIO) -> str:
+    chunk = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return chunk
+
+def stream_rows(rows: Iterable[Dict], columns: List[str], fmt: str) -> Iterator[str]:
+    """Encode dict rows as CSV (header first) or NDJSON, restricted to `columns`."""
+    buffer = io.StringIO()
+    if fmt == 'csv':
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction='ignore', lineterminator='\n')
+        writer.writeheader()
+        yield _drain(buffer)
+        write = writer.writerow
+    else:
+        write = lambda row: buffer.write(json.dumps({c: row.get(c) for c in columns}, separators=(',', ':')) + '\n')
+    first = fmt != 'csv'
+    for row in rows:
+        write(row)
+        if first or buffer.tell() >= CHUNK_SIZE:
+            first = False
+            yield _drain(buffer)
+    if buffer.tell():
+        yield _drain(buffer)
+
+def team_rows(teams: Iterable[Team], getters: Dict[str, Callable]) -> Iterator[Dict]:
+    for team in teams:
+        yield {name: get(team) for name, get in getters.items()}
+
+def breakdown_rows(teams: Iterable[Team], breakdown: Callable[[Team], List[Dict]]) -> Iterator[Dict]:
+    """One row per performance; breakdowns are built one team at a time."""
+    for team in teams:
+        for p in breakdown(team):
+            yield dict(p, number=team.number, name=team.name)
+
+def match_rows(matches: Iterable[Match]) -> Iterator[Dict]:
+    for m in matches:
+        red, blue = m.red_alliance + [None, None], m.blue_alliance + [None, None]
+        yield {
+            'match_id': m.match_id, 'type': m.match_type.lower(),
+            'red1': red[0], 'red2': red[1], 'blue1': blue[0], 'blue2': blue[1],
+            'red_score': m.red_score, 'blue_score': m.blue_score, 'red_rp': m.red_rp, 'blue_rp': m.blue_rp
+        }
+
+def archive_match_rows(archive: MatchArchive, season: Optional[int] = None) -> Iterator[Dict]:
+    """Every archived match (all seasons unless one is given), read lazily from the memory map."""
+    for m in archive.iter_matches(season):
+        red, blue = m['red'] + [None, None], m['blue'] + [None, None]
+        yield {
+            'season': m['season'], 'event': m['event'], 'match_id': m['match_id'],
+            'red1': red[0], 'red2': red[1], 'blue1': blue[0], 'blue2': blue[1],
+            'red_score': m['red_score'], 'blue_score': m['blue_score'],
+            'red_np': m['red_np'] if m['red_np'] >= 0 else None,
+            'blue_np': m['blue_np'] if m['blue_np'] >= 0 else None
+        }
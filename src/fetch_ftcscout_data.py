@@ -1,51 +1,18 @@
-import requests
 import json
+from typing import Optional
+from src.graphql_client import fetch_events
+from src.rules import SeasonRules, rules_for
 
 def fetch_meet_data(event_code, season=2025):
     """Fetch all match data for a given event from FTCScout GraphQL API."""
-    url = "https://api.ftcscout.org/graphql"
-    
-    query = """
-    query {
-      eventByCode(code: "%s", season: %d) {
-        matches {
-          matchNum
-          teams {
-            teamNumber
-            alliance
-            surrogate
-          }
-          scores {
-            ... on MatchScores2025 {
-              red {
-                totalPoints
-                movementRp
-                goalRp
-                patternRp
-              }
-              blue {
-                totalPoints
-                movementRp
-                goalRp
-                patternRp
-              }
-            }
-          }
-        }
-      }
-    }
-    """ % (event_code, season)
-    
-    response = requests.post(url, json={'query': query})
-    if response.status_code == 200:
-        data = response.json()
-        return data['data']['eventByCode']['matches']
-    else:
-        print(f"Error fetching {event_code}: {response.status_code}")
+    events = fetch_events([event_code], season)
+    if event_code not in events:
+        print(f"Error fetching {event_code}")
         return []
+    return events[event_code]['matches']
 
-def calculate_match_rp(match, team_num):
-    """Calculate RP for a specific team in a match."""
+def calculate_match_rp(match, team_num, rules: Optional[SeasonRules] = None):
+    """Calculate RP for a specific team in a match (current season's rules unless given)."""
     # Find which alliance the team is on
     alliance = None
     is_surrogate = False
@@ -60,7 +27,7 @@ def calculate_match_rp(match, team_num):
         return 0, 0  # Team not in match
     
     if is_surrogate:
-        return 0, 0  # Surrogates get 0 RP but still get score
+        return 0, 0  # Surrogate appearances earn neither RP nor score
     
     scores = match.get('scores')
     if not scores:
@@ -72,20 +39,8 @@ def calculate_match_rp(match, team_num):
     total_points = alliance_data['totalPoints']
     opp_points = opp_alliance_data['totalPoints']
     
-    # Win/Loss/Tie RP
-    if total_points > opp_points:
-        base_rp = 3  # Win
-    elif total_points == opp_points:
-        base_rp = 1  # Tie
-    else:
-        base_rp = 0  # Loss
-    
-    # Bonus RPs
-    bonus_rp = (alliance_data.get('movementRp', 0) + 
-                alliance_data.get('goalRp', 0) + 
-                alliance_data.get('patternRp', 0))
-    
-    total_rp = base_rp + bonus_rp
+    # Win/Loss/Tie RP plus the season's bonus RPs
+    total_rp = (rules or rules_for()).match_rp(total_points, opp_points, alliance_data)
     
     return total_rp, total_points
 
@@ -100,9 +55,12 @@ def main():
     all_teams = set()
     team_performances = {}
     
+    # One aliased request for all meets
+    print(f"Fetching {', '.join(code for code, _ in meets)}...")
+    events = fetch_events([code for code, _ in meets])
+    
     for event_code, meet_prefix in meets:
-        print(f"Fetching {event_code}...")
-        matches = fetch_meet_data(event_code)
+        matches = events.get(event_code, {}).get('matches', [])
         
         for match in matches:
             match_id = f"{meet_prefix}-Q{match['matchNum']}"
@@ -129,9 +87,9 @@ def main():
     for team_num in all_teams:
         performances = team_performances.get(team_num, [])
         
-        # Sort by RP (desc), then score (desc) to get top 10
+        # Sort by RP (desc), then score (desc) to get the counted (top 10) matches
         performances.sort(key=lambda x: (x['rp'], x['score']), reverse=True)
-        top_10 = performances[:10]
+        top_10 = performances[:rules_for().league_count]
         
         total_rp = sum(p['rp'] for p in top_10)
         total_score = sum(p['score'] for p in performances)
@@ -167,9 +125,5 @@ def main():
         print(f"Error saving data: {e}")
         return False
 
-def update_live_data():
-    """Callable function to update data from FTCScout."""
-    return main()
-
 if __name__ == "__main__":
     main()
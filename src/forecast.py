@@ -0,0 +1,269 @@
+"""
+Performance forecasting from the match archive.
+
+Percentiles come from mergeable quantile sketches (a compact t-digest) kept per
+event and metric: re-fetching an event replaces only that event's sketch, and
+season or all-time distributions are merges of event sketches, so no raw data is
+retained. Next-event predictions are linear trends over each team's per-event OPR,
+fitted for all teams at once with NumPy.
+"""
+import hashlib
+import json
+import math
+import os
+import threading
+from typing import List, Dict, Optional, Iterable
+import numpy as np
+from src.archive import MatchArchive
+
+FORECAST_PATH = 'forecast_sketches.json'
+METRICS = ['opr', 'np_opr', 'score']
+
+class QuantileSketch:
+    """
+    Merging t-digest: weighted centroids whose size is bounded by the k1 scale
+    function, so tails stay precise and the whole sketch stays ~compression centroids.
+    """
+    def __init__(self, compression: int = 100):
+        self.compression = compression
+        self.centroids: List[List[float]] = []  # [mean, weight], sorted by mean
+        self._buffer: List[List[float]] = []
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, weight: float = 1.0):
+        self._buffer.append([float(value), float(weight)])
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def extend(self, values: Iterable[float]):
+        for v in values:
+            self.add(v)
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        other._compress()
+        self._buffer.extend([c[:] for c in other.centroids])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        points = sorted(self.centroids + self._buffer)
+        self._buffer = []
+        merged = [points[0][:]]
+        seen = 0.0
+        k_left = self._k(0.0)
+        for mean, weight in points[1:]:
+            current = merged[-1]
+            q_right = (seen + current[1] + weight) / self.count
+            if self._k(q_right) - k_left <= 1:
+                total = current[1] + weight
+                current[0] += (mean - current[0]) * weight / total
+                current[1] = total
+            else:
+                seen += current[1]
+                k_left = self._k(seen / self.count)
+                merged.append([mean, weight])
+        self.centroids = merged
+
+    def quantile(self, q: float) -> Optional[float]:
+        self._compress()
+        if not self.centroids:
+            return None
+        target = q * self.count
+        cumulative = 0.0
+        prev_mean, prev_mid = self.min, 0.0
+        for mean, weight in self.centroids:
+            mid = cumulative + weight / 2
+            if target <= mid:
+                span = mid - prev_mid
+                return prev_mean + (mean - prev_mean) * ((target - prev_mid) / span if span else 0)
+            cumulative += weight
+            prev_mean, prev_mid = mean, mid
+        span = self.count - prev_mid
+        return prev_mean + (self.max - prev_mean) * ((target - prev_mid) / span if span else 0)
+
+    def cdf(self, value: float) -> Optional[float]:
+        """Fraction of the distribution at or below value."""
+        self._compress()
+        if not self.centroids:
+            return None
+        if value <= self.min:
+            return 0.0
+        if value >= self.max:
+            return 1.0
+        cumulative = 0.0
+        prev_mean, prev_mid = self.min, 0.0
+        for mean, weight in self.centroids:
+            mid = cumulative + weight / 2
+            if value < mean:
+                span = mean - prev_mean
+                return (prev_mid + (mid - prev_mid) * ((value - prev_mean) / span if span else 1)) / self.count
+            cumulative += weight
+            prev_mean, prev_mid = mean, mid
+        span = self.max - prev_mean
+        return (prev_mid + (self.count - prev_mid) * ((value - prev_mean) / span if span else 1)) / self.count
+
+    def to_dict(self) -> Dict:
+        self._compress()
+        return {'compression': self.compression, 'count': self.count, 'min': self.min, 'max': self.max,
+                'centroids': [[round(m, 4), w] for m, w in self.centroids]}
+
+    @staticmethod
+    def from_dict(data: Dict) -> 'QuantileSketch':
+        sketch = QuantileSketch(data['compression'])
+        sketch.centroids = [list(c) for c in data['centroids']]
+        sketch.count, sketch.min, sketch.max = data['count'], data['min'], data['max']
+        return sketch
+
+def event_samples(archive: MatchArchive, event: int) -> Dict[str, List[float]]:
+    """Values each metric contributes for one event: per-team OPRs and alliance scores."""
+    scores = archive.score[archive.event_rows(event)]
+    return {
+        'opr': list(archive.event_opr(event, 'score').values()),
+        'np_opr': list(archive.event_opr(event, 'np_score').values()),
+        'score': scores[scores > 0].astype(float).tolist()
+    }
+
+def event_fingerprint(archive: MatchArchive, rows: np.ndarray) -> str:
+    """Hash of the columns an event's sketches are built from, so any corrected score changes it."""
+    digest = hashlib.sha1()
+    for column in (archive.teams, archive.score, archive.np_score):
+        digest.update(np.ascontiguousarray(column[rows]).tobytes())
+    return digest.hexdigest()
+
+def fit_trends(series: Dict[str, List[float]], horizon: int = 1) -> Dict[str, Dict]:
+    """
+    Least-squares line through each team's non-zero per-event values, all teams in one
+    vectorized pass; the prediction is `horizon` events after the last one.
+    Teams with fewer than two points predict their only value (or 0).
+    """
+    teams = list(series)
+    if not teams:
+        return {}
+    width = max(1, max(len(v) for v in series.values()))
+    y = np.zeros((len(teams), width))
+    for i, team in enumerate(teams):
+        y[i, :len(series[team])] = series[team]
+    x = np.arange(1, width + 1, dtype=float)
+    mask = y > 0
+    n = mask.sum(axis=1)
+    sx, sy = (mask * x).sum(axis=1), (mask * y).sum(axis=1)
+    sxy, sxx = (mask * x * y).sum(axis=1), (mask * x * x).sum(axis=1)
+    denom = n * sxx - sx ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(denom > 0, (n * sxy - sx * sy) / denom, 0.0)
+        intercept = np.where(n > 0, (sy - slope * sx) / np.maximum(n, 1), 0.0)
+    lengths = np.array([len(series[t]) for t in teams], dtype=float)
+    predicted = np.maximum(0.0, slope * (lengths + horizon) + intercept)
+    # One point: no trend, carry it forward
+    first = np.where(mask.any(axis=1), y[np.arange(len(teams)), mask.argmax(axis=1)], 0.0)
+    predicted = np.where(n >= 2, predicted, first)
+    return {team: {'slope': round(float(slope[i]), 3) if n[i] >= 2 else 0.0,
+                   'next': round(float(predicted[i]), 2)} for i, team in enumerate(teams)}
+
+class ForecastStore:
+    """Per-event sketches for every metric, persisted as JSON and refreshed from the archive."""
+    def __init__(self, path: str = FORECAST_PATH, compression: int = 100):
+        self.path = path
+        self.compression = compression
+        # "season/code" -> {'fingerprint': [...], 'sketches': {metric: sketch dict}}
+        self.events: Dict[str, Dict] = {}
+        self._merged: Dict[tuple, QuantileSketch] = {}
+        self._lock = threading.RLock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                self.events = json.load(f)['events']
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error loading forecast sketches: {e}")
+
+    def save(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'events': self.events}, f, separators=(',', ':'))
+        os.replace(tmp, self.path)
+
+    def update_from_archive(self, archive: MatchArchive) -> int:
+        """Re-sketch events whose matches changed since the last update. Returns how many were."""
+        with self._lock:
+            return self._update_from_archive(archive)
+
+    def _update_from_archive(self, archive: MatchArchive) -> int:
+        updated = 0
+        for i, event in enumerate(archive.events):
+            rows = archive.event_rows(i)
+            fingerprint = event_fingerprint(archive, rows)
+            key = f"{event['season']}/{event['code']}"
+            if self.events.get(key, {}).get('fingerprint') == fingerprint:
+                continue
+            sketches = {}
+            for metric, values in event_samples(archive, i).items():
+                sketch = QuantileSketch(self.compression)
+                sketch.extend(values)
+                sketches[metric] = sketch.to_dict()
+            self.events[key] = {'fingerprint': fingerprint, 'sketches': sketches}
+            updated += 1
+        if updated:
+            self._merged = {}
+        return updated
+
+    def distribution(self, metric: str, season: Optional[int] = None) -> QuantileSketch:
+        """Merged sketch over all events (or one season's)."""
+        key = (metric, season)
+        with self._lock:
+            return self._merged[key] if key in self._merged else self._merge(key)
+
+    def _merge(self, key: tuple) -> QuantileSketch:
+        metric, season = key
+        merged = QuantileSketch(self.compression)
+        for name, entry in self.events.items():
+            if season is None or name.split('/')[0] == str(season):
+                if entry['sketches'][metric]['count']:
+                    merged.merge(QuantileSketch.from_dict(entry['sketches'][metric]))
+        self._merged[key] = merged
+        return merged
+
+    def percentile(self, metric: str, value: float, season: Optional[int] = None) -> Optional[float]:
+        cdf = self.distribution(metric, season).cdf(value)
+        return None if cdf is None else round(cdf * 100, 1)
+
+def team_forecasts(archive: MatchArchive, store: ForecastStore, team_numbers: Iterable[str],
+                   metric: str = 'opr') -> Dict[str, Dict]:
+    """
+    Per-event OPR trend ('opr' or 'np_opr'), next-event prediction and their
+    percentiles among all teams of the latest season.
+    """
+    column = 'np_score' if metric == 'np_opr' else 'score'
+    season = archive.latest_season()
+    # One least-squares solve per event, shared by every team
+    events = [(i, e['code']) for i, e in enumerate(archive.events) if e['kind'] == 'league' and e['season'] == season]
+    oprs = [(code, archive.event_opr(i, column)) for i, code in events]
+    trends = {num: [(code, opr[num]) for code, opr in oprs if num in opr] for num in team_numbers}
+    fits = fit_trends({num: [v for _, v in trend] for num, trend in trends.items()})
+    result = {}
+    for num, trend in trends.items():
+        latest = trend[-1][1] if trend else None
+        result[num] = {
+            'trend': [{'event': code, 'value': round(v, 2)} for code, v in trend],
+            'slope': fits[num]['slope'],
+            'next': fits[num]['next'],
+            'percentile': store.percentile(metric, latest, season) if latest is not None else None,
+            'next_percentile': store.percentile(metric, fits[num]['next'], season)
+        }
+    return result
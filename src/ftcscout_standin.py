@@ -0,0 +1,80 @@
+"""
+Stand-in for the FTCScout GraphQL API for offline operation.
+
+Serves responses from the local response cache (.ftcscout_cache, filled by
+src.http_cache whenever the app fetches) and from recorded fixtures in
+recordings/. With --upstream, misses are forwarded to the real API and cached.
+
+    python -m src.ftcscout_standin [--port 5002] [--upstream]
+    FTCSCOUT_URL=http://localhost:5002/graphql python src/app.py
+    docs/index.html?api=http://localhost:5002/graphql
+"""
+import json
+import os
+import sys
+from typing import Dict, Optional
+from flask import Flask, request, jsonify
+from src.http_cache import GraphQLCache, CachedSession, cache_key, CACHE_DIR
+
+RECORDINGS_DIR = 'recordings'
+UPSTREAM_URL = "https://api.ftcscout.org/graphql"
+
+def load_recordings(directory: str) -> Dict[str, Dict]:
+    """Recorded responses by cache key; each file holds one cache entry or a list of them."""
+    recordings = {}
+    if not os.path.isdir(directory):
+        return recordings
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(directory, name), 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"Error loading recording {name}: {e}")
+            continue
+        for entry in data if isinstance(data, list) else [data]:
+            recordings[cache_key(entry['query'], entry.get('variables'))] = entry['response']
+    return recordings
+
+def create_app(cache_dir: str = CACHE_DIR, recordings_dir: str = RECORDINGS_DIR,
+               upstream: Optional[str] = None) -> Flask:
+    standin = Flask(__name__)
+    cache = GraphQLCache(cache_dir)
+    recordings = load_recordings(recordings_dir)
+    # Cache-backed passthrough for misses; ttl=0 so every forwarded query is refreshed
+    session = CachedSession(cache, ttl=0, stale_while_revalidate=0) if upstream else None
+
+    @standin.after_request
+    def allow_cors(response):
+        # The static client in docs/ calls this from the browser
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+        return response
+
+    @standin.route('/graphql', methods=['POST', 'OPTIONS'])
+    def graphql():
+        if request.method == 'OPTIONS':
+            return '', 204
+        body = request.get_json(silent=True) or {}
+        query, variables = body.get('query', ''), body.get('variables')
+
+        entry = cache.get(query, variables)
+        if entry is not None:
+            return jsonify(entry['response'])
+        recorded = recordings.get(cache_key(query, variables))
+        if recorded is not None:
+            return jsonify(recorded)
+        if session is not None:
+            try:
+                response = session.post(upstream, json=body)
+                return jsonify(response.json()), response.status_code
+            except Exception as e:
+                print(f"Upstream error: {e}")
+        return jsonify({'data': None, 'errors': [{'message': 'No cached or recorded response for this query'}]})
+
+    return standin
+
+if __name__ == '__main__':
+    port = int(sys.argv[sys.argv.index('--port') + 1]) if '--port' in sys.argv else 5002
+    create_app(upstream=UPSTREAM_URL if '--upstream' in sys.argv else None).run(host='0.0.0.0', port=port)
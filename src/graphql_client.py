@@ -0,0 +1,102 @@
+import os
+from typing import List, Dict, Tuple, Iterable, Optional
+from src.http_cache import default_session
+
+# Point at the bundled stand-in server (src/ftcscout_standin.py) to run offline
+GRAPHQL_URL = os.environ.get('FTCSCOUT_URL', "https://api.ftcscout.org/graphql")
+
+MATCH_SELECTION = """
+    matchNum
+    teams { teamNumber alliance surrogate }
+    scores {
+      ... on MatchScores2025 {
+        red { totalPoints penaltyPointsByOpp autoPoints dcPoints movementRp goalRp patternRp }
+        blue { totalPoints penaltyPointsByOpp autoPoints dcPoints movementRp goalRp patternRp }
+      }
+    }
+"""
+
+# `end` lets the response cache keep finished events permanently
+EVENT_MATCHES_SELECTION = "{ code end matches {%s} }" % MATCH_SELECTION
+
+class BatchQuery:
+    """
+    Collects root fields (e.g. one eventByCode per event) and renders them as aliased
+    fields in as few GraphQL requests as the size limits allow. All values are passed
+    as typed variables, never spliced into the query text.
+    """
+    def __init__(self, max_aliases: int = 20, max_query_chars: int = 16000):
+        self.max_aliases = max_aliases
+        self.max_query_chars = max_query_chars
+        # (alias, field, {arg: (graphql_type, value)}, selection)
+        self.fields: List[Tuple[str, str, Dict[str, Tuple[str, object]], str]] = []
+
+    def add(self, field: str, args: Dict[str, Tuple[str, object]], selection: str,
+            alias: Optional[str] = None) -> str:
+        alias = alias or f"q{len(self.fields)}"
+        self.fields.append((alias, field, args, selection))
+        return alias
+
+    @staticmethod
+    def _render_field(alias: str, field: str, args: Dict, selection: str) -> Tuple[str, List[str], Dict]:
+        var_defs = []
+        variables = {}
+        call_args = []
+        for name, (gql_type, value) in args.items():
+            var = f"{alias}_{name}"
+            var_defs.append(f"${var}: {gql_type}")
+            variables[var] = value
+            call_args.append(f"{name}: ${var}")
+        arg_text = f"({', '.join(call_args)})" if call_args else ""
+        return f"{alias}: {field}{arg_text} {selection}", var_defs, variables
+
+    def render(self) -> List[Tuple[str, Dict, List[str]]]:
+        """Returns [(query, variables, aliases)] chunks respecting max_aliases and max_query_chars."""
+        chunks = []
+        body, var_defs, variables, aliases = [], [], {}, []
+
+        def flush():
+            if body:
+                header = f"query Batch({', '.join(var_defs)})" if var_defs else "query Batch"
+                chunks.append((header + " {\n" + "\n".join(body) + "\n}", dict(variables), list(aliases)))
+
+        size = 0
+        for alias, field, args, selection in self.fields:
+            text, defs, vals = self._render_field(alias, field, args, selection)
+            cost = len(text) + sum(len(d) + 2 for d in defs)
+            if body and (len(aliases) >= self.max_aliases or size + cost > self.max_query_chars):
+                flush()
+                body, var_defs, variables, aliases, size = [], [], {}, [], 0
+            body.append(text)
+            var_defs.extend(defs)
+            variables.update(vals)
+            aliases.append(alias)
+            size += cost
+        flush()
+        return chunks
+
+def execute(batch: BatchQuery, session=None, url: str = GRAPHQL_URL) -> Dict[str, object]:
+    """Run every chunk of a batch and merge the results by alias."""
+    http = session or default_session
+    results = {}
+    for query, variables, aliases in batch.render():
+        response = http.post(url, json={'query': query, 'variables': variables})
+        if response.status_code != 200:
+            print(f"GraphQL error {response.status_code} for {len(aliases)} fields")
+            continue
+        payload = response.json()
+        for err in payload.get('errors') or []:
+            print(f"GraphQL error: {err.get('message')}")
+        results.update(payload.get('data') or {})
+    return results
+
+def fetch_events(event_codes: Iterable[str], season: int = 2025,
+                 selection: str = EVENT_MATCHES_SELECTION, session=None, **limits) -> Dict[str, Dict]:
+    """eventByCode for many events in as few requests as possible. Returns {code: event}."""
+    batch = BatchQuery(**limits)
+    alias_to_code = {}
+    for code in event_codes:
+        alias = batch.add('eventByCode', {'code': ('String!', code), 'season': ('Int!', season)}, selection)
+        alias_to_code[alias] = code
+    data = execute(batch, session)
+    return {code: data[alias] for alias, code in alias_to_code.items() if data.get(alias)}
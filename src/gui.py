@@ -1,10 +1,17 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
-from typing import Dict
+from typing import Dict, List, Tuple
 from src.data_manager import DataManager
 from src.ranking_calculator import RankingCalculator
 
 class AdvancementApp:
+    # Edits within this window are folded into a single recompute
+    REFRESH_DEBOUNCE_MS = 150
+    # How often the main thread checks for a finished recompute
+    POLL_MS = 30
+
     def __init__(self, root):
         self.root = root
         self.root.title("East Bay League Tournament - Advancement Calculator")
@@ -18,6 +25,14 @@ class AdvancementApp:
         self.awards: Dict[str, int] = {} # Team -> Points
         self.playoff_results: Dict[str, int] = {} # Team -> Points
         
+        # Background recompute state (only touched on the Tk main thread)
+        self._results = queue.Queue()
+        self._debounce_id = None
+        self._worker_busy = False
+        self._refresh_pending = False
+        # Per tree: iid -> (values, tags) currently shown, and the displayed order
+        self._shown = {}
+        
         # Setup GUI
         self.notebook = ttk.Notebook(root)
         self.notebook.pack(fill='both', expand=True, padx=10, pady=10)
@@ -178,28 +193,119 @@ class AdvancementApp:
         self.tree_adv.tag_configure("highlight", background="#e6f3ff") # Blue for User
 
     def refresh_standings(self):
-        # Clear existing
-        for item in self.tree_standings.get_children():
-            self.tree_standings.delete(item)
-            
-        teams = self.data_manager.get_all_teams()
-        sorted_teams = self.ranking_calculator.calculate_league_rankings(teams)
-        
-        for team in sorted_teams:
-            tags = ()
-            if team.number == "14259":
-                tags = ("highlight",)
-            
-            self.tree_standings.insert("", "end", values=(
-                team.league_rank, 
-                team.number, 
-                team.name, 
-                team.total_rp, 
-                team.matches_played
-            ), tags=tags)
-            
-        # Also refresh advancement to update Ranking Points there
-        self.refresh_advancement()
+        """Recompute standings and advancement in the background; rapid calls collapse into one."""
+        if self._debounce_id is not None:
+            self.root.after_cancel(self._debounce_id)
+        self._debounce_id = self.root.after(self.REFRESH_DEBOUNCE_MS, self._start_refresh)
+
+    def _start_refresh(self):
+        self._debounce_id = None
+        if self._worker_busy:
+            # Run once more with the latest state when the current recompute lands
+            self._refresh_pending = True
+            return
+        self._worker_busy = True
+        # Snapshot inputs on the main thread so the worker never sees them mid-edit
+        teams = [t.clone() for t in self.data_manager.get_all_teams()]
+        args = (teams, dict(self.alliance_selections), dict(self.awards), dict(self.playoff_results))
+        threading.Thread(target=self._compute, args=args, daemon=True).start()
+        self.root.after(self.POLL_MS, self._poll_results)
+
+    def _compute(self, teams, alliance_selections, awards, playoff_results):
+        """Runs on the worker thread; produces display rows only, never touches Tk."""
+        try:
+            sorted_teams = self.ranking_calculator.calculate_league_rankings(teams)
+            standings_rows = []
+            for team in sorted_teams:
+                tags = ("highlight",) if team.number == "14259" else ()
+                standings_rows.append((team.number, (
+                    team.league_rank,
+                    team.number,
+                    team.name,
+                    team.total_rp,
+                    team.matches_played
+                ), tags))
+
+            final_teams = self.ranking_calculator.calculate_advancement_points(
+                sorted_teams,
+                alliance_selections,
+                awards,
+                playoff_results
+            )
+            advancement_rows = []
+            # Top 2 Advance
+            for i, team in enumerate(final_teams):
+                rank = i + 1
+                qual_pts = self.ranking_calculator.qualification_points(team.league_rank)
+                
+                # Recalculate component points for display
+                all_pts = 0
+                if team.number in alliance_selections:
+                    all_pts = self.ranking_calculator.alliance_points(alliance_selections[team.number])
+                
+                award_pts = awards.get(team.number, 0)
+                play_pts = playoff_results.get(team.number, 0)
+                
+                tags = []
+                if rank <= 2:
+                    tags.append("advance")
+                if team.number == "14259":
+                    tags.append("highlight")
+                
+                advancement_rows.append((team.number, (
+                    rank,
+                    team.number,
+                    team.name,
+                    qual_pts,
+                    all_pts,
+                    award_pts,
+                    play_pts,
+                    team.advancement_points
+                ), tuple(tags)))
+            self._results.put((standings_rows, advancement_rows))
+        except Exception as e:
+            self._results.put(e)
+
+    def _poll_results(self):
+        try:
+            result = self._results.get_nowait()
+        except queue.Empty:
+            self.root.after(self.POLL_MS, self._poll_results)
+            return
+
+        self._worker_busy = False
+        if isinstance(result, Exception):
+            messagebox.showerror("Error", f"Ranking update failed: {result}")
+        else:
+            standings_rows, advancement_rows = result
+            self._sync_tree(self.tree_standings, standings_rows)
+            self._sync_tree(self.tree_adv, advancement_rows)
+
+        if self._refresh_pending:
+            self._refresh_pending = False
+            self._start_refresh()
+
+    def _sync_tree(self, tree: ttk.Treeview, rows: List[Tuple]):
+        """Apply (iid, values, tags) rows, touching only rows whose values or position changed."""
+        shown, order = self._shown.setdefault(str(tree), ({}, []))
+        wanted = set(iid for iid, _, _ in rows)
+        for iid in [iid for iid in order if iid not in wanted]:
+            tree.delete(iid)
+            del shown[iid]
+            order.remove(iid)
+
+        for index, (iid, values, tags) in enumerate(rows):
+            if iid not in shown:
+                tree.insert("", index, iid=iid, values=values, tags=tags)
+                order.insert(index, iid)
+            else:
+                if shown[iid] != (values, tags):
+                    tree.item(iid, values=values, tags=tags)
+                if order[index] != iid:
+                    tree.move(iid, "", index)
+                    order.remove(iid)
+                    order.insert(index, iid)
+            shown[iid] = (values, tags)
 
     def add_match(self):
         mid = self.entry_match_id.get()
@@ -255,48 +361,7 @@ class AdvancementApp:
         self.list_points.insert(tk.END, f"Team {team}: {desc} (+{pts})")
         
     def refresh_advancement(self):
-        for item in self.tree_adv.get_children():
-            self.tree_adv.delete(item)
-            
-        teams = self.data_manager.get_all_teams()
-        # Ensure rankings are up to date
-        ranked_teams = self.ranking_calculator.calculate_league_rankings(teams)
-        
-        final_teams = self.ranking_calculator.calculate_advancement_points(
-            ranked_teams,
-            self.alliance_selections,
-            self.awards,
-            self.playoff_results
-        )
-        
-        # Top 2 Advance
-        for i, team in enumerate(final_teams):
-            rank = i + 1
-            qual_pts = max(2, 17 - team.league_rank)
-            
-            # Recalculate component points for display
-            all_pts = 0
-            if team.number in self.alliance_selections:
-                all_pts = 21 - self.alliance_selections[team.number]
-            
-            award_pts = self.awards.get(team.number, 0)
-            play_pts = self.playoff_results.get(team.number, 0)
-            
-            tags = []
-            if rank <= 2:
-                tags.append("advance")
-            if team.number == "14259":
-                tags.append("highlight")
-            
-            self.tree_adv.insert("", "end", values=(
-                rank,
-                team.number,
-                team.name,
-                qual_pts,
-                all_pts,
-                award_pts,
-                play_pts,
-                team.advancement_points
-            ), tags=tuple(tags))
-            
+        # Standings and advancement are recomputed together
+        self.refresh_standings()
+
 import re
@@ -0,0 +1,326 @@
+import datetime
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Dict, Optional, Iterator
+import requests
+
+CACHE_DIR = os.environ.get('FTCSCOUT_CACHE_DIR', '.ftcscout_cache')
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace so formatting differences don't change the cache key."""
+    return re.sub(r'\s+', ' ', query).replace('{ ', '{').replace(' }', '}').strip()
+
+def cache_key(query: str, variables: Optional[Dict]) -> str:
+    text = normalize_query(query) + '\n' + json.dumps(variables or {}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def is_completed_event_data(payload: Dict, today: Optional[str] = None) -> bool:
+    """
+    True if every event in the response has an `end` date in the past.
+    Data for finished events never changes, so those responses are cached permanently.
+    """
+    ends = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            if 'end' in node and isinstance(node['end'], str):
+                ends.append(node['end'][:10])
+            for v in node.values():
+                walk(v)
+        elif isinstance(node, list):
+            for v in node:
+                walk(v)
+
+    walk(payload.get('data'))
+    return _all_ended(ends, today)
+
+def _all_ended(ends, today: Optional[str] = None) -> bool:
+    today = today or datetime.date.today().isoformat()
+    return bool(ends) and all(end < today for end in ends)
+
+class CachedResponse:
+    """Just enough of requests.Response for the GraphQL callers in this app."""
+    def __init__(self, payload: Dict, status_code: int = 200, from_cache: bool = True):
+        self.status_code = status_code
+        self.from_cache = from_cache
+        self._body = json.dumps(payload, separators=(',', ':')).encode()
+        self._payload = payload
+
+    @property
+    def text(self) -> str:
+        return self._body.decode()
+
+    def json(self) -> Dict:
+        return self._payload
+
+    def iter_content(self, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        for i in range(0, len(self._body), chunk_size):
+            yield self._body[i:i + chunk_size]
+
+    def close(self):
+        pass
+
+class CachedBodyResponse:
+    """A cached streamed body, read back from disk in chunks like a live response."""
+    status_code = 200
+    from_cache = True
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @property
+    def text(self) -> str:
+        with open(self.path, 'rb') as f:
+            return f.read().decode()
+
+    def json(self) -> Dict:
+        with open(self.path, 'rb') as f:
+            return json.load(f)
+
+    def iter_content(self, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        with open(self.path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def close(self):
+        pass
+
+# Scanned for in streamed bodies, which are never parsed as a whole
+_END_FIELD = re.compile(rb'"end"\s*:\s*"(\d{4}-\d{2}-\d{2})')
+_ERRORS_FIELD = re.compile(rb'"errors"\s*:')
+_NULL_DATA = re.compile(rb'\s*\{\s*"data"\s*:\s*null')
+SCAN_OVERLAP = 64
+
+class BodyWriter:
+    """
+    Copies a streamed response body into a cache entry as it is read. The entry only
+    replaces the previous one on commit(), once the whole body has been seen.
+    """
+    def __init__(self, cache: 'GraphQLCache', query: str, variables: Optional[Dict]):
+        self.cache = cache
+        self.query = query
+        self.variables = variables
+        os.makedirs(cache.directory, exist_ok=True)
+        fd, self._tmp = tempfile.mkstemp(dir=cache.directory, suffix='.body.tmp')
+        self._file = os.fdopen(fd, 'wb')
+        self._head = b''
+        self._tail = b''
+        self._ends = []
+        self._errors = False
+        self._done = False
+
+    def write(self, chunk: bytes):
+        self._file.write(chunk)
+        if len(self._head) < SCAN_OVERLAP:
+            self._head += chunk[:SCAN_OVERLAP]
+        window = self._tail + chunk
+        self._ends.extend(m.decode() for m in _END_FIELD.findall(window))
+        self._errors = self._errors or _ERRORS_FIELD.search(window) is not None
+        self._tail = window[-SCAN_OVERLAP:]
+
+    def commit(self):
+        if self._done:
+            return
+        self._done = True
+        self._file.close()
+        if self._errors or not self._head or _NULL_DATA.match(self._head):
+            os.remove(self._tmp)
+            return
+        key = cache_key(self.query, self.variables)
+        os.replace(self._tmp, self.cache._body_path(key))
+        self.cache._write_entry(key, {
+            'query': normalize_query(self.query),
+            'variables': self.variables or {},
+            'stored_at': time.time(),
+            'permanent': _all_ended(self._ends),
+            'body': key + '.body'
+        })
+
+    def discard(self):
+        if self._done:
+            return
+        self._done = True
+        self._file.close()
+        os.remove(self._tmp)
+
+class GraphQLCache:
+    """
+    One JSON file per (normalized query, variables) under `directory`. Streamed responses
+    keep their raw body in a `.body` file next to it instead of under 'response'.
+    """
+    def __init__(self, directory: str = CACHE_DIR):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.json')
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.body')
+
+    def entry(self, query: str, variables: Optional[Dict]) -> Optional[Dict]:
+        """The entry's metadata; a streamed body stays on disk (see response())."""
+        key = cache_key(query, variables)
+        try:
+            with open(self._path(key), 'r') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading cache entry: {e}")
+            return None
+        if 'body' in entry and not os.path.exists(self._body_path(key)):
+            return None
+        return entry
+
+    def get(self, query: str, variables: Optional[Dict]) -> Optional[Dict]:
+        entry = self.entry(query, variables)
+        if entry is not None and 'response' not in entry:
+            try:
+                entry['response'] = self.response(entry).json()
+            except Exception as e:
+                print(f"Error reading cache entry: {e}")
+                return None
+        return entry
+
+    def response(self, entry: Dict):
+        """A response serving a cached entry."""
+        if 'response' in entry:
+            return CachedResponse(entry['response'])
+        return CachedBodyResponse(os.path.join(self.directory, entry['body']))
+
+    def writer(self, query: str, variables: Optional[Dict]) -> BodyWriter:
+        return BodyWriter(self, query, variables)
+
+    def put(self, query: str, variables: Optional[Dict], payload: Dict, permanent: bool = False):
+        os.makedirs(self.directory, exist_ok=True)
+        key = cache_key(query, variables)
+        self._write_entry(key, {
+            'query': normalize_query(query),
+            'variables': variables or {},
+            'stored_at': time.time(),
+            'permanent': permanent,
+            'response': payload
+        })
+        try:
+            os.remove(self._body_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _write_entry(self, key: str, entry: Dict):
+        path = self._path(key)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(entry, f, separators=(',', ':'))
+        os.replace(tmp, path)
+
+class StreamedResponse:
+    """A live streamed response whose body is copied into the cache as the caller reads it."""
+    from_cache = False
+
+    def __init__(self, response, writer: BodyWriter):
+        self._response = response
+        self._writer = writer
+        self.status_code = response.status_code
+
+    def iter_content(self, chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+        for chunk in self._response.iter_content(chunk_size):
+            self._writer.write(chunk)
+            yield chunk
+        self._writer.commit()
+
+    def close(self):
+        # A body that was not read to the end is not cached
+        self._writer.discard()
+        self._response.close()
+
+class CachedSession:
+    """
+    Drop-in for requests.post against the GraphQL API:
+      - permanent entries (finished events) and, with a ttl, younger ones are served without touching the network
+      - with stale_while_revalidate, older entries within it are served immediately and refreshed in the background
+      - anything else goes to the network; if that fails, any cached copy is served (stale-if-error)
+    stream=True calls get the live response, read incrementally by the caller; its body is
+    written to the cache as it passes through, and cached copies are read back from disk.
+    """
+    def __init__(self, cache: Optional[GraphQLCache] = None, ttl: float = 0,
+                 stale_while_revalidate: float = 0, http=None):
+        self.cache = cache or GraphQLCache()
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.http = http or requests
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def post(self, url: str, json: Dict, stream: bool = False, **kwargs):
+        query, variables = json.get('query', ''), json.get('variables')
+        entry = self.cache.entry(query, variables)
+        if entry is not None:
+            age = time.time() - entry['stored_at']
+            if entry['permanent'] or age < self.ttl:
+                return self.cache.response(entry)
+            if age < self.ttl + self.stale_while_revalidate:
+                self._revalidate_in_background(url, json, stream)
+                return self.cache.response(entry)
+
+        try:
+            return self._fetch_stream(url, json) if stream else self._fetch(url, json)
+        except requests.RequestException as e:
+            if entry is not None:
+                print(f"FTCScout unreachable ({e.__class__.__name__}); serving cached response")
+                return self.cache.response(entry)
+            raise
+
+    def _fetch(self, url: str, body: Dict):
+        response = self.http.post(url, json=body, timeout=30)
+        if response.status_code != 200:
+            return response
+        payload = response.json()
+        if payload.get('data') and not payload.get('errors'):
+            self.cache.put(body.get('query', ''), body.get('variables'), payload,
+                           permanent=is_completed_event_data(payload))
+        return CachedResponse(payload, from_cache=False)
+
+    def _fetch_stream(self, url: str, body: Dict):
+        response = self.http.post(url, json=body, stream=True, timeout=30)
+        if response.status_code != 200:
+            return response
+        return StreamedResponse(response, self.cache.writer(body.get('query', ''), body.get('variables')))
+
+    def _revalidate_in_background(self, url: str, body: Dict, stream: bool = False):
+        key = cache_key(body.get('query', ''), body.get('variables'))
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                if stream:
+                    response = self._fetch_stream(url, body)
+                    try:
+                        for _ in response.iter_content():
+                            pass
+                    finally:
+                        response.close()
+                else:
+                    self._fetch(url, body)
+            except requests.RequestException:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+# Shared by the fetchers unless a session is passed explicitly. No ttl: the app's background
+# fetch already runs every 300 s, so events still in progress are always fetched and only
+# finished ones come from the cache (or any copy, when FTCScout is unreachable).
+default_session = CachedSession(ttl=0, stale_while_revalidate=0)
@@ -0,0 +1,192 @@
+import codecs
+import json
+import os
+import re
+from typing import Iterable, Iterator, Dict, List, Tuple, Callable, Optional
+from src.data_manager import PERFORMANCES_PATH, ARCHIVE_PATH
+from src.archive import ArchiveBuilder, MatchArchive
+from src.fetch_ftcscout_data import calculate_match_rp
+from src.graphql_client import GRAPHQL_URL, MATCH_SELECTION
+from src.http_cache import default_session
+from src.rules import SeasonRules, rules_for
+
+LEAGUE_MEETS = [
+    ("USCANOEBM1", "M1"),
+    ("USCANOEBM2", "M2"),
+    ("USCANOEBM3", "M3")
+]
+
+EVENT_MATCHES_QUERY = """
+query($code: String!, $season: Int!) {
+  eventByCode(code: $code, season: $season) {
+    end
+    matches {%s}
+  }
+}
+""" % MATCH_SELECTION
+
+_decoder = json.JSONDecoder()
+
+# "field": "string" pairs, for the scalar fields in front of the streamed array
+_STRING_FIELD = re.compile(r'"(\w+)"\s*:\s*"([^"\\]*)"')
+MAX_HEAD_CHARS = 64 * 1024
+
+def iter_array_items(chunks: Iterable[bytes], key: str = 'matches', head: Optional[Dict] = None) -> Iterator[Dict]:
+    """
+    Incrementally yields the elements of the first JSON array stored under `key`
+    in a byte stream. Only the element being decoded is held in memory.
+    With `head`, the string fields that precede the array (e.g. an event's end date)
+    are stored in it before the first element is yielded.
+    """
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    marker = f'"{key}"'
+    buf = ''
+    pos = 0
+    in_array = False
+    skipped = ''
+    chunks = iter(chunks)
+
+    def more() -> bool:
+        nonlocal buf, pos, skipped
+        for chunk in chunks:
+            if chunk:
+                if not in_array and head is not None:
+                    skipped = (skipped + buf[:pos])[-MAX_HEAD_CHARS:]
+                buf = buf[pos:] + utf8.decode(chunk)
+                pos = 0
+                return True
+        return False
+
+    # Find `"key"` followed by `:` and `[`
+    while not in_array:
+        idx = buf.find(marker, pos)
+        if idx != -1:
+            bracket = buf.find('[', idx + len(marker))
+            if bracket != -1:
+                if head is not None:
+                    head.update(_STRING_FIELD.findall(skipped + buf[:idx]))
+                pos = bracket + 1
+                in_array = True
+                break
+            pos = idx
+        else:
+            # Keep a tail in case the marker is split across chunks
+            pos = max(pos, len(buf) - len(marker))
+        if not more():
+            return
+
+    while True:
+        # Skip separators between elements
+        while pos < len(buf) and buf[pos] in ' \t\r\n,':
+            pos += 1
+        if pos >= len(buf):
+            if not more():
+                return
+            continue
+        if buf[pos] == ']':
+            return
+        try:
+            item, end = _decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # Element is incomplete; read more
+            if not more():
+                raise
+            continue
+        pos = end
+        yield item
+
+def stream_event_matches(event_code: str, season: int = 2025, session=None,
+                         event: Optional[Dict] = None) -> Iterator[Dict]:
+    """
+    Yield raw match objects for one event straight off the HTTP response. The event's own
+    fields (its `end` date) go into `event`, when given, before the first match.
+    """
+    http = session or default_session
+    response = http.post(GRAPHQL_URL, json={'query': EVENT_MATCHES_QUERY,
+                                            'variables': {'code': event_code, 'season': season}},
+                         stream=True)
+    try:
+        if response.status_code != 200:
+            print(f"Error fetching {event_code}: {response.status_code}")
+            return
+        chunks = response.iter_content(chunk_size=64 * 1024)
+        yield from iter_array_items(chunks, head=event)
+        # Read the rest of the body so the session can cache it whole
+        for _ in chunks:
+            pass
+    finally:
+        response.close()
+
+def match_performances(match: Dict, match_id: str, rules: Optional[SeasonRules] = None) -> Iterator[Dict]:
+    """Compact per-team performance records for one raw match."""
+    for team_data in match['teams']:
+        team_num = str(team_data['teamNumber'])
+        rp, score = calculate_match_rp(match, team_num, rules)
+        yield {
+            'team': team_num,
+            'match_id': match_id,
+            'rp': rp,
+            'score': score,
+            'surrogate': team_data.get('surrogate', False)
+        }
+
+def _fetch_event(event_code: str, event: Dict) -> Iterable[Dict]:
+    return stream_event_matches(event_code, event=event)
+
+def ingest_performances(meets: List[Tuple[str, str]], out_path: str = PERFORMANCES_PATH,
+                        fetch: Callable[[str, Dict], Iterable[Dict]] = _fetch_event,
+                        archive_path: Optional[str] = None, season: int = 2025) -> int:
+    """
+    Stream every match of every (event_code, prefix) meet into compact NDJSON
+    performance records, one line each. The file is replaced atomically at the end.
+    With archive_path, the same matches also replace those events in the columnar archive
+    (spooled to disk as they arrive, dated with the `end` that fetch(code, event) puts in event).
+    Returns the number of records written.
+    """
+    tmp_path = out_path + '.tmp'
+    rules = rules_for(season)
+    builder = ArchiveBuilder() if archive_path else None
+    count = 0
+    try:
+        with open(tmp_path, 'w') as out:
+            for event_code, prefix in meets:
+                print(f"Fetching {event_code}...")
+                index = builder.add_event(event_code, season, prefix, 'league') if builder else None
+                event = {}
+                for match in fetch(event_code, event):
+                    if builder:
+                        builder.add_raw_match(index, match)
+                    for perf in match_performances(match, f"{prefix}-Q{match['matchNum']}", rules):
+                        out.write(json.dumps(perf, separators=(',', ':')) + '\n')
+                        count += 1
+                if builder and event.get('end'):
+                    builder.add_event(event_code, season, prefix, 'league', end=event['end'][:10])
+        if count == 0:
+            # Nothing came back; keep the previous data
+            os.remove(tmp_path)
+            return 0
+        os.replace(tmp_path, out_path)
+        if builder:
+            if os.path.isdir(archive_path):
+                builder.extend_from(MatchArchive(archive_path), [(season, code) for code, _ in meets])
+            builder.write(archive_path)
+        return count
+    finally:
+        if builder:
+            builder.close()
+
+def iter_performances(path: str = PERFORMANCES_PATH) -> Iterator[Dict]:
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def update_live_data() -> bool:
+    """Callable function to update data from FTCScout (streaming path used by the app)."""
+    try:
+        count = ingest_performances(LEAGUE_MEETS, archive_path=ARCHIVE_PATH)
+        print(f"Saved {count} performances to {PERFORMANCES_PATH}")
+        return count > 0
+    except Exception as e:
+        print(f"Error ingesting data: {e}")
+        return False
@@ -0,0 +1,229 @@
+"""
+Match leverage: how much each remaining tournament match matters to each team.
+
+For every remaining match the analysis compares two counterfactuals, red wins and
+blue wins, each averaged over sampled outcomes of all the other remaining matches
+(the same samples on both sides, so the difference is the match itself and not noise).
+The leverage of a match for a team is the swing in the team's expected league rank
+and expected advancement points between the two.
+
+All scenarios go through BatchRanker, which applies the ranking rule of
+RankingCalculator.calculate_league_rankings (the season rules' counted matches and rank
+order - in 2025 top 10 league RP + top 5 tournament RP, ties by average score - then
+input order) to a whole batch of outcomes as array operations instead of cloning and
+re-ranking teams once per scenario.
+"""
+from typing import List, Dict, Optional, Sequence, Tuple
+import numpy as np
+from src.data_manager import Team
+from src.ranking_calculator import RankingCalculator
+from src.playoff_simulator import PlayoffSimulator
+from src.rules import SeasonRules
+
+BONUS_RPS = 3  # movement, goal, pattern (as predicted by MatchPredictor)
+# Scenario rows ranked per array operation; bounds memory at roughly CHUNK * teams * (5 + matches per team)
+CHUNK = 2048
+
+class BatchRanker:
+    """
+    League ranks of `teams` (in the order they would be passed to calculate_league_rankings)
+    after many different outcomes of the same remaining matches.
+    """
+    def __init__(self, teams: List[Team], matches: Sequence[Tuple[List[str], List[str]]],
+                 calculator: type = RankingCalculator):
+        self.rules = rules = calculator.rules
+        self.numbers = [t.number for t in teams]
+        index = {num: i for i, num in enumerate(self.numbers)}
+        n = len(teams)
+        self.league_rp = np.zeros(n, dtype=np.int64)
+        self.top_tournament = np.zeros((n, rules.tournament_count), dtype=np.int64)
+        self.score_sum = np.zeros(n, dtype=np.int64)
+        self.played = np.zeros(n, dtype=np.int64)
+        for i, team in enumerate(teams):
+            league, tournament = RankingCalculator.team_performances(team)
+            top_league, _ = rules.counted_performances(league, tournament)
+            self.league_rp[i] = sum(p['rp'] for p in top_league)
+            # Only the best existing tournament RPs (five in 2025) can still count
+            best = sorted((p['rp'] for p in tournament), reverse=True)[:rules.tournament_count]
+            self.top_tournament[i, :len(best)] = best
+            self.score_sum[i] = sum(p['score'] for p in league + tournament)
+            self.played[i] = len(league) + len(tournament)
+
+        # Each team's appearances in the remaining matches as (match, side) slots
+        appearances: List[List[Tuple[int, int]]] = [[] for _ in range(n)]
+        for m, (red, blue) in enumerate(matches):
+            for side, alliance in enumerate((red, blue)):
+                for num in alliance:
+                    if num in index:
+                        appearances[index[num]].append((m, side))
+        k = max([len(a) for a in appearances] + [1])
+        # Empty slots point at an extra always-zero column
+        self.slot = np.full((n, k), 2 * len(matches), dtype=np.int64)
+        for i, slots in enumerate(appearances):
+            for j, (m, side) in enumerate(slots):
+                self.slot[i, j] = 2 * m + side
+        self.played_after = self.played + np.array([len(a) for a in appearances], dtype=np.int64)
+        self.order = np.arange(n)
+
+    def rank(self, rp: np.ndarray, score: np.ndarray) -> np.ndarray:
+        """
+        rp and score are (batch, matches, 2) per-alliance results (red, blue).
+        Returns (batch, teams) league ranks.
+        """
+        batch = rp.shape[0]
+        pad = np.zeros((batch, 1), dtype=np.int64)
+        new_rp = np.concatenate([rp.reshape(batch, -1), pad], axis=1)[:, self.slot]
+        new_score = np.concatenate([score.reshape(batch, -1), pad], axis=1)[:, self.slot]
+        candidates = np.concatenate([np.broadcast_to(self.top_tournament, (batch,) + self.top_tournament.shape),
+                                     new_rp], axis=2)
+        candidates.sort(axis=2)
+        total_rp = self.league_rp + candidates[:, :, -self.rules.tournament_count:].sum(axis=2)
+        total_score = self.score_sum + new_score.sum(axis=2)
+        avg = np.divide(total_score, self.played_after, out=np.zeros(total_score.shape), where=self.played_after > 0)
+        keys = {'total_rp': total_rp, 'avg_score': avg, 'matches_played': np.broadcast_to(self.played_after, avg.shape)}
+        # The rules' rank order (highest first), then input order (assign_ranks sorts stably);
+        # lexsort takes the primary key last
+        order = np.lexsort([np.broadcast_to(self.order, total_rp.shape)] +
+                           [-keys[k] for k in reversed(self.rules.rank_order)])
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.arange(1, len(self.numbers) + 1), axis=1)
+        return ranks
+
+class OutcomeModel:
+    """
+    Per-match outcome distribution: each alliance's score is normal around its expected
+    score (rounded, at least 0), each bonus RP is an independent coin with its own chance.
+    """
+    def __init__(self, red_mean: np.ndarray, blue_mean: np.ndarray, sigma: np.ndarray,
+                 red_bonus: np.ndarray, blue_bonus: np.ndarray):
+        self.red_mean, self.blue_mean, self.sigma = red_mean, blue_mean, sigma
+        # (matches, BONUS_RPS) probabilities
+        self.red_bonus, self.blue_bonus = red_bonus, blue_bonus
+
+    @classmethod
+    def from_history(cls, matches: Sequence[Tuple[List[str], List[str]]], teams: Dict[str, Team]) -> 'OutcomeModel':
+        """Alliance scores from the teams' past scores (as PlayoffSimulator does); bonus RPs unknown (0)."""
+        def alliance(members):
+            stats = [PlayoffSimulator.team_score_stats(teams[t]) for t in members if t in teams]
+            if not stats:
+                return 0.0, PlayoffSimulator.DEFAULT_STD
+            return (sum(s[0] for s in stats) / len(stats),
+                    (sum(s[1] ** 2 for s in stats) / len(stats)) ** 0.5)
+        red = np.array([alliance(r) for r, _ in matches]).reshape(-1, 2)
+        blue = np.array([alliance(b) for _, b in matches]).reshape(-1, 2)
+        zeros = np.zeros((len(matches), BONUS_RPS))
+        return cls(red[:, 0], blue[:, 0], np.sqrt((red[:, 1] ** 2 + blue[:, 1] ** 2) / 2), zeros, zeros)
+
+    @classmethod
+    def from_predictor(cls, predictor, matches: Sequence[Tuple[List[str], List[str]]]) -> 'OutcomeModel':
+        """Expected scores and calibrated bonus-RP chances from a fitted MatchPredictor."""
+        pad = lambda a: [int(t) for t in a[:2]] + [0] * (2 - len(a[:2]))
+        pred = predictor.predict(np.array([pad(r) for r, _ in matches]).reshape(-1, 2),
+                                 np.array([pad(b) for _, b in matches]).reshape(-1, 2))
+        bonus = {side: np.nan_to_num(np.stack([pred[f'{side}_{c}'] for c in ('movement', 'goal', 'pattern')], axis=1))
+                 for side in ('red', 'blue')}
+        # The predictor's sigma is for the margin; split it over the two alliance scores
+        sigma = np.full(len(matches), predictor.sigma / np.sqrt(2))
+        return cls(pred['red_score'], pred['blue_score'], sigma, bonus['red'], bonus['blue'])
+
+    def sample(self, n: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+        """(score, bonus) arrays of shape (n, matches, 2)."""
+        m = len(self.red_mean)
+        mean = np.stack([self.red_mean, self.blue_mean], axis=1)
+        score = np.maximum(np.rint(mean + rng.standard_normal((n, m, 2)) * self.sigma[:, None]), 0).astype(np.int64)
+        chance = np.stack([self.red_bonus, self.blue_bonus], axis=1)
+        bonus = (rng.random((n, m, 2, BONUS_RPS)) < chance).sum(axis=3)
+        return score, bonus
+
+def match_rp(score: np.ndarray, bonus: np.ndarray, rules: SeasonRules = RankingCalculator.rules) -> np.ndarray:
+    """Per-alliance RP from (batch, matches, 2) scores: win / tie / loss RP (3 / 1 / 0 in 2025) plus bonus RPs."""
+    red, blue = score[..., 0], score[..., 1]
+    return np.stack([rules.result_rp_array(red, blue), rules.result_rp_array(blue, red)], axis=-1) + bonus
+
+def _force_winner(score: np.ndarray, match: np.ndarray, side: np.ndarray):
+    """In place: row i's match[i] is won by side[i] (0 red, 1 blue), keeping the sampled scores where possible."""
+    rows = np.arange(len(match))
+    a, b = score[rows, match, 0], score[rows, match, 1]
+    high, low = np.maximum(a, b), np.minimum(a, b)
+    high = np.where(high == low, high + 1, high)
+    score[rows, match, side] = high
+    score[rows, match, 1 - side] = low
+
+class LeverageAnalyzer:
+    def __init__(self, n_sims: int = 200, seed: int = 2025, calculator: type = RankingCalculator):
+        self.n_sims = n_sims
+        self.seed = seed
+        self.calculator = calculator
+        self.scenarios_ranked = 0
+
+    def analyze(self, teams: List[Team], matches: List[Dict], model: OutcomeModel,
+                advancement_bonus: Optional[Dict[str, int]] = None, top: Optional[int] = 5) -> Dict:
+        """
+        teams: in calculate_league_rankings input order. matches: remaining matches as
+        {'match_id', 'red': [..], 'blue': [..]}. advancement_bonus: each team's non-ranking
+        advancement points (alliance selection, awards, playoffs). Keeps the `top` matches
+        per team by advancement-point swing (all if None).
+        """
+        alliances = [(m['red'], m['blue']) for m in matches]
+        ranker = BatchRanker(teams, alliances, self.calculator)
+        bonus_ap = np.array([(advancement_bonus or {}).get(num, 0) for num in ranker.numbers])
+        n_teams, n_matches, s = len(teams), len(matches), self.n_sims
+        rng = np.random.default_rng(self.seed)
+        base_score, base_bonus = model.sample(s, rng)
+
+        def evaluate(score, bonus):
+            ranks = np.concatenate([ranker.rank(match_rp(score[i:i + CHUNK], bonus[i:i + CHUNK], ranker.rules),
+                                                score[i:i + CHUNK])
+                                    for i in range(0, len(score), CHUNK)])
+            self.scenarios_ranked += len(score)
+            return ranks, ranker.rules.qualification_points_array(ranks) + bonus_ap
+
+        base_rank, base_ap = evaluate(base_score, base_bonus)
+
+        # 2 * matches counterfactual batches, each reusing the base samples
+        per_batch = max(1, CHUNK // s)
+        cond_rank = np.empty((n_matches, 2, n_teams))
+        cond_ap = np.empty((n_matches, 2, n_teams))
+        for start in range(0, n_matches, per_batch):
+            block = np.arange(start, min(start + per_batch, n_matches))
+            # Rows ordered (match, side, sample)
+            match = np.repeat(block, 2 * s)
+            side = np.tile(np.repeat([0, 1], s), len(block))
+            score = np.tile(base_score, (2 * len(block), 1, 1))
+            _force_winner(score, match, side)
+            ranks, ap = evaluate(score, np.tile(base_bonus, (2 * len(block), 1, 1)))
+            cond_rank[block] = ranks.reshape(len(block), 2, s, n_teams).mean(axis=2)
+            cond_ap[block] = ap.reshape(len(block), 2, s, n_teams).mean(axis=2)
+
+        red_win = (base_score[:, :, 0] > base_score[:, :, 1]).mean(axis=0)
+        rank_swing = np.abs(cond_rank[:, 0] - cond_rank[:, 1])
+        ap_swing = np.abs(cond_ap[:, 0] - cond_ap[:, 1])
+
+        result_teams = {}
+        for t, num in enumerate(ranker.numbers):
+            entries = []
+            for m, match in enumerate(matches):
+                entries.append({
+                    'match_id': match['match_id'],
+                    'alliance': 'red' if num in match['red'] else 'blue' if num in match['blue'] else None,
+                    'p_red_win': round(float(red_win[m]), 3),
+                    'rank_if_red': round(float(cond_rank[m, 0, t]), 2),
+                    'rank_if_blue': round(float(cond_rank[m, 1, t]), 2),
+                    'ap_if_red': round(float(cond_ap[m, 0, t]), 2),
+                    'ap_if_blue': round(float(cond_ap[m, 1, t]), 2),
+                    'rank_swing': round(float(rank_swing[m, t]), 2),
+                    'ap_swing': round(float(ap_swing[m, t]), 2)
+                })
+            entries.sort(key=lambda e: (-e['ap_swing'], -e['rank_swing'], e['match_id']))
+            result_teams[num] = {
+                'expected_rank': round(float(base_rank[:, t].mean()), 2),
+                'expected_ap': round(float(base_ap[:, t].mean()), 2),
+                'matches': entries[:top] if top is not None else entries
+            }
+        result_matches = sorted(({'match_id': match['match_id'], 'red': match['red'], 'blue': match['blue'],
+                                  'p_red_win': round(float(red_win[m]), 3),
+                                  'total_ap_swing': round(float(ap_swing[m].sum()), 2),
+                                  'total_rank_swing': round(float(rank_swing[m].sum()), 2)}
+                                 for m, match in enumerate(matches)),
+                                key=lambda e: (-e['total_ap_swing'], e['match_id']))
+        return {'sims': s, 'scenarios': (2 * n_matches + 1) * s, 'teams': result_teams, 'matches': result_matches}
@@ -0,0 +1,253 @@
+"""
+Secondary indexes over every known match, for ad-hoc queries.
+
+Records are the league matches (the archive's latest season, else meets_data.json)
+plus the tournament matches, each under an integer id that also gives chronological
+order. Kept per record:
+  by team, by partner pair, by opponent pair, by event, by kind, by surrogate team
+  score arrays sorted per team and overall, searched with bisect
+A query starts from whichever index yields the fewest candidates for its filters and
+checks the remaining filters on those only, so the cost follows the size of the
+narrowest filter rather than the number of matches. MatchIndex.attach() keeps the
+indexes in step with DataManager: added matches are indexed, deleted ones removed.
+"""
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right, insort
+from itertools import combinations
+from typing import List, Dict, Optional, Iterable, Iterator, Set, Tuple
+from src.data_manager import DataManager, Match
+from src.archive import MatchArchive
+
+SORTS = {'time', 'score', 'rp'}
+
+def _pair(a: str, b: str) -> Tuple[str, str]:
+    return (a, b) if a < b else (b, a)
+
+def match_record(match: Match) -> Dict:
+    return {'match_id': match.match_id, 'event': 'TOURNAMENT', 'kind': 'tournament',
+            'red': list(match.red_alliance), 'blue': list(match.blue_alliance),
+            'red_score': match.red_score, 'blue_score': match.blue_score,
+            'red_rp': match.red_rp, 'blue_rp': match.blue_rp, 'surrogates': list(match.surrogates)}
+
+def league_records(archive_path: Optional[str] = None, meets_path: str = 'meets_data.json') -> Iterator[Dict]:
+    """League matches of the archive's latest season, or of meets_data.json without an archive."""
+    if archive_path and os.path.isdir(archive_path):
+        archive = MatchArchive(archive_path)
+        for m in archive.iter_matches(archive.latest_season()):
+            if m['kind'] == 'league':
+                yield {k: m[k] for k in ('match_id', 'event', 'kind', 'red', 'blue', 'red_score', 'blue_score',
+                                         'red_rp', 'blue_rp', 'surrogates')}
+        return
+    if not os.path.exists(meets_path):
+        return
+    with open(meets_path, 'r') as f:
+        meets = json.load(f)
+    for key in sorted(meets):
+        prefix = f"M{key[len('meet'):]}" if key.startswith('meet') else key
+        for m in sorted(meets[key], key=lambda m: m['match_num']):
+            yield {'match_id': f"{prefix}-Q{m['match_num']}", 'event': prefix, 'kind': 'league',
+                   'red': m['red'], 'blue': m['blue'], 'red_score': m['red_score'], 'blue_score': m['blue_score'],
+                   'red_rp': m['red_rp'], 'blue_rp': m['blue_rp'], 'surrogates': m.get('surrogates', [])}
+
+class MatchIndex:
+    def __init__(self, archive_path: Optional[str] = None, meets_path: str = 'meets_data.json'):
+        self.archive_path = archive_path
+        self.meets_path = meets_path
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self):
+        self.records: Dict[int, Dict] = {}
+        self._ids: Dict[Tuple[str, str], int] = {}
+        self._next = 0
+        self.by_team: Dict[str, Set[int]] = {}
+        self.by_partners: Dict[Tuple[str, str], Set[int]] = {}
+        self.by_opponents: Dict[Tuple[str, str], Set[int]] = {}
+        self.by_event: Dict[str, Set[int]] = {}
+        self.by_kind: Dict[str, Set[int]] = {}
+        self.by_surrogate: Dict[str, Set[int]] = {}
+        self.with_surrogates: Set[int] = set()
+        # Sorted (alliance score, record id, side) overall, and (score, record id) per team
+        self.scores: List[Tuple[int, int, int]] = []
+        self.team_scores: Dict[str, List[Tuple[int, int]]] = {}
+
+    # Maintenance
+
+    def _keys(self, record: Dict) -> Iterator[Tuple[Dict, object]]:
+        """(index, key) for every set index entry of a record."""
+        for team in record['red'] + record['blue']:
+            yield self.by_team, team
+        for alliance in (record['red'], record['blue']):
+            for a, b in combinations(alliance, 2):
+                yield self.by_partners, _pair(a, b)
+        for a in record['red']:
+            for b in record['blue']:
+                yield self.by_opponents, _pair(a, b)
+        yield self.by_event, record['event']
+        yield self.by_kind, record['kind']
+        for team in record['surrogates']:
+            yield self.by_surrogate, team
+
+    def add(self, record: Dict):
+        with self._lock:
+            key = (record['kind'], record['match_id'])
+            if key in self._ids:
+                self.remove(*key)
+            rid = self._next
+            self._next += 1
+            self._ids[key] = rid
+            self.records[rid] = record
+            for index, k in self._keys(record):
+                index.setdefault(k, set()).add(rid)
+            if record['surrogates']:
+                self.with_surrogates.add(rid)
+            for side, (alliance, score) in enumerate(((record['red'], record['red_score']),
+                                                      (record['blue'], record['blue_score']))):
+                insort(self.scores, (score, rid, side))
+                for team in alliance:
+                    insort(self.team_scores.setdefault(team, []), (score, rid))
+
+    def remove(self, kind: str, match_id: str) -> bool:
+        with self._lock:
+            rid = self._ids.pop((kind, match_id), None)
+            if rid is None:
+                return False
+            record = self.records.pop(rid)
+            for index, k in self._keys(record):
+                entries = index[k]
+                entries.discard(rid)
+                if not entries:
+                    del index[k]
+            self.with_surrogates.discard(rid)
+            for side, (alliance, score) in enumerate(((record['red'], record['red_score']),
+                                                      (record['blue'], record['blue_score']))):
+                del self.scores[bisect_left(self.scores, (score, rid, side))]
+                for team in alliance:
+                    scores = self.team_scores[team]
+                    del scores[bisect_left(scores, (score, rid))]
+            return True
+
+    def remove_kind(self, kind: str):
+        with self._lock:
+            for rid in list(self.by_kind.get(kind, ())):
+                self.remove(kind, self.records[rid]['match_id'])
+
+    def rebuild(self, data_manager: DataManager):
+        with self._lock:
+            self._clear()
+            for record in league_records(self.archive_path, self.meets_path):
+                self.add(record)
+            for match in data_manager.matches:
+                if match.match_type == "TOURNAMENT":
+                    self.add(match_record(match))
+
+    def attach(self, data_manager: DataManager):
+        """Index data_manager's matches, then follow its changes."""
+        self.rebuild(data_manager)
+        data_manager.subscribe(lambda event, teams, payload: self._on_data_change(data_manager, event, payload))
+
+    def _on_data_change(self, data_manager: DataManager, event: str, payload: Dict):
+        if event == 'match_added':
+            self.add(match_record(payload['match']))
+        elif event == 'matches_imported':
+            for match in payload['matches']:
+                self.add(match_record(match))
+        elif event == 'match_deleted':
+            self.remove('tournament', payload['match_id'])
+        elif event == 'tournament_cleared':
+            self.remove_kind('tournament')
+        else:
+            self.rebuild(data_manager)
+
+    # Queries
+
+    def _score_range(self, team: Optional[str], low: Optional[int], high: Optional[int]) -> Tuple[int, Iterable[int]]:
+        """Candidate ids with a (team's) alliance score in [low, high], from the sorted arrays."""
+        low = float('-inf') if low is None else low
+        high = float('inf') if high is None else high
+        if team is not None:
+            scores = self.team_scores.get(team, [])
+            lo, hi = bisect_left(scores, (low,)), bisect_right(scores, (high, float('inf')))
+            return hi - lo, (rid for _, rid in scores[lo:hi])
+        lo, hi = bisect_left(self.scores, (low,)), bisect_right(self.scores, (high, float('inf')))
+        return hi - lo, (rid for _, rid, _ in self.scores[lo:hi])
+
+    def query(self, team: Optional[str] = None, partner: Optional[str] = None, opponent: Optional[str] = None,
+              event: Optional[str] = None, kind: Optional[str] = None,
+              min_score: Optional[int] = None, max_score: Optional[int] = None,
+              min_rp: Optional[int] = None, max_rp: Optional[int] = None, surrogate: Optional[bool] = None,
+              sort: str = 'time', limit: Optional[int] = 100, offset: int = 0) -> Tuple[int, List[Dict]]:
+        """
+        (total, page) of matching records. With `team`, partner / opponent are relative to it,
+        and the score, RP and surrogate filters apply to the team's alliance (to the team, for
+        surrogate); without it, to either alliance. sort is 'time', 'score' or 'rp', '-' for
+        descending. Raises ValueError on an invalid combination.
+        """
+        descending = sort.startswith('-')
+        sort_key = sort.lstrip('-')
+        if sort_key not in SORTS:
+            raise ValueError(f"sort must be one of {', '.join(sorted(SORTS))} (prefix - for descending)")
+        if (partner or opponent) and not team:
+            raise ValueError("partner and opponent need a team")
+        if team and team in (partner, opponent):
+            raise ValueError("partner and opponent must differ from team")
+
+        with self._lock:
+            # Each applicable index proposes its candidates; the smallest set drives the scan
+            sources = []
+            if team:
+                sources.append(self.by_team.get(team, set()))
+                if partner:
+                    sources.append(self.by_partners.get(_pair(team, partner), set()))
+                if opponent:
+                    sources.append(self.by_opponents.get(_pair(team, opponent), set()))
+            if event:
+                sources.append(self.by_event.get(event, set()))
+            if kind:
+                sources.append(self.by_kind.get(kind, set()))
+            if surrogate:
+                sources.append(self.by_surrogate.get(team, set()) if team else self.with_surrogates)
+            candidates = min(sources, key=len) if sources else None
+            if min_score is not None or max_score is not None:
+                size, ranged = self._score_range(team, min_score, max_score)
+                if candidates is None or size < len(candidates):
+                    candidates = set(ranged)
+            if candidates is None:
+                candidates = self.records.keys()
+
+            rows = []
+            for rid in candidates:
+                record = self.records[rid]
+                red, blue = record['red'], record['blue']
+                if team:
+                    if team in red:
+                        own, other = (red, record['red_score'], record['red_rp']), blue
+                    elif team in blue:
+                        own, other = (blue, record['blue_score'], record['blue_rp']), red
+                    else:
+                        continue
+                    if (partner and partner not in own[0]) or (opponent and opponent not in other):
+                        continue
+                    sides = [own[1:]]
+                else:
+                    sides = [(record['red_score'], record['red_rp']), (record['blue_score'], record['blue_rp'])]
+                if (event and record['event'] != event) or (kind and record['kind'] != kind):
+                    continue
+                if surrogate is not None:
+                    flagged = team in record['surrogates'] if team else bool(record['surrogates'])
+                    if flagged != surrogate:
+                        continue
+                matched = [(score, rp) for score, rp in sides
+                           if (min_score is None or score >= min_score) and (max_score is None or score <= max_score)
+                           and (min_rp is None or rp >= min_rp) and (max_rp is None or rp <= max_rp)]
+                if not matched:
+                    continue
+                value = rid if sort_key == 'time' else max(m[0 if sort_key == 'score' else 1] for m in matched)
+                rows.append((value, rid))
+
+            # Ties stay in chronological order
+            rows.sort(key=lambda r: (-r[0] if descending else r[0], r[1]))
+            page = rows[offset:offset + limit] if limit is not None else rows[offset:]
+            return len(rows), [self.records[rid] for _, rid in page]
@@ -0,0 +1,104 @@
+import json
+import threading
+import time
+from typing import Callable, Dict, Optional, Set
+
+class Materializer:
+    """
+    Keeps the serialized JSON of registered read views ready before anyone asks.
+
+    invalidate() marks views stale and wakes a worker thread, which waits `debounce`
+    seconds so a burst of edits collapses into one rebuild, then rebuilds every stale
+    view off the request path. get() is a dictionary lookup; it returns None while a
+    view is stale so the caller can compute inline and never serve data older than
+    its own last write.
+    """
+    def __init__(self, debounce: float = 0.05,
+                 serialize: Callable[[object], bytes] = lambda obj: json.dumps(obj, separators=(',', ':')).encode()):
+        self.debounce = debounce
+        self.serialize = serialize
+        self._views: Dict[str, Dict] = {}
+        self._ready: Dict[str, bytes] = {}
+        # A view is fresh when the generation it was built from is its current generation
+        self._generation: Dict[str, int] = {}
+        self._built: Dict[str, int] = {}
+        self._pending: Set[str] = set()
+        self._cond = threading.Condition()
+        self._thread = None
+        self.builds = 0
+
+    def register(self, key: str, build: Callable[[], object], group: str = 'data',
+                 on_built: Optional[Callable[[bytes], None]] = None):
+        with self._cond:
+            self._views[key] = {'build': build, 'group': group, 'on_built': on_built}
+            self._generation[key] = self._generation.get(key, 0) + 1
+            self._pending.add(key)
+            self._cond.notify()
+
+    def invalidate(self, group: Optional[str] = None):
+        """Mark every view (or every view of one group) stale."""
+        with self._cond:
+            for key, view in self._views.items():
+                if group is None or view['group'] == group:
+                    self._generation[key] += 1
+                    self._pending.add(key)
+            self._cond.notify()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._cond:
+            if key in self._views and self._built.get(key) == self._generation[key]:
+                return self._ready[key]
+            return None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def wait_idle(self, timeout: float = 5.0) -> bool:
+        """Block until no view is pending (used by tests)."""
+        deadline = time.time() + timeout
+        with self._cond:
+            while self._pending:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            time.sleep(self.debounce)
+            with self._cond:
+                batch = {key: self._generation[key] for key in self._pending}
+            for key, generation in batch.items():
+                self._rebuild(key, generation)
+            with self._cond:
+                self._cond.notify_all()
+
+    def _rebuild(self, key: str, generation: int):
+        view = self._views[key]
+        try:
+            body = self.serialize(view['build']())
+        except Exception as e:
+            print(f"Error materializing {key}: {e}")
+            with self._cond:
+                if self._generation[key] == generation:
+                    self._pending.discard(key)
+            return
+        with self._cond:
+            # Invalidated again while building: leave it pending for the next pass
+            if self._generation[key] != generation:
+                return
+            self._ready[key] = body
+            self._built[key] = generation
+            self._pending.discard(key)
+            self.builds += 1
+        if view['on_built']:
+            try:
+                view['on_built'](body)
+            except Exception as e:
+                print(f"Error publishing {key}: {e}")
@@ -0,0 +1,93 @@
+import threading
+from typing import List, Dict, Set, Iterable
+from src.data_manager import DataManager, Team
+from src.ranking_calculator import RankingCalculator
+
+class RankingPipeline:
+    """
+    Incremental version of calculate_league_rankings + calculate_advancement_points.
+
+    The computation is a small dataflow graph:
+        performances -> team totals (top-N RP, total RP, avg) -> league rank
+                     -> qualification points -> advancement points
+    Each team carries a version stamp per node. A mutation bumps the stamp of the
+    node it touches and only stale downstream nodes are recomputed on the next read:
+    an award change recomputes one team's advancement points plus the final sort.
+    """
+    def __init__(self, data_manager: DataManager):
+        self.data_manager = data_manager
+        self._lock = threading.RLock()
+
+        # Input stamps, bumped by invalidation
+        self._performance_version: Dict[str, int] = {}
+        self._advancement_input_version: Dict[str, int] = {}
+        # Stamps of the inputs each computed node was built from
+        self._totals_built_from: Dict[str, int] = {}
+        self._advancement_built_from: Dict[str, tuple] = {}
+
+        self._ranked: List[Team] = []
+        self._ranks_stale = True
+        self._advancement_sorted: List[Team] = []
+        self._advancement_stale = True
+
+        # Per-node recompute counters, handy for checking what a mutation cost
+        self.recomputed = {'team_totals': 0, 'league_rank': 0, 'advancement_points': 0}
+
+        data_manager.subscribe(self._on_data_change)
+
+    def _on_data_change(self, event: str, team_numbers: Set[str], payload: Dict):
+        self.invalidate_performances(team_numbers)
+
+    def invalidate_performances(self, team_numbers: Iterable[str]):
+        with self._lock:
+            for num in team_numbers:
+                self._performance_version[num] = self._performance_version.get(num, 0) + 1
+
+    def invalidate_advancement(self, team_numbers: Iterable[str] = None):
+        """Mark award/alliance/playoff inputs as changed (all teams when team_numbers is None)."""
+        with self._lock:
+            if team_numbers is None:
+                team_numbers = self.data_manager.teams.keys()
+            for num in team_numbers:
+                self._advancement_input_version[num] = self._advancement_input_version.get(num, 0) + 1
+
+    def standings(self) -> List[Team]:
+        """Teams sorted by league rank, recomputing only stale totals."""
+        with self._lock:
+            teams = self.data_manager.teams
+            changed = False
+            for num, team in teams.items():
+                version = self._performance_version.get(num, 0)
+                if self._totals_built_from.get(num) != version:
+                    # Breakdowns are built on demand (RankingCalculator.match_breakdown)
+                    RankingCalculator.calculate_team_totals(team, with_breakdown=False)
+                    self._totals_built_from[num] = version
+                    self.recomputed['team_totals'] += 1
+                    changed = True
+
+            if changed or self._ranks_stale or len(self._ranked) != len(teams):
+                self._ranked = RankingCalculator.assign_ranks(list(teams.values()))
+                self._ranks_stale = False
+                self.recomputed['league_rank'] += 1
+            return list(self._ranked)
+
+    def advancement(self, alliance_selections: Dict[str, int], awards: Dict[str, int],
+                    playoff_results: Dict[str, int]) -> List[Team]:
+        """Teams sorted by advancement points; a team is recomputed only if its rank or inputs changed."""
+        with self._lock:
+            ranked = self.standings()
+            changed = False
+            for team in ranked:
+                # Qualification points depend only on league rank
+                stamp = (team.league_rank, self._advancement_input_version.get(team.number, 0))
+                if self._advancement_built_from.get(team.number) != stamp:
+                    team.advancement_points = RankingCalculator.team_advancement_points(
+                        team, alliance_selections, awards, playoff_results)
+                    self._advancement_built_from[team.number] = stamp
+                    self.recomputed['advancement_points'] += 1
+                    changed = True
+
+            if changed or self._advancement_stale:
+                self._advancement_sorted = sorted(ranked, key=lambda t: t.advancement_points, reverse=True)
+                self._advancement_stale = False
+            return list(self._advancement_sorted)
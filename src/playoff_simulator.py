@@ -0,0 +1,124 @@
+import zlib
+from typing import List, Dict, Tuple
+import numpy as np
+from src.data_manager import Team
+from src.rules import rules_for
+
+ALLIANCE_KEYS = ['alliance1', 'alliance2', 'alliance3', 'alliance4']
+MEMBER_KEYS = ['captain', 'pick1', 'pick2', 'pick3', 'pick4']
+
+class PlayoffSimulator:
+    """
+    Monte Carlo simulation of the 4-alliance playoff bracket.
+    Semifinals are 1 v 4 and 2 v 3, the winners meet in the finals.
+    Every series result is cached by the two alliances that play it, so editing
+    one pick only re-simulates the series that alliance takes part in.
+    """
+    WINNER_POINTS = rules_for().winner_points
+    FINALIST_POINTS = rules_for().finalist_points
+    DEFAULT_STD = 20.0
+    MAX_CACHED_SERIES = 256
+
+    def __init__(self, n_sims: int = 10000, seed: int = 2025,
+                 semifinal_games: int = 1, final_games: int = 3):
+        self.n_sims = n_sims
+        self.seed = seed
+        self.semifinal_games = semifinal_games
+        self.final_games = final_games
+        self._series_cache: Dict[Tuple, np.ndarray] = {}
+        self.series_simulated = 0
+
+    @staticmethod
+    def team_score_stats(team: Team) -> Tuple[float, float]:
+        """Mean and std dev of the alliance scores a team has played in (league + tournament)."""
+        scores = [p['score'] for p in team._ftc_performances]
+        for match in team.matches:
+            if match.match_type == "TOURNAMENT":
+                scores.append(match.red_score if team.number in match.red_alliance else match.blue_score)
+        if not scores:
+            return 0.0, PlayoffSimulator.DEFAULT_STD
+        arr = np.asarray(scores, dtype=float)
+        std = float(arr.std()) if len(arr) > 1 else PlayoffSimulator.DEFAULT_STD
+        return float(arr.mean()), max(std, 1.0)
+
+    @staticmethod
+    def alliance_members(alliance: Dict) -> List[str]:
+        if not alliance:
+            return []
+        return [alliance[k] for k in MEMBER_KEYS if alliance.get(k)]
+
+    def alliance_distribution(self, members: List[str], teams: Dict[str, Team]) -> Tuple:
+        """
+        Score distribution of an alliance: the two strongest members play.
+        A team's average is already an alliance total, so the alliance's mean is the average
+        of the two members' means (and its std the root mean square of their stds).
+        Returns a hashable (members, mean, std) key.
+        """
+        stats = sorted((self.team_score_stats(teams[m]) for m in members if m in teams), reverse=True)[:2]
+        if not stats:
+            return (tuple(members), 0.0, self.DEFAULT_STD)
+        mean = sum(s[0] for s in stats) / len(stats)
+        std = (sum(s[1] ** 2 for s in stats) / len(stats)) ** 0.5
+        return (tuple(members), round(mean, 3), round(std, 3))
+
+    def _series(self, red: Tuple, blue: Tuple, games: int) -> np.ndarray:
+        """Boolean array (one entry per simulation): True where red wins the series."""
+        key = (red, blue, games, self.n_sims, self.seed)
+        cached = self._series_cache.get(key)
+        if cached is not None:
+            return cached
+
+        if not red[0] or not blue[0]:
+            # Bye: an empty alliance forfeits
+            result = np.full(self.n_sims, bool(red[0]))
+        else:
+            # Seed from the key itself so results don't depend on evaluation order
+            rng = np.random.default_rng([self.seed, zlib.crc32(repr(key).encode())])
+            red_scores = rng.normal(red[1], red[2], size=(self.n_sims, games))
+            blue_scores = rng.normal(blue[1], blue[2], size=(self.n_sims, games))
+            red_wins = (red_scores > blue_scores).sum(axis=1)
+            result = red_wins > games // 2
+        self.series_simulated += 1
+
+        if len(self._series_cache) >= self.MAX_CACHED_SERIES:
+            self._series_cache.clear()
+        self._series_cache[key] = result
+        return result
+
+    def simulate(self, detailed_alliances: Dict, teams: Dict[str, Team]) -> Dict[str, Dict]:
+        """
+        Returns {team_number: {'winner': p, 'finalist': p, 'expected_playoff_pts': x}}
+        for every team on one of the four alliances.
+        """
+        dists = [self.alliance_distribution(self.alliance_members(detailed_alliances.get(k, {})), teams)
+                 for k in ALLIANCE_KEYS]
+        a1, a2, a3, a4 = dists
+
+        # Semifinals: True means the higher seed advanced
+        top = self._series(a1, a4, self.semifinal_games)
+        bottom = self._series(a2, a3, self.semifinal_games)
+
+        # Finals for each of the four possible pairings (top-half alliance as red)
+        champion = np.empty(self.n_sims, dtype=np.int8)
+        finalist = np.empty(self.n_sims, dtype=np.int8)
+        for top_idx, top_mask in ((0, top), (3, ~top)):
+            for bottom_idx, bottom_mask in ((1, bottom), (2, ~bottom)):
+                sel = top_mask & bottom_mask
+                red_won = self._series(dists[top_idx], dists[bottom_idx], self.final_games)
+                champion[sel] = np.where(red_won[sel], top_idx, bottom_idx)
+                finalist[sel] = np.where(red_won[sel], bottom_idx, top_idx)
+
+        p_win = np.bincount(champion, minlength=4) / self.n_sims
+        p_final = np.bincount(finalist, minlength=4) / self.n_sims
+
+        result = {}
+        for idx, dist in enumerate(dists):
+            for member in dist[0]:
+                result[member] = {
+                    'alliance': idx + 1,
+                    'winner': round(float(p_win[idx]), 4),
+                    'finalist': round(float(p_final[idx]), 4),
+                    'expected_playoff_pts': round(float(p_win[idx] * self.WINNER_POINTS +
+                                                        p_final[idx] * self.FINALIST_POINTS), 2)
+                }
+        return result
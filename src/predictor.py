@@ -0,0 +1,290 @@
+"""
+Match outcome prediction from the match archive.
+
+Each team gets a ridge-regularized least-squares contribution (OPR) to its alliance's
+score, and one per bonus RP (movement, goal, pattern, as stored in rp_components from
+MATCH_SELECTION). The score margin is modelled as normal with the residual spread of the
+fit, giving win/tie/loss probabilities; bonus-RP contributions go through a logistic
+(Platt) calibration. Everything is vectorized, so whole schedules are scored in one call.
+
+backtest() replays an archive chronologically, predicting each block of matches from a
+model fitted only on earlier ones, and reports Brier score and log loss;
+run_backtests() spreads configurations over a process pool.
+
+    python -m src.predictor [ridge ...]     # backtest every season of match_archive/
+"""
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Sequence
+import numpy as np
+from src.archive import MatchArchive
+from src.rules import rules_for
+
+COMPONENTS = ['movement', 'goal', 'pattern']
+OUTCOMES = ['win', 'tie', 'loss']
+
+def _normal_cdf(x: np.ndarray) -> np.ndarray:
+    """Standard normal CDF (Abramowitz-Stegun 7.1.26 erf, error < 2e-7); NumPy has no erf."""
+    z = np.abs(x) / math.sqrt(2)
+    t = 1 / (1 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-z * z)
+    return 0.5 * (1 + np.sign(x) * erf)
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1 / (1 + np.exp(-np.clip(x, -30, 30)))
+
+class MatchPredictor:
+    """
+    fit() on archive columns, then predict() red vs blue alliances given as (n, 2)
+    arrays of team numbers (0 = empty slot). Teams never seen are given the average
+    contribution; an unfitted predictor calls every match a coin flip.
+    """
+    DEFAULT_SIGMA = 30.0
+
+    def __init__(self, ridge: float = 5.0, iterations: int = 100):
+        self.ridge = ridge
+        self.iterations = iterations
+        self.team_ids = np.empty(0, dtype=np.int64)
+        # Per team, then [unknown team, empty slot]
+        self.opr = np.zeros(2)
+        self.sigma = self.DEFAULT_SIGMA
+        self.components: Dict[str, Optional[Dict]] = {c: None for c in COMPONENTS}
+        self.n_matches = 0
+        # Win / tie RP of the season being predicted
+        self.rules = rules_for()
+
+    def _columns(self, teams: np.ndarray) -> np.ndarray:
+        """Team numbers -> column indices into the per-team arrays."""
+        teams = np.asarray(teams, dtype=np.int64)
+        n = len(self.team_ids)
+        idx = np.searchsorted(self.team_ids, teams)
+        found = (idx < n) & (self.team_ids[np.minimum(idx, max(n - 1, 0))] == teams) if n else np.zeros(teams.shape, bool)
+        return np.where(found, idx, np.where(teams == 0, n + 1, n))
+
+    def _solve(self, slots: np.ndarray, b: np.ndarray, prior: float) -> np.ndarray:
+        """
+        Ridge least squares for alliance = sum of its teams, shrunk towards `prior` per team.
+        Conjugate gradient on the normal equations with the design matrix applied via
+        indexing, so memory stays linear in the number of matches.
+        """
+        n = len(self.team_ids)
+
+        def normal(x):
+            # Columns n (unknown team) and n + 1 (empty slot) contribute nothing
+            padded = np.append(x, [0.0, 0.0])
+            alliance = padded[slots].sum(axis=1)
+            return np.bincount(slots.ravel(), np.repeat(alliance, 2), minlength=n + 2)[:n] + self.ridge * x
+
+        rhs = np.bincount(slots.ravel(), np.repeat(b, 2), minlength=n + 2)[:n] + self.ridge * prior
+        x = np.full(n, prior, dtype=float)
+        r = rhs - normal(x)
+        p = r.copy()
+        rr = r @ r
+        for _ in range(self.iterations):
+            if rr < 1e-10:
+                break
+            ap = normal(p)
+            alpha = rr / (p @ ap)
+            x += alpha * p
+            r -= alpha * ap
+            rr_new = r @ r
+            p = r + (rr_new / rr) * p
+            rr = rr_new
+        return np.concatenate([x, [prior, 0.0]])
+
+    @staticmethod
+    def _platt(z: np.ndarray, y: np.ndarray, iterations: int = 25) -> np.ndarray:
+        """Logistic calibration p = sigmoid(a*z + b), fitted by Newton's method (lightly regularized)."""
+        w = np.array([0.0, math.log((y.mean() + 1e-3) / (1 - y.mean() + 1e-3))])
+        x = np.column_stack([z, np.ones_like(z)])
+        for _ in range(iterations):
+            p = _sigmoid(x @ w)
+            grad = x.T @ (p - y) + 1e-3 * w
+            hess = (x * (p * (1 - p))[:, None]).T @ x + 1e-3 * np.eye(2)
+            step = np.linalg.solve(hess, grad)
+            w -= step
+            if np.abs(step).max() < 1e-8:
+                break
+        return w
+
+    def fit(self, teams: np.ndarray, scores: np.ndarray, components: Optional[np.ndarray] = None) -> 'MatchPredictor':
+        """teams (n, 4), scores (n, 2) and optionally rp_components (n, 2, 3) archive columns."""
+        teams, scores = np.asarray(teams), np.asarray(scores)
+        played = (scores >= 0).all(axis=1) & (scores.sum(axis=1) > 0)
+        teams, scores = teams[played], scores[played]
+        self.n_matches = len(teams)
+        if not self.n_matches:
+            return self
+        self.team_ids = np.unique(teams[teams != 0]).astype(np.int64)
+        cols = self._columns(teams)
+        slots = np.concatenate([cols[:, :2], cols[:, 2:]])
+        b = np.concatenate([scores[:, 0], scores[:, 1]]).astype(float)
+        self.opr = self._solve(slots, b, b.mean() / 2)
+
+        margin = scores[:, 0] - scores[:, 1]
+        predicted = self.opr[cols[:, :2]].sum(axis=1) - self.opr[cols[:, 2:]].sum(axis=1)
+        # In-sample residuals understate the error; correct for the fitted parameters
+        dof = max(1, self.n_matches - len(self.team_ids) // 2)
+        self.sigma = max(1.0, float(np.sqrt(((margin - predicted) ** 2).sum() / dof)))
+
+        if components is not None:
+            components = np.asarray(components)[played]
+            for c, name in enumerate(COMPONENTS):
+                y = np.concatenate([components[:, 0, c], components[:, 1, c]]).astype(float)
+                known = y >= 0
+                if known.sum() < 10 or y[known].min() == y[known].max():
+                    self.components[name] = None
+                    continue
+                rate = self._solve(slots[known], y[known], y[known].mean() / 2)
+                z = rate[slots[known]].sum(axis=1)
+                self.components[name] = {'rate': rate, 'platt': self._platt(z, y[known])}
+        return self
+
+    def predict(self, red: np.ndarray, blue: np.ndarray) -> Dict[str, np.ndarray]:
+        """Probabilities from red's side for every (red, blue) pair; bonus RPs are NaN if unknown."""
+        red_cols, blue_cols = self._columns(red), self._columns(blue)
+        red_score = self.opr[red_cols].sum(axis=1)
+        blue_score = self.opr[blue_cols].sum(axis=1)
+        margin = red_score - blue_score
+        # Scores are integers: a margin within half a point is a tie
+        win = 1 - _normal_cdf((0.5 - margin) / self.sigma)
+        loss = _normal_cdf((-0.5 - margin) / self.sigma)
+        result = {'win': win, 'tie': np.clip(1 - win - loss, 0, 1), 'loss': loss,
+                  'red_score': red_score, 'blue_score': blue_score}
+        for name in COMPONENTS:
+            model = self.components[name]
+            for side, cols in (('red', red_cols), ('blue', blue_cols)):
+                if model is None:
+                    result[f'{side}_{name}'] = np.full(len(cols), np.nan)
+                else:
+                    a, b = model['platt']
+                    result[f'{side}_{name}'] = _sigmoid(a * model['rate'][cols].sum(axis=1) + b)
+        bonus = {side: sum(np.nan_to_num(result[f'{side}_{c}']) for c in COMPONENTS) for side in ('red', 'blue')}
+        rules = self.rules
+        result['red_rp'] = rules.win_rp * win + rules.tie_rp * result['tie'] + rules.loss_rp * loss + bonus['red']
+        result['blue_rp'] = rules.win_rp * loss + rules.tie_rp * result['tie'] + rules.loss_rp * win + bonus['blue']
+        return result
+
+    def predict_match(self, red: Sequence[str], blue: Sequence[str]) -> Dict:
+        """One match, alliances as lists of team numbers; JSON-ready."""
+        pad = lambda teams: [int(t) for t in list(teams)[:2]] + [0] * (2 - len(list(teams)[:2]))
+        batch = self.predict(np.array([pad(red)]), np.array([pad(blue)]))
+        return {key: None if np.isnan(v[0]) else round(float(v[0]), 4) for key, v in batch.items()}
+
+def played_rows(archive: MatchArchive, season: Optional[int] = None) -> np.ndarray:
+    rows = np.flatnonzero((archive.score >= 0).all(axis=1) & (np.asarray(archive.score).sum(axis=1) > 0))
+    if season is not None:
+        wanted = [i for i, e in enumerate(archive.events) if e['season'] == season]
+        rows = rows[np.isin(archive.event[rows], wanted)]
+    return rows
+
+def fit_archive(archive: MatchArchive, rows: Optional[np.ndarray] = None, ridge: float = 5.0) -> MatchPredictor:
+    season = archive.latest_season()
+    rows = played_rows(archive, season) if rows is None else rows
+    model = MatchPredictor(ridge).fit(archive.teams[rows], archive.score[rows], archive.rp_components[rows])
+    model.rules = rules_for(season)
+    return model
+
+def _calibration_bins(p: np.ndarray, y: np.ndarray, bins: int = 10) -> List[Dict]:
+    which = np.minimum((p * bins).astype(int), bins - 1)
+    table = []
+    for i in range(bins):
+        sel = which == i
+        if sel.any():
+            table.append({'bin': round(i / bins, 2), 'predicted': round(float(p[sel].mean()), 4),
+                          'observed': round(float(y[sel].mean()), 4), 'count': int(sel.sum())})
+    return table
+
+def backtest(archive_path: str, season: Optional[int] = None, ridge: float = 5.0,
+             refit_every: int = 0, carry_over: bool = False) -> Dict:
+    """
+    Replay `season` (default: latest) event by event. Each block of matches (the whole
+    event, or `refit_every` matches) is predicted by a model fitted on everything before
+    it, then joins the training set. carry_over also trains on earlier seasons.
+    """
+    archive = MatchArchive(archive_path)
+    season = archive.latest_season() if season is None else season
+    history = played_rows(archive)
+    rows = played_rows(archive, season)
+    start = np.searchsorted(history, rows[0]) if len(rows) else 0
+    train = list(history[:start]) if carry_over else []
+
+    blocks = []
+    for event in np.unique(archive.event[rows]):
+        event_rows = rows[archive.event[rows] == event]
+        size = refit_every or len(event_rows)
+        blocks.extend(event_rows[i:i + size] for i in range(0, len(event_rows), size))
+
+    outcome_p, outcome_y, component_p, component_y = [], [], {c: [] for c in COMPONENTS}, {c: [] for c in COMPONENTS}
+    for block in blocks:
+        model = MatchPredictor(ridge)
+        if train:
+            idx = np.array(train)
+            model.fit(archive.teams[idx], archive.score[idx], archive.rp_components[idx])
+        teams = np.asarray(archive.teams[block])
+        scores = np.asarray(archive.score[block])
+        pred = model.predict(teams[:, :2], teams[:, 2:])
+        outcome_p.append(np.column_stack([pred[o] for o in OUTCOMES]))
+        outcome_y.append(np.column_stack([scores[:, 0] > scores[:, 1], scores[:, 0] == scores[:, 1],
+                                          scores[:, 0] < scores[:, 1]]).astype(float))
+        actual = np.asarray(archive.rp_components[block])
+        for c, name in enumerate(COMPONENTS):
+            for side_idx, side in enumerate(('red', 'blue')):
+                y = actual[:, side_idx, c].astype(float)
+                keep = (y >= 0) & ~np.isnan(pred[f'{side}_{name}'])
+                component_p[name].append(pred[f'{side}_{name}'][keep])
+                component_y[name].append(y[keep])
+        train.extend(block.tolist())
+
+    if not blocks:
+        return {'season': season, 'matches': 0}
+    p, y = np.concatenate(outcome_p), np.concatenate(outcome_y)
+    clipped = np.clip(p, 1e-12, 1)
+    result = {
+        'season': season,
+        'matches': len(p),
+        'refits': len(blocks),
+        'brier': round(float(((p - y) ** 2).sum(axis=1).mean()), 4),
+        'log_loss': round(float(-np.log((clipped * y).sum(axis=1)).mean()), 4),
+        'accuracy': round(float((p.argmax(axis=1) == y.argmax(axis=1)).mean()), 4),
+        'calibration': _calibration_bins(p[:, 0], y[:, 0]),
+        'components': {}
+    }
+    for name in COMPONENTS:
+        cp, cy = np.concatenate(component_p[name]), np.concatenate(component_y[name])
+        if len(cp):
+            cc = np.clip(cp, 1e-12, 1 - 1e-12)
+            result['components'][name] = {
+                'brier': round(float(((cp - cy) ** 2).mean()), 4),
+                'log_loss': round(float(-(cy * np.log(cc) + (1 - cy) * np.log(1 - cc)).mean()), 4),
+                'count': len(cp)
+            }
+    return result
+
+def _backtest_job(config: Dict) -> Dict:
+    return {'config': config, **backtest(**config)}
+
+def run_backtests(configs: List[Dict], processes: Optional[int] = None) -> List[Dict]:
+    """
+    Run backtest(**config) for every config across a process pool. Workers open the
+    archive themselves; its columns are memory-mapped, so the OS shares one copy.
+    """
+    if processes == 1 or len(configs) == 1:
+        return [_backtest_job(c) for c in configs]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(_backtest_job, configs))
+
+if __name__ == '__main__':
+    from src.data_manager import ARCHIVE_PATH
+    ridges = [float(a) for a in sys.argv[1:]] or [1.0, 5.0, 20.0]
+    seasons = sorted({e['season'] for e in MatchArchive(ARCHIVE_PATH).events})
+    configs = [{'archive_path': os.path.abspath(ARCHIVE_PATH), 'season': s, 'ridge': r}
+               for s in seasons for r in ridges]
+    print(f"{'season':>6} {'ridge':>6} {'matches':>8} {'brier':>7} {'logloss':>8} {'acc':>6}")
+    for r in run_backtests(configs):
+        if r['matches']:
+            print(f"{r['season']:>6} {r['config']['ridge']:>6} {r['matches']:>8} "
+                  f"{r['brier']:>7} {r['log_loss']:>8} {r['accuracy']:>6}")
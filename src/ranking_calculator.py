@@ -1,86 +1,121 @@
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 from src.data_manager import Team, Match
+from src.rules import SeasonRules, rules_for
 
 class RankingCalculator:
-    @staticmethod
-    def calculate_league_rankings(teams: List[Team]) -> List[Team]:
+    # Compiled season rules; for_season() gives a calculator for another season
+    rules: SeasonRules = rules_for()
+
+    @classmethod
+    def for_season(cls, season: Optional[int]) -> type:
+        return type(f'RankingCalculator{season}', (cls,), {'rules': rules_for(season)})
+
+    @classmethod
+    def calculate_league_rankings(cls, teams: List[Team], with_breakdown: bool = True) -> List[Team]:
         """
         Calculates League Rankings using FTCScout data + Tournament matches.
-        Rule: Rank = Sum of (Top 10 RPs from League Meets + Top 5 RPs from Tournament).
+        Rule: Rank = Sum of (Top 10 RPs from League Meets + Top 5 RPs from Tournament),
+        with the counts and orderings taken from the season rules.
         """
         for team in teams:
-            # Get league meet performances from FTCScout data
-            league_performances = []
-            if hasattr(team, '_ftc_performances'):
-                league_performances = team._ftc_performances.copy()
-            
-            # Get tournament performances from team.matches
-            tournament_performances = []
-            for match in team.matches:
-                if match.match_type == "TOURNAMENT":
-                    # Determine which alliance this team was on
-                    if team.number in match.red_alliance:
-                        rp = match.red_rp
-                        score = match.red_score
-                    else:
-                        rp = match.blue_rp
-                        score = match.blue_score
-                    
-                    tournament_performances.append({
-                        'match_id': match.match_id,
-                        'rp': rp,
-                        'score': score,
-                        'is_surrogate': False,
-                        'is_tournament': True
-                    })
-            
-            # Sort league performances by RP (desc), then score (desc)
-            league_sorted = sorted(league_performances, key=lambda x: (x['rp'], x['score']), reverse=True)
-            top_10_league = league_sorted[:10]
-            
-            # Sort tournament performances by RP (desc), then score (desc)
-            tournament_sorted = sorted(tournament_performances, key=lambda x: (x['rp'], x['score']), reverse=True)
-            top_5_tournament = tournament_sorted[:5]
-            
-            # Calculate total RP from top 10 league + top 5 tournament
-            league_rp = sum(p['rp'] for p in top_10_league)
-            tournament_rp = sum(p['rp'] for p in top_5_tournament)
-            team.total_rp = league_rp + tournament_rp
-            
-            # Track IDs of counted matches for UI highlighting
-            top_10_league_ids = set(p['match_id'] for p in top_10_league)
-            top_5_tournament_ids = set(p['match_id'] for p in top_5_tournament)
-            
-            # Calculate stats
-            all_performances = league_performances + tournament_performances
-            team.matches_played = len(all_performances)
-            total_score = sum(p['score'] for p in all_performances)
-            team.avg_score = total_score / team.matches_played if team.matches_played > 0 else 0
-            
-            # Build breakdown for UI - sort alphabetically for display
-            all_performances_sorted = sorted(all_performances, key=lambda x: x['match_id'])
-            
-            breakdown = []
-            for p in all_performances_sorted:
-                is_tournament = p.get('is_tournament', False)
-                if is_tournament:
-                    is_counted = p['match_id'] in top_5_tournament_ids
+            cls.calculate_team_totals(team, with_breakdown)
+        return cls.assign_ranks(teams)
+
+    @staticmethod
+    def team_performances(team: Team) -> Tuple[List[Dict], List[Dict]]:
+        """(league, tournament) performance records for one team."""
+        # Get league meet performances from FTCScout data
+        league_performances = []
+        if hasattr(team, '_ftc_performances'):
+            league_performances = team._ftc_performances.copy()
+        
+        # Get tournament performances from team.matches
+        tournament_performances = []
+        for match in team.matches:
+            if match.match_type == "TOURNAMENT":
+                # Determine which alliance this team was on
+                if team.number in match.red_alliance:
+                    rp = match.red_rp
+                    score = match.red_score
                 else:
-                    is_counted = p['match_id'] in top_10_league_ids
-                    
-                breakdown.append({
-                    'match_id': p['match_id'],
-                    'rp': p['rp'],
-                    'score': p['score'],
-                    'is_counted': is_counted,
-                    'is_surrogate': p.get('is_surrogate', False),
-                    'is_tournament': is_tournament
+                    rp = match.blue_rp
+                    score = match.blue_score
+                
+                # Surrogate appearances count for nothing, as in league matches
+                is_surrogate = team.number in match.surrogates
+                tournament_performances.append({
+                    'match_id': match.match_id,
+                    'rp': 0 if is_surrogate else rp,
+                    'score': 0 if is_surrogate else score,
+                    'is_surrogate': is_surrogate,
+                    'is_tournament': True
                 })
-            
-            team.match_breakdown = breakdown
+        return league_performances, tournament_performances
+
+    @classmethod
+    def counted_performances(cls, league_performances: List[Dict],
+                             tournament_performances: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """The counted league and tournament performances (2025: top 10 and top 5, by RP then score)."""
+        return cls.rules.counted_performances(league_performances, tournament_performances)
+
+    @classmethod
+    def calculate_team_totals(cls, team: Team, with_breakdown: bool = True):
+        """
+        Sets total_rp, matches_played and avg_score for one team, plus match_breakdown
+        unless with_breakdown is False (list views build it later with match_breakdown()).
+        """
+        league_performances, tournament_performances = RankingCalculator.team_performances(team)
+        top_10_league, top_5_tournament = cls.rules.counted_performances(league_performances, tournament_performances)
+        
+        # Calculate total RP from top 10 league + top 5 tournament
+        league_rp = sum(p['rp'] for p in top_10_league)
+        tournament_rp = sum(p['rp'] for p in top_5_tournament)
+        team.total_rp = league_rp + tournament_rp
+        
+        # Calculate stats
+        team.matches_played = len(league_performances) + len(tournament_performances)
+        total_score = sum(p['score'] for p in league_performances) + sum(p['score'] for p in tournament_performances)
+        team.avg_score = total_score / team.matches_played if team.matches_played > 0 else 0
+
+        if with_breakdown:
+            team.match_breakdown = cls.match_breakdown(team)
+
+    @classmethod
+    def match_breakdown(cls, team: Team) -> List[Dict]:
+        """Every performance of a team in match_id order, flagged with whether it counts toward total_rp."""
+        league_performances, tournament_performances = RankingCalculator.team_performances(team)
+        top_10_league, top_5_tournament = cls.rules.counted_performances(league_performances, tournament_performances)
+
+        # Track IDs of counted matches for UI highlighting
+        top_10_league_ids = set(p['match_id'] for p in top_10_league)
+        top_5_tournament_ids = set(p['match_id'] for p in top_5_tournament)
         
-        # Sort teams: Total RP (Desc), then Avg Score (Desc)
-        sorted_teams = sorted(teams, key=lambda t: (t.total_rp, t.avg_score), reverse=True)
+        # Build breakdown for UI - sort alphabetically for display
+        all_performances_sorted = sorted(league_performances + tournament_performances, key=lambda x: x['match_id'])
+        
+        breakdown = []
+        for p in all_performances_sorted:
+            is_tournament = p.get('is_tournament', False)
+            if is_tournament:
+                is_counted = p['match_id'] in top_5_tournament_ids
+            else:
+                is_counted = p['match_id'] in top_10_league_ids
+                
+            breakdown.append({
+                'match_id': p['match_id'],
+                'rp': p['rp'],
+                'score': p['score'],
+                'is_counted': is_counted,
+                'is_surrogate': p.get('is_surrogate', False),
+                'is_tournament': is_tournament
+            })
+        
+        return breakdown
+
+    @classmethod
+    def assign_ranks(cls, teams: List[Team]) -> List[Team]:
+        """Sorts by Total RP (Desc), then Avg Score (Desc) and sets league_rank."""
+        sorted_teams = sorted(teams, key=cls.rules.rank_key, reverse=True)
         
         # Assign Ranks
         for i, team in enumerate(sorted_teams):
@@ -88,23 +123,61 @@ class RankingCalculator:
             
         return sorted_teams
 
-    @staticmethod
-    def calculate_advancement_points(teams: List[Team], 
+    @classmethod
+    def qualification_points(cls, league_rank: int) -> int:
+        return cls.rules.qualification_points(league_rank)
+
+    @classmethod
+    def alliance_points(cls, alliance_num: int) -> int:
+        return cls.rules.alliance_points(alliance_num)
+
+    @classmethod
+    def team_advancement_points(cls, team: Team,
+                                alliance_selections: Dict[str, int],
+                                awards: Dict[str, int],
+                                playoff_results: Dict[str, int]) -> int:
+        points = cls.rules.qualification_points(team.league_rank)
+        if team.number in alliance_selections:
+            alliance_num = alliance_selections[team.number]
+            points += cls.rules.alliance_points(alliance_num)
+        if team.number in awards:
+            points += awards[team.number]
+        if team.number in playoff_results:
+            points += playoff_results[team.number]
+        return points
+
+    @classmethod
+    def calculate_advancement_points(cls, teams: List[Team], 
                                      alliance_selections: Dict[str, int], 
                                      awards: Dict[str, int],
                                      playoff_results: Dict[str, int]) -> List[Team]:
         for team in teams:
-            points = 0
-            qual_pts = max(2, 17 - team.league_rank)
-            points += qual_pts
-            if team.number in alliance_selections:
-                alliance_num = alliance_selections[team.number]
-                points += (21 - alliance_num)
-            if team.number in awards:
-                points += awards[team.number]
-            if team.number in playoff_results:
-                points += playoff_results[team.number]
-            team.advancement_points = points
+            team.advancement_points = cls.team_advancement_points(
+                team, alliance_selections, awards, playoff_results)
             
         sorted_by_ap = sorted(teams, key=lambda t: t.advancement_points, reverse=True)
         return sorted_by_ap
+
+    @classmethod
+    def calculate_expected_advancement_points(cls, teams: List[Team],
+                                              alliance_selections: Dict[str, int],
+                                              awards: Dict[str, int],
+                                              playoff_results: Dict[str, int],
+                                              playoff_projection: Dict[str, Dict]) -> List[Team]:
+        """
+        Like calculate_advancement_points, but teams without an entered playoff result
+        get the simulated expectation (P(win) * 40 + P(finalist) * 20) instead.
+        Expects league_rank to be set already.
+        """
+        for team in teams:
+            points = cls.rules.qualification_points(team.league_rank)
+            if team.number in alliance_selections:
+                points += cls.rules.alliance_points(alliance_selections[team.number])
+            points += awards.get(team.number, 0)
+            if team.number in playoff_results:
+                points += playoff_results[team.number]
+            elif team.number in playoff_projection:
+                points += playoff_projection[team.number]['expected_playoff_pts']
+            team.expected_advancement_points = round(points, 2)
+
+        return sorted(teams, key=lambda t: t.expected_advancement_points, reverse=True)
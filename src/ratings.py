@@ -0,0 +1,209 @@
+"""
+Online team ratings: an alliance-aware Glicko-1 variant.
+
+Every team has a rating and a rating deviation (RD, the uncertainty). A match compares
+the mean rating of each alliance; each robot is updated against the opposing alliance
+with the other three robots' RDs folded into the comparison, so an uncertain partner or
+opponent makes the result count for less. One match is O(1) work (four updates).
+RD grows again between events a team skips, and more between seasons.
+
+Replaying the same matches in the same order always gives the same ratings; backfill()
+does that from the archive (or meets_data.json) followed by the tournament matches.
+"""
+import json
+import math
+import os
+import threading
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple, Hashable
+from src.data_manager import DataManager, Match
+from src.archive import MatchArchive
+
+Q = math.log(10) / 400
+
+# (period key, red teams, blue teams, red score, blue score)
+RatedMatch = Tuple[Hashable, List[str], List[str], int, int]
+
+def _g(rd: float) -> float:
+    return 1 / math.sqrt(1 + 3 * Q * Q * rd * rd / (math.pi ** 2))
+
+class TeamRating:
+    __slots__ = ('rating', 'rd', 'period', 'matches')
+
+    def __init__(self, rating: float, rd: float, period: int):
+        self.rating = rating
+        self.rd = rd
+        self.period = period
+        self.matches = 0
+
+class RatingEngine:
+    DEFAULT_RATING = 1500.0
+    DEFAULT_RD = 350.0
+    MIN_RD = 40.0
+    # RD growth per event a team sits out, and the extra periods a new season counts for
+    RD_GROWTH = 40.0
+    SEASON_PERIODS = 20
+
+    def __init__(self):
+        self.ratings: Dict[str, TeamRating] = {}
+        self.period = 0
+        self._period_key = None
+        self._season = None
+        self.matches = 0
+        self._lock = threading.RLock()
+
+    def _advance(self, key: Hashable):
+        """Start a new rating period when the event (or season) changes."""
+        if key == self._period_key:
+            return
+        self._period_key = key
+        season = key[0] if isinstance(key, tuple) else None
+        jump = self.SEASON_PERIODS if season is not None and self._season is not None and season != self._season else 1
+        self._season = season if season is not None else self._season
+        self.period += jump
+
+    def _team(self, number: str) -> TeamRating:
+        team = self.ratings.get(number)
+        if team is None:
+            team = self.ratings[number] = TeamRating(self.DEFAULT_RATING, self.DEFAULT_RD, self.period)
+        elif team.period < self.period:
+            idle = self.period - team.period - 1
+            team.rd = min(self.DEFAULT_RD, math.sqrt(team.rd ** 2 + idle * self.RD_GROWTH ** 2))
+            team.period = self.period
+        return team
+
+    def rating(self, number: str) -> Tuple[float, float]:
+        team = self.ratings.get(number)
+        return (team.rating, team.rd) if team else (self.DEFAULT_RATING, self.DEFAULT_RD)
+
+    def win_probability(self, red: List[str], blue: List[str]) -> float:
+        """Chance red outscores blue, from the alliance mean ratings and their combined RD."""
+        with self._lock:
+            r = [self.rating(t) for t in red]
+            b = [self.rating(t) for t in blue]
+        diff = sum(x for x, _ in r) / len(r) - sum(x for x, _ in b) / len(b)
+        rd = math.sqrt(sum(d * d for _, d in r) / len(r) ** 2 + sum(d * d for _, d in b) / len(b) ** 2)
+        return 1 / (1 + 10 ** (-_g(rd) * diff / 400))
+
+    def update(self, red: List[str], blue: List[str], red_score: int, blue_score: int, period: Hashable = None):
+        """Apply one result; all four updates use the pre-match ratings."""
+        red, blue = [t for t in red if t], [t for t in blue if t]
+        if not red or not blue:
+            return
+        with self._lock:
+            if period is not None:
+                self._advance(period)
+            sides = [[self._team(t) for t in red], [self._team(t) for t in blue]]
+            outcome = 1.0 if red_score > blue_score else 0.5 if red_score == blue_score else 0.0
+            means = [sum(t.rating for t in side) / len(side) for side in sides]
+            changes = []
+            for s, side in enumerate(sides):
+                own, other = side, sides[1 - s]
+                score = outcome if s == 0 else 1 - outcome
+                for team in own:
+                    # Everyone else's uncertainty, at the scale of an alliance mean
+                    rd_other = math.sqrt(sum(t.rd ** 2 for t in own if t is not team) / len(own) ** 2 +
+                                         sum(t.rd ** 2 for t in other) / len(other) ** 2)
+                    g = _g(rd_other)
+                    expected = 1 / (1 + 10 ** (-g * (means[s] - means[1 - s]) / 400))
+                    d2 = 1 / (Q * Q * g * g * expected * (1 - expected))
+                    precision = 1 / team.rd ** 2 + 1 / d2
+                    changes.append((team, Q / precision * g * (score - expected), math.sqrt(1 / precision)))
+            for team, delta, rd in changes:
+                team.rating += delta
+                team.rd = max(self.MIN_RD, rd)
+                team.matches += 1
+            self.matches += 1
+
+    def replay(self, matches: Iterable[RatedMatch]):
+        for period, red, blue, red_score, blue_score in matches:
+            self.update(red, blue, red_score, blue_score, period)
+
+    def snapshot(self, names: Optional[Dict[str, str]] = None) -> List[Dict]:
+        """Teams by rating, highest first; names restricts the list (and labels it) when given."""
+        with self._lock:
+            numbers = list(names) if names is not None else list(self.ratings)
+            rows = []
+            for num in numbers:
+                rating, rd = self.rating(num)
+                team = self.ratings.get(num)
+                rows.append({'number': num, 'name': names.get(num) if names else None,
+                             'rating': round(rating, 1), 'rd': round(rd, 1),
+                             # Conservative estimate: two deviations below the rating
+                             'conservative': round(rating - 2 * rd, 1),
+                             'matches': team.matches if team else 0})
+        rows.sort(key=lambda r: (-r['rating'], r['number']))
+        for i, row in enumerate(rows):
+            row['rank'] = i + 1
+        return rows
+
+def archive_matches(archive: MatchArchive, season: Optional[int] = None,
+                    kinds: Iterable[str] = ('league', 'event', 'tournament')) -> Iterator[RatedMatch]:
+    """Archived matches in chronological order; each event is a rating period."""
+    kinds = set(kinds)
+    for m in archive.iter_matches(season):
+        if m['kind'] in kinds and m['red_score'] >= 0 and m['blue_score'] >= 0 and (m['red_score'] or m['blue_score']):
+            yield (m['season'], m['event']), m['red'], m['blue'], m['red_score'], m['blue_score']
+
+def meets_data_matches(path: str = 'meets_data.json', season: int = 2025) -> Iterator[RatedMatch]:
+    """League matches from meets_data.json (meet1, meet2, ... in order)."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r') as f:
+        meets = json.load(f)
+    for key in sorted(meets):
+        for m in sorted(meets[key], key=lambda m: m['match_num']):
+            yield (season, key), m['red'], m['blue'], m['red_score'], m['blue_score']
+
+def tournament_matches(matches: Iterable[Match], season: int = 2025) -> Iterator[RatedMatch]:
+    for m in matches:
+        if m.match_type == "TOURNAMENT":
+            yield (season, 'TOURNAMENT'), m.red_alliance, m.blue_alliance, m.red_score, m.blue_score
+
+def backfill(matches: Iterable[Match], archive_path: Optional[str] = None,
+             meets_path: str = 'meets_data.json') -> Tuple[RatingEngine, int]:
+    """
+    Fresh engine over every stored match: league history (the archive if there is one,
+    else meets_data.json), then the tournament matches in the order they were entered.
+    Returns the engine and the season the tournament belongs to.
+    """
+    engine = RatingEngine()
+    season = 2025
+    if archive_path and os.path.isdir(archive_path):
+        archive = MatchArchive(archive_path)
+        # Tournament rows in the archive are a copy of tournament_matches.json, replayed below
+        engine.replay(archive_matches(archive, kinds=('league', 'event')))
+        season = archive.latest_season() or season
+    else:
+        engine.replay(meets_data_matches(meets_path, season))
+    engine.replay(tournament_matches(matches, season))
+    return engine, season
+
+class LiveRatings:
+    """
+    A RatingEngine kept current from DataManager changes: new tournament matches are
+    applied in O(1) each; deletions and data reloads can't be undone incrementally,
+    so they trigger a (deterministic) backfill.
+    """
+    def __init__(self, archive_path: Optional[str] = None, meets_path: str = 'meets_data.json'):
+        self.archive_path = archive_path
+        self.meets_path = meets_path
+        self.engine = RatingEngine()
+        self.season = 2025
+        self.rebuilds = 0
+
+    def attach(self, data_manager: DataManager):
+        """Backfill from data_manager's matches, then follow its changes."""
+        self.rebuild(data_manager)
+        data_manager.subscribe(lambda event, teams, payload: self._on_data_change(data_manager, event, payload))
+
+    def rebuild(self, data_manager: DataManager):
+        self.engine, self.season = backfill(list(data_manager.matches), self.archive_path, self.meets_path)
+        self.rebuilds += 1
+
+    def _on_data_change(self, data_manager: DataManager, event: str, payload: Dict):
+        if event == 'match_added':
+            self.engine.replay(tournament_matches([payload['match']], self.season))
+        elif event == 'matches_imported':
+            self.engine.replay(tournament_matches(payload['matches'], self.season))
+        else:
+            self.rebuild(data_manager)
@@ -0,0 +1,162 @@
+"""
+Season rules as data, compiled once into the functions the rankers call.
+
+A season is a small declarative spec (see SEASONS). compile_rules() validates it and
+binds its numbers into closures - the counted-performance selector, the ranking key,
+qualification / alliance points, match RP - plus array versions for the batch rankers,
+so evaluating a scenario never looks anything up in the spec.
+
+More seasons (past ones for backtests, next season's once announced) go in
+season_rules.json without code changes, e.g.
+
+    {"2026": {"extends": 2025, "name": "NEXT", "counted": {"league": 8, "tournament": 4}}}
+
+Set FTC_SEASON to pick the season the app ranks with.
+"""
+import json
+import os
+from operator import attrgetter, itemgetter
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+CURRENT_SEASON = int(os.environ.get('FTC_SEASON', 2025))
+RULES_PATH = 'season_rules.json'
+
+SEASONS: Dict[int, Dict] = {
+    2025: {
+        'name': 'DECODE',
+        # Per alliance per match: win / tie / loss RP plus one RP per bonus achieved
+        'match_rp': {'win': 3, 'tie': 1, 'loss': 0, 'bonus': ['movementRp', 'goalRp', 'patternRp']},
+        # Best N performances counted toward total RP, chosen by performance_order (descending)
+        'counted': {'league': 10, 'tournament': 5},
+        'performance_order': ['rp', 'score'],
+        # League standings order (descending)
+        'rank_order': ['total_rp', 'avg_score'],
+        # max(min, base - league rank)
+        'qualification_points': {'base': 17, 'min': 2},
+        # base - alliance number
+        'alliance_points': {'base': 21},
+        'playoff_points': {'winner': 40, 'finalist': 20},
+    }
+}
+
+PERFORMANCE_KEYS = {'rp', 'score'}
+RANK_KEYS = {'total_rp', 'avg_score', 'matches_played'}
+
+class SeasonRules:
+    """One season's compiled rules. Build with compile_rules() / rules_for()."""
+    def __init__(self, season: int, spec: Dict):
+        self.season = season
+        self.name = spec.get('name', str(season))
+        self.spec = spec
+        rp = spec['match_rp']
+        self.win_rp, self.tie_rp, self.loss_rp = int(rp['win']), int(rp['tie']), int(rp['loss'])
+        self.bonus_keys: List[str] = list(rp['bonus'])
+        self.max_match_rp = self.win_rp + len(self.bonus_keys)
+        self.league_count = int(spec['counted']['league'])
+        self.tournament_count = int(spec['counted']['tournament'])
+        self.performance_order: List[str] = list(spec['performance_order'])
+        self.rank_order: List[str] = list(spec['rank_order'])
+        self.qualification_base = int(spec['qualification_points']['base'])
+        self.qualification_min = int(spec['qualification_points']['min'])
+        self.alliance_base = int(spec['alliance_points']['base'])
+        self.winner_points = spec['playoff_points']['winner']
+        self.finalist_points = spec['playoff_points']['finalist']
+
+        unknown = (set(self.performance_order) - PERFORMANCE_KEYS) | (set(self.rank_order) - RANK_KEYS)
+        if unknown or not self.performance_order or not self.rank_order:
+            raise ValueError(f"Season {season}: unsupported order keys {sorted(unknown)}")
+        self._compile()
+
+    def _compile(self):
+        performance_key = itemgetter(*self.performance_order)
+        league_n, tournament_n = self.league_count, self.tournament_count
+        base, floor, alliance_base = self.qualification_base, self.qualification_min, self.alliance_base
+        win, tie, loss, bonus_keys = self.win_rp, self.tie_rp, self.loss_rp, tuple(self.bonus_keys)
+
+        def counted_performances(league: List[Dict], tournament: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+            return (sorted(league, key=performance_key, reverse=True)[:league_n],
+                    sorted(tournament, key=performance_key, reverse=True)[:tournament_n])
+
+        def qualification_points(league_rank: int) -> int:
+            return max(floor, base - league_rank)
+
+        def alliance_points(alliance_num: int) -> int:
+            return alliance_base - alliance_num
+
+        def match_rp(own_points: int, opp_points: int, alliance_data: Dict) -> int:
+            result = win if own_points > opp_points else tie if own_points == opp_points else loss
+            return result + sum(int(alliance_data.get(k, 0)) for k in bonus_keys)
+
+        self.counted_performances: Callable = counted_performances
+        self.rank_key: Callable = attrgetter(*self.rank_order)
+        self.qualification_points: Callable[[int], int] = qualification_points
+        self.alliance_points: Callable[[int], int] = alliance_points
+        self.match_rp: Callable[[int, int, Dict], int] = match_rp
+
+    def qualification_points_array(self, ranks: np.ndarray) -> np.ndarray:
+        return np.maximum(self.qualification_min, self.qualification_base - ranks)
+
+    def result_rp_array(self, own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+        """Win / tie / loss RP for arrays of alliance scores."""
+        return np.where(own > opp, self.win_rp, np.where(own == opp, self.tie_rp, self.loss_rp))
+
+def _merge(base: Dict, override: Dict) -> Dict:
+    merged = dict(base)
+    for key, value in override.items():
+        merged[key] = dict(base[key], **value) if isinstance(value, dict) and isinstance(base.get(key), dict) else value
+    return merged
+
+def load_seasons(path: str = RULES_PATH) -> Dict[int, Dict]:
+    """Built-in seasons plus those in `path` (each may extend another)."""
+    seasons = dict(SEASONS)
+    if not os.path.exists(path):
+        return seasons
+    try:
+        with open(path, 'r') as f:
+            extra = {int(k): v for k, v in json.load(f).items()}
+    except Exception as e:
+        print(f"Error loading {path}: {e}")
+        return seasons
+    pending = sorted(extra)
+    while pending:
+        waiting = []
+        for season in pending:
+            try:
+                spec = dict(extra[season])
+                parent = spec.pop('extends', None)
+                if parent is not None and int(parent) not in seasons:
+                    # Extends a season defined further on in the file (or nowhere)
+                    waiting.append(season)
+                    continue
+                spec = _merge(seasons[int(parent)], spec) if parent is not None else spec
+                SeasonRules(season, spec)
+                seasons[season] = spec
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Skipping season {season} in {path}: invalid spec ({e!r})")
+        if len(waiting) == len(pending):
+            for season in waiting:
+                print(f"Skipping season {season} in {path}: extends unknown season {extra[season]['extends']}")
+            break
+        pending = waiting
+    return seasons
+
+_compiled: Dict[Tuple[int, str], SeasonRules] = {}
+
+def rules_for(season: Optional[int] = None, path: str = RULES_PATH) -> SeasonRules:
+    """
+    Compiled rules of a season (CURRENT_SEASON by default). A season with no spec of its
+    own uses the latest earlier one (or the earliest, for seasons before all of them).
+    """
+    season = CURRENT_SEASON if season is None else int(season)
+    key = (season, path)
+    if key not in _compiled:
+        seasons = load_seasons(path)
+        earlier = [s for s in seasons if s <= season]
+        chosen = max(earlier) if earlier else min(seasons)
+        _compiled[key] = SeasonRules(season, seasons[chosen])
+    return _compiled[key]
+
+def reload_rules():
+    """Forget compiled rules so season_rules.json is read again."""
+    _compiled.clear()
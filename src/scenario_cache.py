@@ -0,0 +1,111 @@
+"""
+Content-addressed cache for hypothetical scenario results.
+
+A scenario body is first put into canonical form (team ids normalized, partners and
+matches sorted), so two requests describing the same what-if get the same key however
+they were written. The key is a SHA-256 of that form plus whatever else the result
+depends on (data version, advancement version, output options); results of older
+versions are never looked up again and simply age out of the LRU.
+
+Values are the serialized response bytes, so a hit costs the canonicalization, one hash
+and a dict lookup, and the cache can account its memory exactly.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+def _team_id(value) -> str:
+    """'  00123 ', 123 and '123' are the same team."""
+    text = '' if value is None else str(value).strip()
+    return (text.lstrip('0') or '0') if text.isdigit() else text
+
+def canonical_scenario(matches: List[Dict]) -> List[Dict]:
+    """
+    Hypothetical matches ({match_id, r1, r2, b1, b2, rs, bs, rrp, brp}, optional surrogates)
+    in canonical form. Raises ValueError on a malformed match.
+    """
+    if not isinstance(matches, list):
+        raise ValueError("matches must be a list")
+    canonical = []
+    for i, m in enumerate(matches):
+        try:
+            red = sorted([_team_id(m['r1']), _team_id(m['r2'])])
+            blue = sorted([_team_id(m['b1']), _team_id(m['b2'])])
+            entry = {'match_id': str(m['match_id']).strip(),
+                     'r1': red[0], 'r2': red[1], 'b1': blue[0], 'b2': blue[1],
+                     'rs': int(m['rs']), 'bs': int(m['bs']), 'rrp': int(m['rrp']), 'brp': int(m['brp'])}
+            if m.get('surrogates'):
+                entry['surrogates'] = sorted({_team_id(t) for t in m['surrogates']})
+        except KeyError as e:
+            raise ValueError(f"Invalid match at index {i}: missing {e}")
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid match at index {i}: {e}")
+        canonical.append(entry)
+    canonical.sort(key=lambda e: (e['match_id'], e['r1'], e['r2'], e['b1'], e['b2'], e['rs'], e['bs']))
+    return canonical
+
+def scenario_key(canonical: List[Dict], *context) -> str:
+    blob = json.dumps([canonical, list(context)], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+class ScenarioCache:
+    """
+    Size-bounded LRU of key -> bytes. Every entry is charged its value and key length
+    plus a fixed overhead, and least recently used entries are evicted until the total
+    fits max_bytes. Values larger than max_item_bytes are not cached at all.
+    """
+    ENTRY_OVERHEAD = 200
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, max_item_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes if max_item_bytes is not None else max_bytes // 8
+        self._entries: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _cost(self, key: str, value: bytes) -> int:
+        return len(key) + len(value) + self.ENTRY_OVERHEAD
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: bytes) -> bytes:
+        """Store value (if it fits) and return it."""
+        cost = self._cost(key, value)
+        if cost > self.max_item_bytes:
+            return value
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= self._cost(key, old)
+            self._entries[key] = value
+            self.bytes += cost
+            while self.bytes > self.max_bytes:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self.bytes -= self._cost(evicted_key, evicted)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'entries': len(self._entries), 'bytes': self.bytes, 'max_bytes': self.max_bytes,
+                    'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'hit_rate': round(self.hits / lookups, 4) if lookups else None}
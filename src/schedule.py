@@ -0,0 +1,168 @@
+"""
+FTC-style qualification schedules for projections made before the real schedule is out.
+
+Matches are built greedily, for a whole batch of schedules at once with NumPy: each
+match takes the teams with the fewest appearances that have rested at least `min_gap`
+matches, preferring among equals the teams that have met the others least, then splits
+them into the alliance pairing with the fewest repeated partners. When the slot count is
+not a multiple of four, the extra slots go to surrogates (teams playing one match more
+than the rest; that match does not count for them).
+"""
+from typing import List, Dict, Optional, Callable, Iterator
+import numpy as np
+
+# The three ways to split four teams into two alliances
+PAIRINGS = np.array([[0, 1, 2, 3], [0, 2, 1, 3], [0, 3, 1, 2]])
+
+class Schedule:
+    def __init__(self, teams: List[str], rows: np.ndarray, surrogates: np.ndarray, quality: Dict):
+        self.teams = teams
+        self.rows = rows  # (matches, 4) red1, red2, blue1, blue2 as indices into teams
+        self.surrogates = surrogates  # (matches, 4) True where that slot plays as a surrogate
+        self.quality = quality
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def fingerprint(self) -> bytes:
+        return self.rows.tobytes()
+
+    def to_hypothetical(self, outcome: Optional[Callable] = None, prefix: str = 'S') -> List[Dict]:
+        """
+        Matches in the {match_id, r1, r2, b1, b2, rs, bs, rrp, brp, surrogates} form
+        DataManager.get_all_teams_with_hypothetical takes. outcome(red, blue) returns
+        (rs, bs, rrp, brp); without it every result is 0.
+        """
+        matches = []
+        for k, (row, surrogate) in enumerate(zip(self.rows.tolist(), self.surrogates.tolist())):
+            r1, r2, b1, b2 = [self.teams[t] for t in row]
+            rs, bs, rrp, brp = outcome([r1, r2], [b1, b2]) if outcome else (0, 0, 0, 0)
+            matches.append({'match_id': f"{prefix}-Q{k + 1}", 'r1': r1, 'r2': r2, 'b1': b1, 'b2': b2,
+                            'rs': rs, 'bs': bs, 'rrp': rrp, 'brp': brp,
+                            'surrogates': [self.teams[t] for t, s in zip(row, surrogate) if s]})
+        return matches
+
+class ScheduleGenerator:
+    """
+    generate_batch(n) builds n schedules in one vectorized pass; with a seed the
+    sequence of schedules is reproducible. min_gap is the minimum number of matches
+    between two of a team's matches, lowered to what the team count allows (each
+    match needs four rested teams).
+
+    Quality per schedule: partner and opponent repeats, shortest turnaround, turnaround
+    violations, red/blue imbalance and a combined cost (lower is better).
+    """
+    PARTNER_WEIGHT = 3
+    OPPONENT_WEIGHT = 1
+    VIOLATION_WEIGHT = 10
+
+    def __init__(self, teams: List[str], matches_per_team: int = 5, min_gap: int = 3,
+                 seed: Optional[int] = None):
+        if len(teams) < 4:
+            raise ValueError("A schedule needs at least 4 teams")
+        self.teams = sorted(teams, key=lambda t: int(t) if str(t).isdigit() else t)
+        self.matches_per_team = matches_per_team
+        self.min_gap = max(0, min(min_gap, len(teams) // 4 - 1))
+        self.n_matches = -(-len(teams) * matches_per_team // 4)
+        self.rng = np.random.default_rng(seed)
+
+    def generate_batch(self, size: int) -> List[Schedule]:
+        n, gap, quota = len(self.teams), self.min_gap, self.matches_per_team
+        index = np.arange(size)
+        batch = index[:, None]
+        appearances = np.zeros((size, n), dtype=np.int64)
+        reds = np.zeros((size, n), dtype=np.int64)
+        last = np.full((size, n), -gap - 1, dtype=np.int64)
+        met = np.zeros((size, n, n), dtype=np.int64)  # partner or opponent counts
+        paired = np.zeros((size, n, n), dtype=np.int64)  # partner counts
+        min_turnaround = np.full(size, n * quota)
+        violations = np.zeros(size, dtype=np.int64)
+        rows = np.empty((size, self.n_matches, 4), dtype=np.int32)
+        surrogates = np.empty((size, self.n_matches, 4), dtype=bool)
+        # Integer priority bands; within a band, meetings plus noise stay below 1
+        band = quota + 3
+        spread = 3 * quota + 5
+
+        for k in range(self.n_matches):
+            need = quota - appearances
+            tired = k - last <= gap
+            # Teams short of their quota first (surrogates only once everyone has it), teams
+            # that must play now to reach it, then fewest appearances counting a tired team
+            # as one match ahead, rested before tired
+            flexible = (need - 1) * (gap + 1) + 1 < self.n_matches - k
+            level = (((need <= 0) * 2 + flexible) * band + appearances + tired) * 2 + tired
+            noise = self.rng.random((size, n))
+            chosen = np.empty((size, 4), dtype=np.int64)
+            taken = np.zeros((size, n), dtype=bool)
+            meetings = np.zeros((size, n))
+            for slot in range(4):
+                pick = np.where(taken, np.inf, level + (meetings + noise) / spread).argmin(axis=1)
+                chosen[:, slot] = pick
+                taken[index, pick] = True
+                meetings += met[index, pick]
+
+            # Alliance split with the fewest repeated partners, random among equals
+            candidates = chosen[:, PAIRINGS]  # (size, 3, 4)
+            repeats = (paired[batch, candidates[..., 0], candidates[..., 1]] +
+                       paired[batch, candidates[..., 2], candidates[..., 3]])
+            order = candidates[index, (repeats + self.rng.random((size, 3)) / 2).argmin(axis=1)]
+            # Red goes to the alliance that has been red less
+            swap = (reds[batch, order[:, :2]].sum(axis=1) + self.rng.random(size) / 2 >
+                    reds[batch, order[:, 2:]].sum(axis=1) + 0.25)
+            order = np.where(swap[:, None], order[:, [2, 3, 0, 1]], order)
+
+            rows[:, k] = order
+            surrogates[:, k] = appearances[batch, order] >= quota
+            gaps = np.where(last[batch, order] >= 0, k - last[batch, order] - 1, n * quota)
+            min_turnaround = np.minimum(min_turnaround, gaps.min(axis=1))
+            violations += (gaps < gap).sum(axis=1)
+
+            appearances[batch, order] += 1
+            last[batch, order] = k
+            reds[batch, order[:, :2]] += 1
+            met[batch[:, :, None], order[:, :, None], order[:, None, :]] += 1
+            for a, b in ((0, 1), (2, 3)):
+                paired[index, order[:, a], order[:, b]] += 1
+                paired[index, order[:, b], order[:, a]] += 1
+        met[:, np.arange(n), np.arange(n)] = 0
+
+        # Each unordered pair is counted in both halves of the matrix
+        def repeat_count(counts):
+            return (counts.sum(axis=(1, 2)) - (counts > 0).sum(axis=(1, 2))) // 2
+        partner_repeats = repeat_count(paired)
+        opponent_repeats = repeat_count(met - paired)
+        imbalance = np.abs(2 * reds - appearances).max(axis=1)
+        cost = (self.PARTNER_WEIGHT * partner_repeats + self.OPPONENT_WEIGHT * opponent_repeats +
+                self.VIOLATION_WEIGHT * violations)
+        schedules = []
+        for i in range(size):
+            quality = {
+                'matches': self.n_matches,
+                'surrogates': int(surrogates[i].sum()),
+                'partner_repeats': int(partner_repeats[i]),
+                'opponent_repeats': int(opponent_repeats[i]),
+                'min_turnaround': int(min_turnaround[i]),
+                'turnaround_violations': int(violations[i]),
+                'color_imbalance': int(imbalance[i]),
+                'cost': int(cost[i])
+            }
+            schedules.append(Schedule(self.teams, rows[i], surrogates[i], quality))
+        return schedules
+
+    def generate(self) -> Schedule:
+        return self.generate_batch(1)[0]
+
+    def generate_many(self, count: int, batch_size: int = 500) -> Iterator[Schedule]:
+        """Up to `count` distinct schedules (fewer only if the team count allows fewer)."""
+        seen = set()
+        for _ in range(2 * -(-count // batch_size) + 2):
+            if len(seen) >= count:
+                break
+            for schedule in self.generate_batch(min(batch_size, 2 * (count - len(seen)))):
+                fingerprint = schedule.fingerprint()
+                if fingerprint not in seen and len(seen) < count:
+                    seen.add(fingerprint)
+                    yield schedule
+
+    def best_of(self, count: int) -> Schedule:
+        return min(self.generate_many(count), key=lambda s: s.quality['cost'])
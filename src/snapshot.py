@@ -0,0 +1,183 @@
+"""
+Read views shared by every WSGI worker, one mmap'd snapshot file per view.
+
+Layout: MAGIC (8 bytes) | version (uint64) | source length (uint64) | payload length (uint64)
+| source | payload. The source identifies the shared state files the payload was built
+from, so a reader can tell whether it reflects what is on disk now.
+Writers build the file beside the target and os.replace() it, so readers always
+see a complete snapshot. Readers keep the file mapped read-only and only remap
+when the file on disk has been replaced.
+
+Only the producer builds and publishes views; the other workers serve them from the
+snapshots and fall back to their own in-memory state, which FileWatcher tells them to
+reload when another process rewrote one of the shared files it is loaded from.
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, every process acts alone
+    fcntl = None
+
+SNAPSHOT_PATH = 'ranking_snapshot.bin'
+PRODUCER_LOCK_PATH = 'ranking_producer.lock'
+# Rewritten by the producer after each fetch that changed the FTC data
+FETCH_STAMP_PATH = 'ftc_fetch.stamp'
+
+MAGIC = b'EBSNAP02'
+HEADER = struct.Struct('<8sQQQ')
+
+def snapshot_path(view: str) -> str:
+    """Snapshot file of a materialized view; 'teams' keeps the original ranking snapshot."""
+    return SNAPSHOT_PATH if view == 'teams' else f"snapshot.{view.replace('/', '.')}.bin"
+
+def read_version(path: str = SNAPSHOT_PATH) -> int:
+    try:
+        with open(path, 'rb') as f:
+            magic, version, _, _ = HEADER.unpack(f.read(HEADER.size))
+            return version if magic == MAGIC else 0
+    except (FileNotFoundError, struct.error):
+        return 0
+
+def write_snapshot(payload: bytes, path: str = SNAPSHOT_PATH, source: bytes = b'') -> int:
+    """Publish payload (built from `source`) as the next snapshot version. Returns the new version."""
+    lock = open(path + '.lock', 'a')
+    try:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        version = read_version(path) + 1
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, version, len(source), len(payload)))
+            f.write(source)
+            f.write(payload)
+        os.replace(tmp, path)
+        return version
+    finally:
+        lock.close()
+
+def file_identity(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def write_stamp(path: str = FETCH_STAMP_PATH):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        f.write(repr(time.time()))
+    os.replace(tmp, path)
+
+class SnapshotReader:
+    """Per-worker view of the shared snapshot; cheap to call on every request."""
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        self.path = path
+        self.version = 0
+        self.remaps = 0
+        self._identity = None
+        # (mapping, version, source, payload offset, payload length), swapped as one on remap
+        self._current = None
+
+    def read(self, source: Optional[bytes] = None) -> Optional[Tuple[int, memoryview]]:
+        """
+        (version, payload) of the current snapshot, or None if there is none yet (or, with
+        `source`, if it was built from other state). The payload is a view straight into the
+        mapping (no copy); it keeps that mapping alive after a remap.
+        """
+        identity = file_identity(self.path)
+        if identity is None:
+            return None
+        if identity != self._identity and not self._remap(identity):
+            return None
+        mm, version, built_from, offset, length = self._current
+        if source is not None and built_from != source:
+            return None
+        return version, memoryview(mm)[offset:offset + length]
+
+    def _remap(self, identity) -> bool:
+        try:
+            with open(self.path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return False
+        magic, version, source_length, length = HEADER.unpack(mm[:HEADER.size])
+        offset = HEADER.size + source_length
+        if magic != MAGIC or offset + length > len(mm):
+            mm.close()
+            return False
+        # The previous map is not closed here: views handed out by read() may still use it,
+        # and it is released with the last of them
+        self._current = (mm, version, mm[HEADER.size:offset], offset, length)
+        self.version, self._identity = version, identity
+        self.remaps += 1
+        return True
+
+class FileWatcher:
+    """Which of a set of files were rewritten (by any process) since the last check; one stat each."""
+    def __init__(self, paths: Iterable[str]):
+        self._seen = {path: file_identity(path) for path in paths}
+        self._lock = threading.Lock()
+
+    def changed(self) -> List[str]:
+        with self._lock:
+            changed = []
+            for path, seen in self._seen.items():
+                current = file_identity(path)
+                if current != seen:
+                    self._seen[path] = current
+                    changed.append(path)
+            return changed
+
+    def mark(self, path: str):
+        """Record this process's own write, so it is not reported back."""
+        with self._lock:
+            self._seen[path] = file_identity(path)
+
+    def source(self, current: bool = False) -> bytes:
+        """
+        The identities of the files as last reported (or, with current, as on disk now),
+        in the form write_snapshot records the state a snapshot was built from.
+        """
+        with self._lock:
+            seen = {path: file_identity(path) if current else identity
+                          for path, identity in self._seen.items()}
+        return json.dumps(sorted(seen.items())).encode()
+
+class ProducerLock:
+    """
+    Held for the life of the one process that fetches and publishes.
+    Released automatically by the OS if that process dies, so another worker can take over.
+    """
+    def __init__(self, path: str = PRODUCER_LOCK_PATH):
+        self.path = path
+        self._file = None
+
+    def acquire(self) -> bool:
+        if self._file is not None:
+            return True
+        if fcntl is None:
+            return True
+        f = open(self.path, 'a')
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._file = f
+        return True
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None or fcntl is None
+
+    def release(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
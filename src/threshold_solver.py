@@ -0,0 +1,122 @@
+import math
+from bisect import bisect_left
+from typing import List, Dict, Optional, Tuple
+from src.data_manager import Team
+from src.ranking_calculator import RankingCalculator
+
+class ThresholdSolver:
+    """
+    Answers "what does team X need in its remaining tournament matches to finish rank K?"
+    for every team and every rank at once, using the ranking rule of
+    RankingCalculator.calculate_league_rankings (top 10 league RP + top 5 tournament RP,
+    ties broken by average score).
+
+    Each team's reachable total RP is a non-decreasing step function of the RP it gains,
+    tabulated once per team; every (team, rank) question is then a binary search on it.
+    Two rival scenarios bound the answer:
+      best_case  - rivals gain no RP in their remaining matches
+      worst_case - every rival gains the maximum RP in each remaining match
+    Rival average scores are held at their current values in both.
+    """
+    def __init__(self, remaining_matches: int = 5, calculator: type = RankingCalculator):
+        self.remaining_matches = remaining_matches
+        self.calculator = calculator
+        # 2025: win (3) + movement, goal and pattern RP; top 5 tournament matches count
+        self.max_match_rp = calculator.rules.max_match_rp
+        self.counted_tournament = calculator.rules.tournament_count
+
+    def team_state(self, team: Team) -> Dict:
+        """League RP, tournament RPs and score totals of a ranked team."""
+        league, tournament = self.calculator.team_performances(team)
+        top_league, _ = self.calculator.counted_performances(league, tournament)
+        return {
+            'league_rp': sum(p['rp'] for p in top_league),
+            'tournament_rps': [p['rp'] for p in tournament],
+            'total_score': sum(p['score'] for p in league + tournament),
+            'matches_played': len(league) + len(tournament),
+            'total_rp': team.total_rp,
+            'avg_score': team.avg_score
+        }
+
+    def reachable_totals(self, state: Dict) -> List[int]:
+        """totals[g] = best total RP with g more RP spread over the remaining matches."""
+        existing = state['tournament_rps']
+        totals = []
+        for gained in range(self.max_match_rp * self.remaining_matches + 1):
+            # Concentrating RP in as few matches as possible maximises the top-5 sum
+            new = [self.max_match_rp] * (gained // self.max_match_rp)
+            if gained % self.max_match_rp:
+                new.append(gained % self.max_match_rp)
+            counted = sorted(existing + new, reverse=True)[:self.counted_tournament]
+            totals.append(state['league_rp'] + sum(counted))
+        return totals
+
+    def _requirement(self, state: Dict, totals: List[int], rival: Optional[Tuple[int, float]]) -> Optional[Dict]:
+        """Minimum RP (and score if the RP only ties) to finish ahead of `rival` (total_rp, avg_score)."""
+        if rival is None:
+            return {'rp': 0, 'score': 0}
+        rival_rp, rival_avg = rival
+        gained = bisect_left(totals, rival_rp)
+        if gained >= len(totals):
+            return None
+        if totals[gained] > rival_rp:
+            return {'rp': gained, 'score': 0}
+        # RP tie: the average score has to beat the rival's
+        played = state['matches_played'] + self.remaining_matches
+        needed = math.floor(rival_avg * played - state['total_score']) + 1
+        if needed <= 0:
+            return {'rp': gained, 'score': 0}
+        if self.remaining_matches == 0:
+            return {'rp': gained + 1, 'score': 0} if gained + 1 < len(totals) else None
+        return {'rp': gained, 'score': needed}
+
+    def solve(self, ranked_teams: List[Team], team_numbers: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """
+        {team: {'rank', 'total_rp', 'ranks': [{'rank', 'best_case', 'worst_case'}]}} where each case is
+        {'rp': extra tournament RP, 'score': total score needed across the remaining matches
+        (0 if the RP alone is enough)} or None if the rank is out of reach.
+        """
+        states = {t.number: self.team_state(t) for t in ranked_teams}
+        totals = {num: self.reachable_totals(s) for num, s in states.items()}
+        current = {num: (s['total_rp'], s['avg_score']) for num, s in states.items()}
+        maxed = {num: (totals[num][-1], states[num]['avg_score']) for num in states}
+
+        # Strongest first; finishing rank K means beating the K-th strongest rival
+        scenarios = {case: sorted(((v, num) for num, v in rivals.items()), reverse=True)
+                     for case, rivals in (('best_case', current), ('worst_case', maxed))}
+
+        result = {}
+        for team in ranked_teams:
+            if team_numbers and team.number not in team_numbers:
+                continue
+            state, team_totals = states[team.number], totals[team.number]
+            rivals = {case: [v for v, num in ordered if num != team.number] for case, ordered in scenarios.items()}
+            ranks = []
+            for k in range(1, len(ranked_teams) + 1):
+                entry = {'rank': k}
+                for case, ordered in rivals.items():
+                    entry[case] = self._requirement(state, team_totals, ordered[k - 1] if k - 1 < len(ordered) else None)
+                ranks.append(entry)
+            result[team.number] = {'rank': team.league_rank, 'total_rp': team.total_rp, 'ranks': ranks}
+        return result
+
+    def advancement_target_rank(self, team_number: str, ranked_teams: List[Team], advancing: int,
+                                alliance_selections: Dict[str, int], awards: Dict[str, int],
+                                playoff_results: Dict[str, int]) -> Optional[int]:
+        """
+        Worst league rank at which the team's advancement points still beat the team
+        currently holding the last advancing slot (rivals' points held at current values).
+        None if no league rank is enough.
+        """
+        rivals = sorted((self.calculator.team_advancement_points(t, alliance_selections, awards, playoff_results)
+                         for t in ranked_teams if t.number != team_number), reverse=True)
+        if advancing > len(rivals):
+            return len(ranked_teams)
+        cutoff = rivals[advancing - 1]
+        other = awards.get(team_number, 0) + playoff_results.get(team_number, 0)
+        if team_number in alliance_selections:
+            other += self.calculator.alliance_points(alliance_selections[team_number])
+        for rank in range(len(ranked_teams), 0, -1):
+            if self.calculator.qualification_points(rank) + other > cutoff:
+                return rank
+        return None
@@ -0,0 +1,57 @@
+import threading
+import time
+import unittest
+from src.admission import AdmissionController, Rejected
+
+class TestAdmissionController(unittest.TestCase):
+    def test_client_rate_limit(self):
+        ac = AdmissionController(capacity=10, client_rate=1.0, client_burst=3.0)
+        for _ in range(3):
+            with ac.admit('a', 1):
+                pass
+        with self.assertRaises(Rejected) as ctx:
+            ac.admit('a', 1)
+        self.assertEqual(ctx.exception.status, 429)
+        self.assertGreaterEqual(ctx.exception.retry_after, 1)
+        # Other clients have their own bucket
+        with ac.admit('b', 1):
+            pass
+
+    def test_budget_queue_and_shedding(self):
+        ac = AdmissionController(capacity=2, max_queue=1, queue_timeout=2.0, client_burst=100)
+        first = ac.admit('a', 2)
+        order = []
+
+        def waiter():
+            with ac.admit('b', 1):
+                order.append('queued ran')
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        while not ac.status()['queued_now']:
+            time.sleep(0.01)
+
+        # Queue full: shed immediately
+        start = time.monotonic()
+        with self.assertRaises(Rejected) as ctx:
+            ac.admit('c', 1)
+        self.assertEqual(ctx.exception.status, 503)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+        first.__exit__(None, None, None)
+        thread.join(2)
+        self.assertEqual(order, ['queued ran'])
+        self.assertEqual(ac.status()['in_flight'], 0)
+
+    def test_queue_timeout_refunds_tokens(self):
+        ac = AdmissionController(capacity=1, max_queue=4, queue_timeout=0.05, client_rate=0.001, client_burst=1)
+        held = ac.admit('a', 1)
+        with self.assertRaises(Rejected) as ctx:
+            ac.admit('b', 1)
+        self.assertEqual(ctx.exception.status, 503)
+        held.__exit__(None, None, None)
+        # b was not charged for the request that never ran
+        with ac.admit('b', 1):
+            pass
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+import unittest
+from src.archive import ArchiveBuilder, MatchArchive, predict_next
+from src.data_manager import DataManager
+from src.ingest import ingest_performances
+
+def raw_match(num, red, blue, red_pts, blue_pts, surrogate=()):
+    side = lambda pts, pen: {'totalPoints': pts, 'penaltyPointsByOpp': pen, 'autoPoints': 10, 'dcPoints': pts - 10 - pen,
+                             'movementRp': 1, 'goalRp': 0, 'patternRp': 1}
+    return {'matchNum': num,
+            'teams': [{'teamNumber': t, 'alliance': 'Red', 'surrogate': t in surrogate} for t in red] +
+                     [{'teamNumber': t, 'alliance': 'Blue', 'surrogate': t in surrogate} for t in blue],
+            'scores': {'red': side(red_pts, 5), 'blue': side(blue_pts, 0)}}
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'match_archive')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_columns_and_team_index(self):
+        builder = ArchiveBuilder()
+        late = builder.add_event('EVT2', 2025, 'M2', end='2025-12-01')
+        early = builder.add_event('EVT1', 2025, 'M1', end='2025-11-01')
+        builder.add_raw_match(late, raw_match(1, [14259, 25627], [23212, 25810], 90, 40))
+        builder.add_raw_match(early, raw_match(2, [14259, 23212], [25627, 5214], 50, 60, surrogate={5214}))
+        builder.add_raw_match(early, raw_match(1, [25810, 5214], [14259, 30450], 30, 30))
+        self.assertEqual(builder.write(self.path), 3)
+
+        archive = MatchArchive(self.path)
+        # Rows are ordered by event date, then match number
+        self.assertEqual([archive.match_id(r) for r in range(3)], ['M1-Q1', 'M1-Q2', 'M2-Q1'])
+        self.assertEqual(archive.np_score[2].tolist(), [85, 40])
+        self.assertEqual(archive.rp[2].tolist(), [5, 2])
+        self.assertEqual(archive.rp_components[0, 0].tolist(), [1, 0, 1])
+
+        rows, slots = archive.team_view('14259')
+        self.assertEqual(rows.tolist(), [0, 1, 2])
+        self.assertEqual(slots.tolist(), [2, 0, 0])
+        self.assertEqual(archive.team_column('14259', 'score').tolist(), [30, 50, 90])
+        self.assertEqual(archive.team_view('99999')[0].tolist(), [])
+
+        perfs = archive.team_performances('5214')
+        self.assertEqual([(p['match_id'], p['rp'], p['is_surrogate']) for p in perfs],
+                         [('M1-Q1', 3, False), ('M1-Q2', 0, True)])
+
+    def test_undated_events_sort_after_dated_ones(self):
+        builder = ArchiveBuilder()
+        builder.FLUSH_ROWS = 2
+        live = builder.add_event('LIVE', 2025, 'T', 'tournament')
+        done = builder.add_event('DONE', 2025, 'M1', end='2025-11-01')
+        for num in (3, 1, 2):
+            builder.add_match(live, num, [14259, 25627, 23212, 25810], [num, 0], [0, 0], label=f'T-{num}')
+            builder.add_match(done, num, [14259, 25627, 23212, 25810], [num, 0], [0, 0])
+        self.assertEqual(builder.write(self.path), 6)
+        builder.close()
+        archive = MatchArchive(self.path)
+        self.assertEqual([archive.match_id(r) for r in range(6)],
+                         ['M1-Q1', 'M1-Q2', 'M1-Q3', 'T-1', 'T-2', 'T-3'])
+        self.assertEqual(archive.score[:, 0].tolist(), [1, 2, 3, 1, 2, 3])
+
+    def test_ingest_replaces_events_and_feeds_data_manager(self):
+        builder = ArchiveBuilder()
+        old = builder.add_event('OLD', 2024, 'OLD', 'league')
+        builder.add_raw_match(old, raw_match(1, [14259, 25627], [23212, 25810], 10, 20))
+        builder.write(self.path)
+
+        cwd = os.getcwd()
+        try:
+            os.chdir(self.tmp)
+            matches = [raw_match(1, [14259, 25627], [23212, 25810], 90, 40)]
+
+            def fetch(code, event):
+                event['end'] = '2025-11-15T00:00:00'
+                return iter(matches)
+            ingest_performances([('EVT', 'M1')], fetch=fetch, archive_path=self.path)
+            ingest_performances([('EVT', 'M1')], fetch=fetch, archive_path=self.path)
+
+            archive = MatchArchive(self.path)
+            self.assertEqual([(e['code'], e['season'], e['end']) for e in archive.events],
+                             [('OLD', 2024, None), ('EVT', 2025, '2025-11-15')])
+            self.assertEqual(len(archive), 2)
+
+            # DataManager reads the latest league season straight from the archive
+            dm = DataManager()
+            self.assertEqual(dm.teams['14259']._ftc_performances,
+                             [{'match_id': 'M1-Q1', 'rp': 5, 'score': 90, 'is_surrogate': False}])
+        finally:
+            os.chdir(cwd)
+
+    def test_predict_next_matches_linear_trend(self):
+        self.assertAlmostEqual(predict_next([10, 20, 30]), 40)
+        self.assertEqual(predict_next([0, 12, 0]), 12)
+        self.assertEqual(predict_next([]), 0)
+
+if __name__ == '__main__':
+    unittest.main()
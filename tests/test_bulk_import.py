@@ -0,0 +1,48 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from src.data_manager import DataManager
+
+def row(match_id, r1="14259", r2="25627", b1="23212", b2="25810", rs=100, bs=80, rrp=6, brp=0):
+    return {'match_id': match_id, 'r1': r1, 'r2': r2, 'b1': b1, 'b2': b2,
+            'rs': rs, 'bs': bs, 'rrp': rrp, 'brp': brp}
+
+class TestBulkImport(unittest.TestCase):
+    def setUp(self):
+        # add_tournament_matches persists, so work on a scratch copy of the data files
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        shutil.copy('ftcscout_data.json', self.tmp)
+        os.chdir(self.tmp)
+        self.dm = DataManager()
+        self.events = []
+        self.dm.subscribe(lambda event, teams, payload: self.events.append(event))
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+
+    def test_valid_rows_applied_with_one_notification(self):
+        errors = self.dm.add_tournament_matches([row("T-1"), row("T-2", rs="70", bs="90", rrp="1", brp="4")])
+        self.assertEqual(errors, [])
+        self.assertEqual(self.events, ['matches_imported'])
+        self.assertEqual(len(self.dm.get_team_matches("14259")), 2)
+        with open('tournament_matches.json') as f:
+            self.assertEqual([m['match_id'] for m in json.load(f)], ["T-1", "T-2"])
+
+    def test_any_invalid_row_rejects_whole_import(self):
+        errors = self.dm.add_tournament_matches([
+            row("T-1"),
+            row("T-1"),
+            row("T-3", r1="99999"),
+            row("T-4", rs="abc"),
+            {'match_id': "T-5"},
+        ])
+        self.assertEqual([e['row'] for e in errors], [1, 2, 3, 4])
+        self.assertEqual(self.dm.get_tournament_matches(), [])
+        self.assertEqual(self.events, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import threading
+import time
+import unittest
+from src.computation import SingleFlight, JobQueue, QueueFull
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        sf = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(2)
+            return 42
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(sf.do('k', compute)))
+        leader.start()
+        started.wait(2)
+        followers = [threading.Thread(target=lambda: results.append(sf.do('k', compute))) for _ in range(5)]
+        for t in followers:
+            t.start()
+        time.sleep(0.05)
+        release.set()
+        for t in [leader] + followers:
+            t.join(2)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [42] * 6)
+        # Once finished, the next call computes again
+        self.assertEqual(sf.do('k', lambda: 7), 7)
+
+class TestJobQueue(unittest.TestCase):
+    def wait_for(self, queue, job_id):
+        for _ in range(200):
+            job = queue.get(job_id)
+            if job.status not in ('queued', 'running'):
+                return job
+            time.sleep(0.01)
+        self.fail("job did not finish")
+
+    def test_job_runs_and_reports(self):
+        queue = JobQueue(max_workers=1)
+
+        def task(job):
+            job.report(0.5)
+            return 'ok'
+
+        job = self.wait_for(queue, queue.submit('test', task).id)
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(job.to_dict()['result'], 'ok')
+        self.assertEqual(job.progress, 1.0)
+
+    def test_cancel_and_bounded_queue(self):
+        queue = JobQueue(max_workers=1, max_pending=2)
+        gate = threading.Event()
+
+        def slow(job):
+            while not gate.wait(0.01):
+                job.report(0.1)
+
+        running = queue.submit('slow', slow)
+        queued = queue.submit('slow', slow)
+        with self.assertRaises(QueueFull):
+            queue.submit('slow', slow)
+
+        self.assertTrue(queue.cancel(queued.id))
+        self.assertTrue(queue.cancel(running.id))
+        self.assertEqual(self.wait_for(queue, running.id).status, 'cancelled')
+        self.assertEqual(self.wait_for(queue, queued.id).status, 'cancelled')
+
+    def test_results_expire(self):
+        queue = JobQueue(result_ttl=0)
+        job = queue.submit('quick', lambda job: 1)
+        for _ in range(100):
+            if job.finished:
+                break
+            time.sleep(0.01)
+        time.sleep(0.01)
+        self.assertIsNone(queue.get(job.id))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from src.data_manager import DataManager
+from src.event_log import EventLog
+from src.ranking_calculator import RankingCalculator
+
+class TestEventLog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dm = DataManager()
+        self.log = self.new_log()
+        self.log.sync(self.dm, {})
+        self.log.attach(self.dm)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def new_log(self):
+        return EventLog(os.path.join(self.tmp.name, 'log.jsonl'),
+                        os.path.join(self.tmp.name, 'checkpoints.jsonl'),
+                        checkpoint_interval=3)
+
+    def add(self, match_id, rs, bs):
+        self.dm.add_tournament_match(match_id, "14259", "25627", "23212", "25810", rs, bs,
+                                     6 if rs > bs else 0, 6 if bs > rs else 0, save=False)
+
+    def test_time_travel_matches_live_standings(self):
+        snapshots = {}
+        for i in range(1, 8):
+            self.add(f"T-{i}", 100 + i, 90)
+            ranked = RankingCalculator.calculate_league_rankings(self.dm.get_all_teams())
+            snapshots[f"T-{i}"] = [(t.number, t.total_rp) for t in ranked]
+
+        # Rebuild every past state, mostly starting from checkpoints
+        self.assertTrue(len(self.log._checkpoints) >= 2)
+        for match_id, expected in snapshots.items():
+            seq = self.log.resolve(match_id)
+            got = [(t.number, t.total_rp) for t in self.log.standings_at(seq, self.dm.teams)]
+            self.assertEqual(got, expected)
+
+    def test_log_survives_reload_and_timeline_is_incremental(self):
+        self.add("T-1", 120, 80)
+        timeline = self.log.rank_timeline(self.dm.teams)
+        self.assertEqual(timeline[-1]['match_id'], "T-1")
+
+        self.add("T-2", 80, 120)
+        timeline = self.log.rank_timeline(self.dm.teams)
+        self.assertEqual([e['match_id'] for e in timeline[-2:]], ["T-1", "T-2"])
+
+        reopened = self.new_log()
+        self.assertEqual(reopened.seq, self.log.seq)
+        self.assertEqual(set(reopened.state['tournament_matches']), {"T-1", "T-2"})
+        self.assertEqual(reopened.resolve("T-1"), self.log.resolve("T-1"))
+
+    def test_shared_log_keeps_seqs_unique(self):
+        # A second worker process writing the same files
+        other = self.new_log()
+        self.add("T-1", 120, 80)
+        other.append('match_deleted', {'match_id': "T-1"})
+        self.add("T-2", 80, 120)
+        seqs = [e['seq'] for e in self.new_log().events]
+        self.assertEqual(seqs, list(range(1, len(seqs) + 1)))
+        self.assertEqual(self.log.resolve("T-2"), self.log.seq)
+        self.assertEqual(set(self.log.state_at(self.log.seq - 1)['tournament_matches']), set())
+        self.assertEqual(set(self.log.state_at(self.log.seq)['tournament_matches']), {"T-2"})
+        # Checkpoints written by either process are used by both
+        self.assertEqual(other.state_at(self.log.seq), self.log.state_at(self.log.seq))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import csv
+import io
+import json
+import unittest
+from src.data_manager import DataManager, Match
+from src.ranking_calculator import RankingCalculator
+from src.export import CHUNK_SIZE, BREAKDOWN_COLUMNS, MATCH_COLUMNS, stream_rows, breakdown_rows, match_rows
+
+class TestExport(unittest.TestCase):
+    def test_csv_streams_in_bounded_chunks(self):
+        produced = []
+
+        def rows():
+            for i in range(5000):
+                produced.append(i)
+                yield {'id': i, 'name': f"team, {i}", 'ignored': True}
+
+        chunks = stream_rows(rows(), ['id', 'name'], 'csv')
+        # The header is out before any row has been generated
+        self.assertEqual(next(chunks), 'id,name\n')
+        self.assertEqual(produced, [])
+        rest = list(chunks)
+        self.assertGreater(len(rest), 1)
+        self.assertTrue(all(len(c) < CHUNK_SIZE + 100 for c in rest))
+        parsed = list(csv.DictReader(io.StringIO('id,name\n' + ''.join(rest))))
+        self.assertEqual(len(parsed), 5000)
+        self.assertEqual(parsed[7], {'id': '7', 'name': 'team, 7'})
+
+    def test_ndjson_first_row_flushed(self):
+        chunks = stream_rows(({'a': i} for i in range(3)), ['a', 'b'], 'ndjson')
+        self.assertEqual(next(chunks), '{"a":0,"b":null}\n')
+        self.assertEqual([json.loads(line)['a'] for line in ''.join(chunks).splitlines()], [1, 2])
+
+    def test_breakdown_and_match_rows(self):
+        dm = DataManager()
+        ranked = RankingCalculator.calculate_league_rankings(list(dm.teams.values()), with_breakdown=False)
+        rows = list(breakdown_rows(ranked, RankingCalculator.match_breakdown))
+        self.assertEqual(set(rows[0]), set(BREAKDOWN_COLUMNS))
+        self.assertEqual(rows[0]['number'], ranked[0].number)
+        counted = sum(r['rp'] for r in rows if r['number'] == ranked[0].number and r['is_counted'])
+        self.assertEqual(counted, ranked[0].total_rp)
+
+        match = Match('T-1', ['1', '2'], ['3'], 50, 40, 3, 0, match_type="TOURNAMENT")
+        row = next(match_rows([match]))
+        self.assertEqual(set(row), set(MATCH_COLUMNS))
+        self.assertEqual((row['type'], row['blue1'], row['blue2']), ('tournament', '3', None))
+
+if __name__ == '__main__':
+    unittest.main()
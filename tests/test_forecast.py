@@ -0,0 +1,81 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from src.archive import ArchiveBuilder, MatchArchive, predict_next
+from src.forecast import QuantileSketch, ForecastStore, fit_trends, team_forecasts
+
+class TestQuantileSketch(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.data = [rng.gauss(50, 20) for _ in range(20000)]
+
+    def test_quantiles_close_to_exact(self):
+        sketch = QuantileSketch()
+        sketch.extend(self.data)
+        for q in (0.01, 0.1, 0.5, 0.9, 0.99):
+            self.assertAlmostEqual(sketch.quantile(q), float(np.quantile(self.data, q)), delta=1.0)
+            self.assertAlmostEqual(sketch.cdf(float(np.quantile(self.data, q))), q, delta=0.01)
+        self.assertLess(len(sketch.centroids), 100)
+
+    def test_merge_and_round_trip(self):
+        halves = [QuantileSketch(), QuantileSketch()]
+        halves[0].extend(self.data[:10000])
+        halves[1].extend(self.data[10000:])
+        merged = QuantileSketch.from_dict(halves[0].to_dict()).merge(QuantileSketch.from_dict(halves[1].to_dict()))
+        self.assertEqual(merged.count, len(self.data))
+        self.assertAlmostEqual(merged.quantile(0.5), float(np.median(self.data)), delta=1.0)
+
+class TestForecast(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'archive')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write_archive(self, events):
+        builder = ArchiveBuilder()
+        for code, matches in events:
+            event = builder.add_event(code, 2025, code)
+            for i, (teams, scores) in enumerate(matches):
+                builder.add_match(event, i + 1, teams, scores, [0, 0])
+        builder.write(self.path)
+        return MatchArchive(self.path)
+
+    def test_batch_trends_match_single_team_fit(self):
+        series = {'a': [10, 20, 35], 'b': [0, 12, 0], 'c': [], 'd': [40, 0, 30, 25]}
+        fits = fit_trends(series)
+        for team, values in series.items():
+            self.assertAlmostEqual(fits[team]['next'], predict_next(values), places=2)
+
+    def test_store_resketches_only_changed_events(self):
+        m1 = [(['1', '2', '3', '4'], [100, 40]), (['1', '3', '2', '4'], [80, 60]), (['1', '4', '2', '3'], [90, 50])]
+        archive = self.write_archive([('E1', m1), ('E2', m1)])
+        store = ForecastStore(os.path.join(self.tmp, 'sketches.json'))
+        self.assertEqual(store.update_from_archive(archive), 2)
+        self.assertEqual(store.update_from_archive(archive), 0)
+        store.save()
+
+        # Sketches survive a restart without any raw data
+        reloaded = ForecastStore(os.path.join(self.tmp, 'sketches.json'))
+        self.assertEqual(reloaded.distribution('score').count, 12)
+
+        m2 = m1 + [(['1', '2', '3', '4'], [150, 10])]
+        archive = self.write_archive([('E1', m1), ('E2', m2)])
+        self.assertEqual(reloaded.update_from_archive(archive), 1)
+        self.assertEqual(reloaded.distribution('score').count, 14)
+
+        # A corrected score changes neither the match count nor the score total
+        fixed = m1[:2] + [(['1', '4', '2', '3'], [91, 49])]
+        archive = self.write_archive([('E1', fixed), ('E2', m2)])
+        self.assertEqual(reloaded.update_from_archive(archive), 1)
+
+        forecast = team_forecasts(archive, reloaded, ['1'])['1']
+        self.assertEqual([t['event'] for t in forecast['trend']], ['E1', 'E2'])
+        self.assertIsNotNone(forecast['percentile'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import re
+import shutil
+import tempfile
+import unittest
+from src.graphql_client import BatchQuery, fetch_events
+from src.crawler import RegionCrawler
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+class FakeSession:
+    """Answers eventsSearch and aliased eventByCode fields from canned events."""
+    def __init__(self, events, fail_codes=()):
+        self.events = events
+        self.fail_codes = set(fail_codes)
+        self.requests = []
+
+    def post(self, url, json):
+        self.requests.append(json)
+        query, variables = json['query'], json['variables']
+        data = {}
+        for alias, field in re.findall(r'(\w+): (\w+)\(', query):
+            if field == 'eventsSearch':
+                data[alias] = [{'code': c} for c in self.events]
+            elif field == 'eventByCode':
+                code = variables[f"{alias}_code"]
+                if code in self.fail_codes:
+                    raise ConnectionError("venue wifi")
+                data[alias] = self.events[code]
+        return FakeResponse({'data': data})
+
+def event(code, teams):
+    return {'code': code, 'matches': [],
+            'teams': [{'teamNumber': t, 'team': {'name': f"Team {t}", 'city': 'Dublin', 'stateProv': 'CA', 'country': 'USA'}}
+                      for t in teams]}
+
+class TestBatchQuery(unittest.TestCase):
+    def test_values_go_in_variables_and_chunks_are_bounded(self):
+        batch = BatchQuery(max_aliases=2)
+        for code in ['A"; drop', 'B', 'C']:
+            batch.add('eventByCode', {'code': ('String!', code), 'season': ('Int!', 2025)}, '{ code }')
+        chunks = batch.render()
+        self.assertEqual([c[2] for c in chunks], [['q0', 'q1'], ['q2']])
+        query, variables, _ = chunks[0]
+        self.assertNotIn('drop', query)
+        self.assertEqual(variables['q0_code'], 'A"; drop')
+        self.assertIn('$q1_season: Int!', query)
+
+    def test_fetch_events_uses_one_request(self):
+        session = FakeSession({c: event(c, []) for c in ['M1', 'M2', 'M3']})
+        events = fetch_events(['M1', 'M2', 'M3'], session=session)
+        self.assertEqual(sorted(events), ['M1', 'M2', 'M3'])
+        self.assertEqual(len(session.requests), 1)
+
+class TestRegionCrawler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_resumes_after_failure(self):
+        tmp = self.tmp
+        paths = dict(checkpoint_path=os.path.join(tmp, 'cp.json'), events_path=os.path.join(tmp, 'events.ndjson'),
+                     roster_path=os.path.join(tmp, 'roster.json'))
+        events = {f"E{i}": event(f"E{i}", [100 + i, 200 + i]) for i in range(6)}
+
+        first = RegionCrawler(2025, 'USCA', session=FakeSession(events, fail_codes={'E5'}),
+                              batch_size=2, concurrency=2, **paths).run()
+        self.assertEqual(sorted(first['done']), ['E0', 'E1', 'E2', 'E3'])
+
+        session = FakeSession(events)
+        second = RegionCrawler(2025, 'USCA', session=session, batch_size=2, **paths).run()
+        self.assertEqual(sorted(second['done']), sorted(events))
+        # Only the unfinished batch was fetched again, and discovery came from the checkpoint
+        self.assertEqual(len(session.requests), 1)
+        self.assertEqual(len(second['teams']), 12)
+        self.assertEqual(second['teams']['100']['location'], 'Dublin, CA, USA')
+
+    def test_empty_discovery_is_retried(self):
+        paths = dict(checkpoint_path=os.path.join(self.tmp, 'cp.json'), events_path=os.path.join(self.tmp, 'events.ndjson'))
+        first = RegionCrawler(2025, 'USCA', session=FakeSession({}), **paths).run()
+        self.assertIsNone(first['events'])
+        self.assertFalse(os.path.exists(paths['checkpoint_path']))
+        second = RegionCrawler(2025, 'USCA', session=FakeSession({'E0': event('E0', [100])}), **paths).run()
+        self.assertEqual(second['done'], ['E0'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,160 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+import requests
+from src.http_cache import GraphQLCache, CachedSession, cache_key, is_completed_event_data
+from src.ingest import EVENT_MATCHES_QUERY, stream_event_matches
+from src.ftcscout_standin import create_app
+
+QUERY = "query($code: String!) { eventByCode(code: $code, season: 2025) { end matches { matchNum } } }"
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+    def iter_content(self, chunk_size=64 * 1024):
+        body = json.dumps(self.payload).encode()
+        for i in range(0, len(body), 7):
+            yield body[i:i + 7]
+
+    def close(self):
+        pass
+
+class FakeHttp:
+    def __init__(self, end='2099-01-01'):
+        self.end = end
+        self.calls = 0
+        self.offline = False
+        self.streamed = 0
+
+    def post(self, url, json, timeout=None, stream=False):
+        if self.offline:
+            raise requests.ConnectionError("no network")
+        self.calls += 1
+        self.streamed += stream
+        return FakeResponse({'data': {'eventByCode': {'end': self.end, 'matches': [{'matchNum': self.calls}]}}})
+
+class TestHttpCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = GraphQLCache(self.tmp.name)
+        self.body = {'query': QUERY, 'variables': {'code': 'USCANOEBM1'}}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_ignores_formatting_but_not_variables(self):
+        reformatted = QUERY.replace(' { ', ' {\n      ')
+        self.assertEqual(cache_key(QUERY, {'code': 'A'}), cache_key(reformatted, {'code': 'A'}))
+        self.assertNotEqual(cache_key(QUERY, {'code': 'A'}), cache_key(QUERY, {'code': 'B'}))
+
+    def test_fresh_entry_skips_network(self):
+        http = FakeHttp()
+        session = CachedSession(self.cache, ttl=300, http=http)
+        first = session.post('url', json=self.body)
+        second = session.post('url', json=self.body)
+        self.assertEqual(http.calls, 1)
+        self.assertEqual(first.json(), second.json())
+        self.assertTrue(second.from_cache)
+
+    def test_offline_serves_expired_copy(self):
+        http = FakeHttp()
+        session = CachedSession(self.cache, ttl=0, stale_while_revalidate=0, http=http)
+        session.post('url', json=self.body)
+        http.offline = True
+        response = session.post('url', json=self.body)
+        self.assertEqual(response.json()['data']['eventByCode']['matches'][0]['matchNum'], 1)
+        # Nothing cached for another event, so the error propagates
+        with self.assertRaises(requests.ConnectionError):
+            session.post('url', json={'query': QUERY, 'variables': {'code': 'OTHER'}})
+
+    def test_stale_entry_served_while_revalidating(self):
+        http = FakeHttp()
+        session = CachedSession(self.cache, ttl=0, stale_while_revalidate=3600, http=http)
+        session.post('url', json=self.body)
+        response = session.post('url', json=self.body)
+        self.assertEqual(response.json()['data']['eventByCode']['matches'][0]['matchNum'], 1)
+        for _ in range(100):
+            if http.calls == 2 and not session._refreshing:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.cache.get(QUERY, self.body['variables'])['response']['data']['eventByCode']['matches'][0]['matchNum'], 2)
+
+    def test_completed_events_are_permanent(self):
+        self.assertTrue(is_completed_event_data({'data': {'a': {'end': '2025-11-01'}}}, today='2026-01-01'))
+        self.assertFalse(is_completed_event_data({'data': {'a': {'end': '2026-02-01'}}}, today='2026-01-01'))
+        http = FakeHttp(end='2000-01-01')
+        session = CachedSession(self.cache, ttl=0, stale_while_revalidate=0, http=http)
+        session.post('url', json=self.body)
+        session.post('url', json=self.body)
+        self.assertEqual(http.calls, 1)
+
+    def test_default_session_refetches_events_in_progress(self):
+        http = FakeHttp()
+        session = CachedSession(self.cache, http=http)
+        session.post('url', json=self.body)
+        response = session.post('url', json=self.body)
+        self.assertEqual(http.calls, 2)
+        self.assertFalse(response.from_cache)
+
+    def test_streamed_body_is_cached_as_it_is_read(self):
+        http = FakeHttp(end='2000-01-01')
+        session = CachedSession(self.cache, http=http)
+        response = session.post('url', json=self.body, stream=True)
+        body = b''.join(response.iter_content())
+        response.close()
+        entry = self.cache.get(QUERY, self.body['variables'])
+        self.assertTrue(entry['permanent'])
+        self.assertEqual(entry['response'], json.loads(body))
+        # The finished event is now read back from disk without a request
+        cached = session.post('url', json=self.body, stream=True)
+        self.assertTrue(cached.from_cache)
+        self.assertEqual(b''.join(cached.iter_content(5)), body)
+        self.assertEqual(http.streamed, 1)
+
+    def test_partly_read_stream_is_not_cached(self):
+        session = CachedSession(self.cache, http=FakeHttp())
+        response = session.post('url', json=self.body, stream=True)
+        next(response.iter_content())
+        response.close()
+        self.assertIsNone(self.cache.get(QUERY, self.body['variables']))
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_streaming_offline_serves_cached_matches(self):
+        http = FakeHttp()
+        session = CachedSession(self.cache, http=http)
+        variables = {'code': 'USCANOEBM1', 'season': 2025}
+        self.assertEqual([m['matchNum'] for m in stream_event_matches('USCANOEBM1', session=session)], [1])
+        self.assertFalse(self.cache.entry(EVENT_MATCHES_QUERY, variables)['permanent'])
+        http.offline = True
+        event = {}
+        self.assertEqual([m['matchNum'] for m in stream_event_matches('USCANOEBM1', session=session, event=event)], [1])
+        self.assertEqual(event['end'], '2099-01-01')
+        with self.assertRaises(requests.ConnectionError):
+            list(stream_event_matches('OTHER', session=session))
+
+    def test_standin_serves_cache_and_recordings(self):
+        self.cache.put(QUERY, self.body['variables'], {'data': {'eventByCode': {'matches': []}}})
+        recordings = os.path.join(self.tmp.name, 'recordings')
+        os.makedirs(recordings)
+        with open(os.path.join(recordings, 'm2.json'), 'w') as f:
+            json.dump({'query': QUERY, 'variables': {'code': 'M2'}, 'response': {'data': {'eventByCode': None}}}, f)
+        client = create_app(self.tmp.name, recordings).test_client()
+
+        hit = client.post('/graphql', json=self.body)
+        self.assertEqual(hit.get_json(), {'data': {'eventByCode': {'matches': []}}})
+        self.assertEqual(hit.headers['Access-Control-Allow-Origin'], '*')
+        recorded = client.post('/graphql', json={'query': QUERY, 'variables': {'code': 'M2'}})
+        self.assertEqual(recorded.get_json(), {'data': {'eventByCode': None}})
+        miss = client.post('/graphql', json={'query': QUERY, 'variables': {'code': 'M9'}})
+        self.assertTrue(miss.get_json()['errors'])
+
+if __name__ == '__main__':
+    unittest.main()
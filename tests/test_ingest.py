@@ -0,0 +1,60 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from src.data_manager import DataManager
+from src.ingest import iter_array_items, ingest_performances
+
+MATCHES = [
+    {'matchNum': 1,
+     'teams': [{'teamNumber': 14259, 'alliance': 'Red', 'surrogate': False},
+               {'teamNumber': 25627, 'alliance': 'Red', 'surrogate': False},
+               {'teamNumber': 23212, 'alliance': 'Blue', 'surrogate': False},
+               {'teamNumber': 25810, 'alliance': 'Blue', 'surrogate': True}],
+     'scores': {'red': {'totalPoints': 90, 'movementRp': 1, 'goalRp': 1, 'patternRp': 0},
+                'blue': {'totalPoints': 40, 'movementRp': 1, 'goalRp': 0, 'patternRp': 0}}},
+    {'matchNum': 2, 'note': 'TURBΩ ] } "matches"',
+     'teams': [{'teamNumber': 14259, 'alliance': 'Blue', 'surrogate': False}],
+     'scores': None},
+]
+
+def response_bytes():
+    return json.dumps({'data': {'eventByCode': {'matches': MATCHES}}}, ensure_ascii=False).encode()
+
+class TestIngest(unittest.TestCase):
+    def test_items_survive_any_chunking(self):
+        body = response_bytes()
+        for size in (1, 3, 7, 64, len(body)):
+            chunks = [body[i:i + size] for i in range(0, len(body), size)]
+            self.assertEqual(list(iter_array_items(chunks)), MATCHES)
+
+    def test_fields_before_array_are_captured(self):
+        body = json.dumps({'data': {'eventByCode': {'end': '2025-11-15', 'matches': MATCHES}}}, ensure_ascii=False).encode()
+        for size in (1, 5, len(body)):
+            head = {}
+            items = iter_array_items([body[i:i + size] for i in range(0, len(body), size)], head=head)
+            self.assertEqual(next(items), MATCHES[0])
+            self.assertEqual(head, {'end': '2025-11-15'})
+
+    def test_ingest_writes_ndjson_loaded_by_data_manager(self):
+        cwd = os.getcwd()
+        tmp = tempfile.mkdtemp()
+        try:
+            os.chdir(tmp)
+            count = ingest_performances([('EVT', 'M1')], fetch=lambda code, event: iter_array_items([response_bytes()], head=event))
+            self.assertEqual(count, 5)
+
+            dm = DataManager()
+            perfs = {p['match_id']: p for p in dm.teams['14259']._ftc_performances}
+            self.assertEqual(perfs['M1-Q1'], {'match_id': 'M1-Q1', 'rp': 5, 'score': 90, 'is_surrogate': False})
+            # Surrogate appearances earn neither RP nor score
+            self.assertEqual(dm.teams['25810']._ftc_performances[0]['rp'], 0)
+            self.assertEqual(dm.teams['25810']._ftc_performances[0]['score'], 0)
+            self.assertEqual(dm.teams['25810']._ftc_performances[0]['is_surrogate'], True)
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(tmp)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+import numpy as np
+from src.data_manager import DataManager
+from src.ranking_calculator import RankingCalculator
+from src.leverage import BatchRanker, OutcomeModel, LeverageAnalyzer, match_rp
+
+class TestLeverage(unittest.TestCase):
+    def setUp(self):
+        self.dm = DataManager()
+        self.teams = list(self.dm.teams.values())
+        nums = [t.number for t in self.teams]
+        self.matches = [{'match_id': f'R-{i}', 'red': [nums[i % len(nums)], nums[(i + 1) % len(nums)]],
+                         'blue': [nums[(i + 2) % len(nums)], nums[(i + 3) % len(nums)]]} for i in range(8)]
+        self.alliances = [(m['red'], m['blue']) for m in self.matches]
+        self.model = OutcomeModel.from_history(self.alliances, self.dm.teams)
+
+    def test_batch_ranks_match_ranking_calculator(self):
+        ranker = BatchRanker(self.teams, self.alliances)
+        score, bonus = self.model.sample(5, np.random.default_rng(1))
+        rp = match_rp(score, bonus)
+        ranks = ranker.rank(rp, score)
+        for b in range(5):
+            hypothetical = [{'match_id': m['match_id'], 'r1': m['red'][0], 'r2': m['red'][1],
+                             'b1': m['blue'][0], 'b2': m['blue'][1],
+                             'rs': int(score[b, i, 0]), 'bs': int(score[b, i, 1]),
+                             'rrp': int(rp[b, i, 0]), 'brp': int(rp[b, i, 1])} for i, m in enumerate(self.matches)]
+            ranked = RankingCalculator.calculate_league_rankings(
+                self.dm.get_all_teams_with_hypothetical(hypothetical), with_breakdown=False)
+            expected = {t.number: t.league_rank for t in ranked}
+            self.assertEqual([expected[n] for n in ranker.numbers], ranks[b].tolist())
+
+    def test_winning_own_match_helps(self):
+        result = LeverageAnalyzer(n_sims=100).analyze(self.teams, self.matches, self.model, top=None)
+        self.assertEqual(result, LeverageAnalyzer(n_sims=100).analyze(self.teams, self.matches, self.model, top=None))
+        team = self.matches[0]['red'][0]
+        entry = next(e for e in result['teams'][team]['matches'] if e['match_id'] == 'R-0')
+        self.assertEqual(entry['alliance'], 'red')
+        self.assertLess(entry['rank_if_red'], entry['rank_if_blue'])
+        self.assertGreater(entry['ap_swing'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from src.data_manager import Match
+from src.match_index import MatchIndex
+
+class _Manager:
+    def __init__(self):
+        self.matches = []
+        self.listeners = []
+
+    def subscribe(self, callback):
+        self.listeners.append(callback)
+
+    def fire(self, event, payload):
+        for callback in self.listeners:
+            callback(event, set(), payload)
+
+class TestMatchIndex(unittest.TestCase):
+    def setUp(self):
+        self.manager = _Manager()
+        self.index = MatchIndex(meets_path='meets_data.json')
+        self.index.attach(self.manager)
+
+    def test_filters(self):
+        total, rows = self.index.query(team='14259', min_score=80, sort='-score', limit=None)
+        scores = [r['red_score'] if '14259' in r['red'] else r['blue_score'] for r in rows]
+        self.assertEqual(total, len(rows))
+        self.assertTrue(scores and all(s >= 80 for s in scores))
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        _, page = self.index.query(team='14259', min_score=80, sort='-score', limit=2, offset=1)
+        self.assertEqual(page, rows[1:3])
+
+        _, rows = self.index.query(team='14259', opponent='25810', event='M1', limit=None)
+        for r in rows:
+            self.assertEqual(r['event'], 'M1')
+            self.assertIn('14259', r['red'] + r['blue'])
+            self.assertEqual('14259' in r['red'], '25810' in r['blue'])
+        with self.assertRaises(ValueError):
+            self.index.query(partner='14259')
+
+    def test_incremental_matches_rebuild(self):
+        before = self.index.query(limit=None)
+        match = Match('T-1', ['14259', '23212'], ['25810', '5214'], 300, 10, 4, 0,
+                      match_type="TOURNAMENT", surrogates=['5214'])
+        self.manager.matches.append(match)
+        self.manager.fire('match_added', {'match': match})
+        self.assertEqual(self.index.query(min_score=250)[1][0]['match_id'], 'T-1')
+        self.assertEqual(self.index.query(team='23212', partner='14259', kind='tournament')[0], 1)
+        self.assertEqual(self.index.query(team='5214', surrogate=True)[1][0]['match_id'], 'T-1')
+
+        self.manager.matches.remove(match)
+        self.manager.fire('match_deleted', {'match_id': 'T-1'})
+        self.assertEqual(self.index.query(limit=None), before)
+        self.assertEqual(self.index.query(min_score=250)[0], 0)
+        self.assertNotIn('5214', self.index.by_surrogate)
+        self.assertEqual(len(self.index.scores), 2 * before[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from src.materializer import Materializer
+
+class TestMaterializer(unittest.TestCase):
+    def setUp(self):
+        self.state = {'value': 1}
+        self.calls = {'a': 0, 'b': 0}
+        self.published = []
+        self.m = Materializer(debounce=0.02)
+
+        def build(key):
+            def fn():
+                self.calls[key] += 1
+                return {key: self.state['value']}
+            return fn
+
+        self.m.register('a', build('a'), on_built=self.published.append)
+        self.m.register('b', build('b'), group='advancement')
+        self.m.start()
+        self.assertTrue(self.m.wait_idle())
+
+    def test_ready_bytes_and_stale_reads(self):
+        self.assertEqual(self.m.get('a'), b'{"a":1}')
+        self.assertEqual(self.published, [b'{"a":1}'])
+        self.state['value'] = 2
+        self.m.invalidate()
+        # Stale until rebuilt, so the caller computes instead of serving old data
+        self.assertIsNone(self.m.get('a'))
+        self.assertTrue(self.m.wait_idle())
+        self.assertEqual(self.m.get('a'), b'{"a":2}')
+        self.assertIsNone(self.m.get('unknown'))
+
+    def test_burst_is_debounced(self):
+        for i in range(50):
+            self.state['value'] = i
+            self.m.invalidate()
+        self.assertTrue(self.m.wait_idle())
+        self.assertLessEqual(self.calls['a'], 3)
+        self.assertEqual(self.m.get('a'), b'{"a":49}')
+
+    def test_group_invalidation(self):
+        before = dict(self.calls)
+        self.m.invalidate('advancement')
+        self.assertTrue(self.m.wait_idle())
+        self.assertEqual(self.calls['a'], before['a'])
+        self.assertEqual(self.calls['b'], before['b'] + 1)
+
+    def test_failed_build_is_not_served(self):
+        self.m.register('broken', lambda: 1 / 0)
+        self.assertTrue(self.m.wait_idle())
+        self.assertIsNone(self.m.get('broken'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from src.data_manager import DataManager
+from src.ranking_calculator import RankingCalculator
+from src.pipeline import RankingPipeline
+
+class TestRankingPipeline(unittest.TestCase):
+    def setUp(self):
+        self.dm = DataManager()
+        self.pipeline = RankingPipeline(self.dm)
+        self.awards = {}
+
+    def advancement(self):
+        return self.pipeline.advancement({}, self.awards, {})
+
+    def test_matches_full_recompute(self):
+        self.dm.add_tournament_match("T-1", "14259", "25627", "23212", "25810", 120, 80, 6, 0, save=False)
+        self.awards['30450'] = 60
+        incremental = [(t.number, t.league_rank, t.advancement_points) for t in self.advancement()]
+
+        fresh = DataManager()
+        fresh.add_tournament_match("T-1", "14259", "25627", "23212", "25810", 120, 80, 6, 0, save=False)
+        ranked = RankingCalculator.calculate_league_rankings(fresh.get_all_teams())
+        full = RankingCalculator.calculate_advancement_points(ranked, {}, self.awards, {})
+        self.assertEqual(incremental, [(t.number, t.league_rank, t.advancement_points) for t in full])
+
+    def test_award_only_recomputes_one_team(self):
+        self.advancement()
+        before = dict(self.pipeline.recomputed)
+
+        self.awards['30450'] = 60
+        self.pipeline.invalidate_advancement(['30450'])
+        result = self.advancement()
+
+        self.assertEqual(self.pipeline.recomputed['team_totals'], before['team_totals'])
+        self.assertEqual(self.pipeline.recomputed['league_rank'], before['league_rank'])
+        self.assertEqual(self.pipeline.recomputed['advancement_points'], before['advancement_points'] + 1)
+        self.assertEqual(result[0].number, '30450')
+
+    def test_match_only_recomputes_its_teams(self):
+        self.pipeline.standings()
+        before = self.pipeline.recomputed['team_totals']
+        self.dm.add_tournament_match("T-1", "14259", "25627", "23212", "25810", 120, 80, 6, 0, save=False)
+        self.pipeline.standings()
+        self.assertEqual(self.pipeline.recomputed['team_totals'], before + 4)
+
+    def test_breakdown_built_on_demand_matches_eager(self):
+        self.dm.add_tournament_match("T-1", "14259", "25627", "23212", "25810", 120, 80, 6, 0, save=False)
+        lazy = {t.number: RankingCalculator.match_breakdown(t) for t in self.pipeline.standings()}
+        eager = RankingCalculator.calculate_league_rankings([t.clone() for t in self.dm.teams.values()])
+        self.assertEqual(lazy, {t.number: t.match_breakdown for t in eager})
+
+if __name__ == '__main__':
+    unittest.main()
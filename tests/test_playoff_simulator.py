@@ -0,0 +1,47 @@
+import unittest
+from src.data_manager import DataManager
+from src.playoff_simulator import PlayoffSimulator
+
+class TestPlayoffSimulator(unittest.TestCase):
+    def setUp(self):
+        self.dm = DataManager()
+        self.alliances = {
+            'alliance1': {'captain': '14259', 'pick1': '25627'},
+            'alliance2': {'captain': '23212', 'pick1': '25810'},
+            'alliance3': {'captain': '32098', 'pick1': '5214'},
+            'alliance4': {'captain': '30474', 'pick1': '11920'},
+        }
+
+    def test_probabilities_sum(self):
+        sim = PlayoffSimulator(n_sims=2000)
+        projection = sim.simulate(self.alliances, self.dm.teams)
+        self.assertEqual(len(projection), 8)
+
+        captains = [a['captain'] for a in self.alliances.values()]
+        self.assertAlmostEqual(sum(projection[c]['winner'] for c in captains), 1.0, places=3)
+        self.assertAlmostEqual(sum(projection[c]['finalist'] for c in captains), 1.0, places=3)
+
+        # Partners share the alliance outcome
+        self.assertEqual(projection['14259'], projection['25627'])
+        p = projection['14259']
+        self.assertAlmostEqual(p['expected_playoff_pts'], p['winner'] * 40 + p['finalist'] * 20, places=1)
+
+    def test_changing_pick_only_resimulates_affected_series(self):
+        sim = PlayoffSimulator(n_sims=2000)
+        sim.simulate(self.alliances, self.dm.teams)
+        # 2 semifinals + 4 possible finals
+        self.assertEqual(sim.series_simulated, 6)
+
+        self.alliances['alliance3']['pick1'] = '30450'
+        sim.simulate(self.alliances, self.dm.teams)
+        # 2v3 semifinal plus the two finals alliance 3 can reach
+        self.assertEqual(sim.series_simulated, 9)
+
+    def test_empty_alliance_forfeits(self):
+        self.alliances['alliance4'] = {}
+        projection = PlayoffSimulator(n_sims=500).simulate(self.alliances, self.dm.teams)
+        self.assertNotIn('30474', projection)
+        self.assertEqual(projection['14259']['winner'] + projection['14259']['finalist'], 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from src.archive import ArchiveBuilder, MatchArchive
+from src.predictor import MatchPredictor, backtest, run_backtests
+
+def synthetic_archive(path, n_events=3, matches=40, seed=3):
+    """Teams 1..20 with strength 5*number; the goal RP goes to alliances scoring over 100."""
+    rng = random.Random(seed)
+    builder = ArchiveBuilder()
+    for e in range(n_events):
+        event = builder.add_event(f"E{e}", 2025, f"E{e}", end=f"2025-0{e + 1}-01")
+        for m in range(matches):
+            teams = rng.sample(range(1, 21), 4)
+            scores = [max(1, int(5 * (teams[0] + teams[1]) + rng.gauss(0, 15))),
+                      max(1, int(5 * (teams[2] + teams[3]) + rng.gauss(0, 15)))]
+            components = [[0, int(s > 100), 0] for s in scores]
+            builder.add_match(event, m + 1, teams, scores, [0, 0], rp_components=components)
+    builder.write(path)
+
+class TestMatchPredictor(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.tmp, 'archive')
+        synthetic_archive(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def test_fit_recovers_strengths(self):
+        archive = MatchArchive(self.path)
+        model = MatchPredictor(ridge=1.0).fit(archive.teams, archive.score, archive.rp_components)
+        oprs = model.opr[:len(model.team_ids)]
+        self.assertGreater(np.corrcoef(oprs, 5 * model.team_ids)[0, 1], 0.95)
+
+        pred = model.predict(np.array([[20, 19], [1, 2], [10, 11]]), np.array([[1, 2], [20, 19], [12, 9]]))
+        total = pred['win'] + pred['tie'] + pred['loss']
+        np.testing.assert_allclose(total, 1.0)
+        self.assertGreater(pred['win'][0], 0.95)
+        self.assertLess(pred['win'][1], 0.05)
+        self.assertGreater(pred['red_goal'][0], 0.8)
+        self.assertLess(pred['blue_goal'][0], 0.2)
+        # Movement was never earned, so it has no model
+        self.assertTrue(np.isnan(pred['red_movement']).all())
+
+        single = model.predict_match(['20', '19'], ['1', '2'])
+        self.assertAlmostEqual(single['win'], round(float(pred['win'][0]), 4))
+        self.assertIsNone(single['red_movement'])
+        # Unseen teams get the average contribution
+        unknown = model.predict_match(['998'], ['999'])
+        self.assertAlmostEqual(unknown['win'], unknown['loss'])
+
+    def test_fit_with_empty_slots(self):
+        teams = np.array([[1, 0, 2, 3], [2, 3, 1, 0], [1, 2, 3, 0], [3, 0, 1, 2]] * 5)
+        scores = np.array([[40, 50], [50, 40], [60, 30], [30, 60]] * 5)
+        model = MatchPredictor(ridge=1.0).fit(teams, scores)
+        self.assertTrue(np.isfinite(model.opr).all())
+        self.assertEqual(model.opr[-1], 0.0)
+        pred = model.predict(np.array([[1, 0]]), np.array([[2, 3]]))
+        self.assertLess(pred['win'][0], 0.5)
+
+    def test_backtest_beats_coin_flip_in_parallel(self):
+        configs = [{'archive_path': self.path, 'ridge': r, 'refit_every': k} for r in (1.0, 5.0) for k in (0, 10)]
+        results = run_backtests(configs, processes=2)
+        self.assertEqual([r['config'] for r in results], configs)
+        self.assertEqual(results[0]['brier'], backtest(self.path, ridge=1.0)['brier'])
+        for r in results:
+            self.assertEqual(r['matches'], 120)
+            # Coin flip on win/loss scores 0.5 Brier and log(2) log loss
+            self.assertLess(r['brier'], 0.5)
+            self.assertLess(r['log_loss'], 0.69)
+            self.assertIn('goal', r['components'])
+        self.assertGreater(results[1]['refits'], results[0]['refits'])
+
+if __name__ == '__main__':
+    unittest.main()
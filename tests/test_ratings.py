@@ -0,0 +1,59 @@
+import unittest
+from src.data_manager import Match
+from src.ratings import RatingEngine, LiveRatings, backfill
+
+def _match(i, red, blue, rs, bs):
+    return Match(f'T-{i}', red, blue, rs, bs, 0, 0, match_type="TOURNAMENT")
+
+class _Manager:
+    def __init__(self, matches):
+        self.matches = matches
+        self.listeners = []
+
+    def subscribe(self, callback):
+        self.listeners.append(callback)
+
+    def fire(self, event, payload):
+        for callback in self.listeners:
+            callback(event, set(), payload)
+
+class TestRatings(unittest.TestCase):
+    def test_stronger_team_rises(self):
+        engine = RatingEngine()
+        for i in range(12):
+            # '1' wins every match whoever it plays with
+            partners = ['2', '3', '4'][i % 3], ['2', '3', '4'][(i + 1) % 3]
+            engine.update(['1', partners[0]], [partners[1], '5'], 60, 40, (2025, 'E'))
+        rows = engine.snapshot()
+        self.assertEqual(rows[0]['number'], '1')
+        self.assertEqual(rows[-1]['number'], '5')
+        self.assertLess(engine.rating('1')[1], RatingEngine.DEFAULT_RD)
+        p = engine.win_probability(['1', '2'], ['3', '5'])
+        self.assertGreater(p, 0.5)
+        self.assertAlmostEqual(p + engine.win_probability(['3', '5'], ['1', '2']), 1.0)
+
+    def test_backfill_is_deterministic_and_matches_incremental(self):
+        matches = [_match(i, ['1', '2'], ['3', '4'], 50 + i, 45) for i in range(5)]
+        a, _ = backfill(matches, meets_path='missing.json')
+        b, _ = backfill(matches[:3], meets_path='missing.json')
+        for m in matches[3:]:
+            b.update(m.red_alliance, m.blue_alliance, m.red_score, m.blue_score, (2025, 'TOURNAMENT'))
+        self.assertEqual(a.snapshot(), b.snapshot())
+
+    def test_live_ratings_rebuild_on_delete(self):
+        manager = _Manager([_match(0, ['1', '2'], ['3', '4'], 50, 40)])
+        live = LiveRatings(meets_path='missing.json')
+        live.attach(manager)
+        before = live.engine.snapshot()
+        added = _match(1, ['3', '4'], ['1', '2'], 90, 10)
+        manager.matches.append(added)
+        manager.fire('match_added', {'match': added})
+        self.assertEqual(live.rebuilds, 1)
+        self.assertNotEqual(live.engine.snapshot(), before)
+        manager.matches.pop()
+        manager.fire('match_deleted', {})
+        self.assertEqual(live.rebuilds, 2)
+        self.assertEqual(live.engine.snapshot(), before)
+
+if __name__ == '__main__':
+    unittest.main()
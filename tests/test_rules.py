@@ -0,0 +1,54 @@
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.data_manager import Team, Match
+from src.ranking_calculator import RankingCalculator
+from src.rules import SEASONS, SeasonRules, load_seasons, rules_for
+
+class TestRules(unittest.TestCase):
+    def test_2025_rules(self):
+        rules = rules_for(2025)
+        self.assertEqual([rules.qualification_points(r) for r in (1, 15, 16, 40)], [16, 2, 2, 2])
+        self.assertEqual(rules.qualification_points_array(np.array([1, 15, 16])).tolist(), [16, 2, 2])
+        self.assertEqual(rules.alliance_points(1), 20)
+        self.assertEqual(rules.match_rp(50, 40, {'movementRp': True, 'goalRp': False, 'patternRp': True}), 5)
+        self.assertEqual(rules.match_rp(40, 40, {}), 1)
+        self.assertEqual(rules.result_rp_array(np.array([1, 2, 3]), np.array([2, 2, 2])).tolist(), [0, 1, 3])
+        self.assertEqual(rules.max_match_rp, 6)
+        # Seasons without a spec of their own use the nearest earlier one (or the earliest)
+        self.assertEqual(rules_for(2030).rank_order, rules.rank_order)
+        self.assertEqual(rules_for(2019).league_count, 10)
+        with self.assertRaises(ValueError):
+            SeasonRules(2025, dict(SEASONS[2025], rank_order=['wins']))
+
+    def test_season_from_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'season_rules.json')
+            with open(path, 'w') as f:
+                json.dump({'2026': {'extends': 2025, 'name': 'NEXT', 'counted': {'tournament': 1}}}, f)
+            rules = rules_for(2026, path)
+        self.assertEqual((rules.name, rules.league_count, rules.tournament_count), ('NEXT', 10, 1))
+
+        calculator = type('Calc', (RankingCalculator,), {'rules': rules})
+        team = Team('1', 'One', 'Somewhere')
+        for i, rp in enumerate([4, 2]):
+            team.add_match(Match(f'T-{i}', ['1', '2'], ['3', '4'], 50, 40, rp, 0, match_type="TOURNAMENT"))
+        self.assertEqual(RankingCalculator.calculate_league_rankings([team])[0].total_rp, 6)
+        self.assertEqual(calculator.calculate_league_rankings([team])[0].total_rp, 4)
+        self.assertEqual(sum(p['is_counted'] for p in team.match_breakdown), 1)
+
+    def test_bad_seasons_in_file_are_skipped(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'season_rules.json')
+            with open(path, 'w') as f:
+                json.dump({'2026': {'extends': 2027, 'name': 'FORWARD'}, '2027': {'extends': 2025},
+                           '2028': {'extends': 1999}, '2029': {'name': 'NO RULES'}}, f)
+            seasons = load_seasons(path)
+        self.assertEqual(seasons[2026]['name'], 'FORWARD')
+        self.assertNotIn(2028, seasons)
+        self.assertNotIn(2029, seasons)
+
+if __name__ == '__main__':
+    unittest.main()
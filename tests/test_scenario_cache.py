@@ -0,0 +1,35 @@
+import unittest
+from src.scenario_cache import ScenarioCache, canonical_scenario, scenario_key
+
+def _m(match_id, r1, r2, b1, b2, rs=50, bs=40):
+    return {'match_id': match_id, 'r1': r1, 'r2': r2, 'b1': b1, 'b2': b2, 'rs': rs, 'bs': bs, 'rrp': 3, 'brp': 0}
+
+class TestScenarioCache(unittest.TestCase):
+    def test_equivalent_scenarios_share_a_key(self):
+        a = [_m('Q1', '123', '45', '6', '7'), _m('Q2', '6', '45', '123', '7')]
+        b = [_m('Q2', '45', ' 006', 123, '7'), _m('Q1', '45', '123', '7', '6')]
+        self.assertEqual(canonical_scenario(a), canonical_scenario(b))
+        self.assertEqual(scenario_key(canonical_scenario(a), 1, 0), scenario_key(canonical_scenario(b), 1, 0))
+        # A new data version is a different key
+        self.assertNotEqual(scenario_key(canonical_scenario(a), 1, 0), scenario_key(canonical_scenario(a), 2, 0))
+        with self.assertRaises(ValueError):
+            canonical_scenario([{'match_id': 'Q1', 'r1': '1'}])
+
+    def test_lru_within_memory_budget(self):
+        cache = ScenarioCache(max_bytes=3 * (1000 + 1 + ScenarioCache.ENTRY_OVERHEAD), max_item_bytes=10 ** 6)
+        for key in 'abc':
+            cache.put(key, b'x' * 1000)
+        self.assertEqual(cache.get('a'), b'x' * 1000)
+        cache.put('d', b'x' * 1000)
+        # 'b' was least recently used
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        stats = cache.stats()
+        self.assertEqual((stats['entries'], stats['evictions'], stats['hits'], stats['misses']), (3, 1, 2, 1))
+        self.assertLessEqual(stats['bytes'], cache.max_bytes)
+        # Too large to be worth caching
+        cache.put('e', b'x' * 10 ** 6)
+        self.assertIsNone(cache.get('e'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from collections import Counter
+from src.data_manager import DataManager
+from src.ranking_calculator import RankingCalculator
+from src.schedule import ScheduleGenerator
+
+class TestScheduleGenerator(unittest.TestCase):
+    def test_constraints(self):
+        for n, per_team in ((13, 5), (23, 6), (30, 5)):
+            generator = ScheduleGenerator([str(i) for i in range(1, n + 1)], per_team, min_gap=3, seed=n)
+            for schedule in generator.generate_batch(50):
+                counted = Counter(t for row, surrogate in zip(schedule.rows.tolist(), schedule.surrogates.tolist())
+                                  for t, s in zip(row, surrogate) if not s)
+                # Every team plays exactly its quota, extra slots are surrogates
+                self.assertEqual(set(counted.values()), {per_team})
+                self.assertEqual(len(counted), n)
+                self.assertEqual(schedule.quality['surrogates'], 4 * len(schedule) - n * per_team)
+                self.assertEqual(schedule.quality['turnaround_violations'], 0)
+                self.assertGreaterEqual(schedule.quality['min_turnaround'], generator.min_gap)
+                for row in schedule.rows.tolist():
+                    self.assertEqual(len(set(row)), 4)
+
+    def test_seeded_and_distinct(self):
+        teams = [str(i) for i in range(1, 31)]
+        a = [s.fingerprint() for s in ScheduleGenerator(teams, seed=7).generate_batch(20)]
+        b = [s.fingerprint() for s in ScheduleGenerator(teams, seed=7).generate_batch(20)]
+        self.assertEqual(a, b)
+        many = list(ScheduleGenerator(teams, seed=7).generate_many(300))
+        self.assertEqual(len({s.fingerprint() for s in many}), 300)
+        # Enough teams to avoid any repeated partner
+        self.assertEqual(min(s.quality['partner_repeats'] for s in many), 0)
+
+    def test_plugs_into_hypothetical_rankings(self):
+        dm = DataManager()
+        schedule = ScheduleGenerator(list(dm.teams), matches_per_team=5, seed=1).generate()
+        matches = schedule.to_hypothetical(lambda red, blue: (100, 50, 6, 0))
+        teams = {t.number: t for t in dm.get_all_teams_with_hypothetical(matches)}
+        for team in RankingCalculator.calculate_league_rankings(list(teams.values())):
+            tournament = [p for p in team.match_breakdown if p.get('is_tournament')]
+            self.assertEqual(len(tournament), 5 + sum(team.number in m['surrogates'] for m in matches))
+            # Surrogate appearances never count
+            self.assertTrue(all(p['rp'] == 0 for p in tournament if p['is_surrogate']))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from src.data_manager import DataManager
+from src.snapshot import SnapshotReader, ProducerLock, FileWatcher, write_snapshot, read_version, fcntl
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'snap.bin')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reader_remaps_only_on_new_version(self):
+        reader = SnapshotReader(self.path)
+        self.assertIsNone(reader.read())
+        self.assertEqual(write_snapshot(b'[1]', self.path), 1)
+        self.assertEqual(reader.read(), (1, b'[1]'))
+        reader.read()
+        self.assertEqual(reader.remaps, 1)
+        self.assertEqual(write_snapshot(b'[1,2]', self.path), 2)
+        self.assertEqual(reader.read(), (2, b'[1,2]'))
+        self.assertEqual(reader.remaps, 2)
+
+    def test_payload_is_a_view_that_outlives_remap(self):
+        reader = SnapshotReader(self.path)
+        write_snapshot(b'first', self.path)
+        _, view = reader.read()
+        self.assertIsInstance(view, memoryview)
+        write_snapshot(b'second', self.path)
+        self.assertEqual(reader.read()[1], b'second')
+        self.assertEqual(bytes(view), b'first')
+
+    def test_read_with_source_skips_snapshots_of_other_state(self):
+        state = os.path.join(self.tmp.name, 'state.json')
+        watcher = FileWatcher([state])
+        reader = SnapshotReader(self.path)
+        write_snapshot(b'[1]', self.path, watcher.source())
+        self.assertEqual(reader.read(watcher.source(current=True)), (1, b'[1]'))
+        # Another worker rewrote the state: the snapshot no longer reflects what is on disk
+        with open(state, 'w') as f:
+            f.write('[]')
+        self.assertIsNone(reader.read(watcher.source(current=True)))
+        self.assertEqual(reader.read(), (1, b'[1]'))
+        watcher.changed()
+        write_snapshot(b'[2]', self.path, watcher.source())
+        self.assertEqual(reader.read(watcher.source(current=True)), (2, b'[2]'))
+
+    def test_watcher_reports_other_writes_once(self):
+        path = os.path.join(self.tmp.name, 'state.json')
+        watcher = FileWatcher([path])
+        self.assertEqual(watcher.changed(), [])
+        with open(path, 'w') as f:
+            f.write('[]')
+        self.assertEqual(watcher.changed(), [path])
+        self.assertEqual(watcher.changed(), [])
+        with open(path, 'w') as f:
+            f.write('[1]')
+        watcher.mark(path)
+        self.assertEqual(watcher.changed(), [])
+
+    def test_worker_reloads_tournament_saved_elsewhere(self):
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        try:
+            worker, other = DataManager(), DataManager()
+            events = []
+            worker.subscribe(lambda event, teams, payload: events.append(event))
+            other.add_tournament_match('Q1', '5214', '11920', '14259', '14770', 90, 40, 5, 1)
+            self.assertTrue(worker.reload_tournament_data())
+            self.assertEqual([m.match_id for m in worker.teams['5214'].matches], ['Q1'])
+            self.assertFalse(worker.reload_tournament_data())
+            self.assertEqual(events, ['tournament_reloaded'])
+        finally:
+            os.chdir(cwd)
+
+    def test_other_process_sees_published_snapshot(self):
+        reader = SnapshotReader(self.path)
+        write_snapshot(b'old', self.path)
+        reader.read()
+        code = f"from src.snapshot import write_snapshot; write_snapshot(b'from child', {self.path!r})"
+        subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+        self.assertEqual(reader.read(), (2, b'from child'))
+        self.assertEqual(read_version(self.path), 2)
+
+    @unittest.skipIf(fcntl is None, "no flock on this platform")
+    def test_single_producer(self):
+        lock_path = os.path.join(self.tmp.name, 'producer.lock')
+        first, second = ProducerLock(lock_path), ProducerLock(lock_path)
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        first.release()
+        self.assertTrue(second.acquire())
+        second.release()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from src.data_manager import DataManager, Match
+from src.ranking_calculator import RankingCalculator
+from src.rules import SeasonRules, SEASONS
+from src.threshold_solver import ThresholdSolver
+
+REMAINING = 3
+
+def rank_after(dm, number, rp_per_match, scores):
+    """Brute force: full recompute with the extra tournament matches added to one team."""
+    teams = {num: t.clone() for num, t in dm.teams.items()}
+    for i, (rp, score) in enumerate(zip(rp_per_match, scores)):
+        teams[number].add_match(Match(f"X-{i}", [number, 'X'], ['Y', 'Z'], score, 0, rp, 0, match_type="TOURNAMENT"))
+    ranked = RankingCalculator.calculate_league_rankings(list(teams.values()))
+    return next(t.league_rank for t in ranked if t.number == number)
+
+def spread(rp):
+    """Concentrate RP into as few of the remaining matches as possible."""
+    return [min(6, max(0, rp - 6 * i)) for i in range(REMAINING)]
+
+class TestThresholdSolver(unittest.TestCase):
+    def setUp(self):
+        self.dm = DataManager()
+        self.ranked = RankingCalculator.calculate_league_rankings(list(self.dm.teams.values()))
+        self.result = ThresholdSolver(REMAINING).solve(self.ranked)
+
+    def test_best_case_matches_brute_force(self):
+        for team in self.ranked:
+            for entry in self.result[team.number]['ranks']:
+                req = entry['best_case']
+                k = entry['rank']
+                if req is None:
+                    # Even the maximum haul is not enough
+                    self.assertGreater(rank_after(self.dm, team.number, spread(6 * REMAINING), [1000] * REMAINING), k)
+                    continue
+                scores = [req['score']] + [0] * (REMAINING - 1) if req['score'] else [0] * REMAINING
+                self.assertLessEqual(rank_after(self.dm, team.number, spread(req['rp']), scores), k)
+                if req['score']:
+                    # One point less can at best tie the average, which the solver does not count on
+                    scores[0] -= 2
+                    self.assertGreater(rank_after(self.dm, team.number, spread(req['rp']), scores), k)
+                if req['rp']:
+                    self.assertGreater(rank_after(self.dm, team.number, spread(req['rp'] - 1), [1000] * REMAINING), k)
+
+    def test_worst_case_needs_at_least_best_case(self):
+        for team in self.ranked:
+            for entry in self.result[team.number]['ranks']:
+                best, worst = entry['best_case'], entry['worst_case']
+                if worst is not None:
+                    self.assertIsNotNone(best)
+                    self.assertLessEqual(best['rp'], worst['rp'])
+            # Last place needs nothing in any case
+            self.assertEqual(self.result[team.number]['ranks'][-1]['worst_case'], {'rp': 0, 'score': 0})
+
+    def test_advancement_target_rank(self):
+        leader = self.ranked[0].number
+        # A big award means a worse league rank still clears the cutoff
+        solver = ThresholdSolver(REMAINING)
+        plain = solver.advancement_target_rank(leader, self.ranked, 3, {}, {}, {})
+        boosted = solver.advancement_target_rank(leader, self.ranked, 3, {}, {leader: 10}, {})
+        self.assertEqual(plain, 3)
+        self.assertGreater(boosted, plain)
+
+    def test_advancement_target_rank_uses_solver_season(self):
+        leader = self.ranked[0].number
+        # A season where league rank is worth nothing: no rank can lift the leader over the cutoff
+        rules = SeasonRules(2026, dict(SEASONS[2025], qualification_points={'base': 0, 'min': 0}))
+        solver = ThresholdSolver(REMAINING, type('Calc', (RankingCalculator,), {'rules': rules}))
+        self.assertIsNone(solver.advancement_target_rank(leader, self.ranked, 3, {}, {}, {}))
+
+if __name__ == '__main__':
+    unittest.main()